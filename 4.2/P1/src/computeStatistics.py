@@ -7,15 +7,35 @@ and standard deviation using basic algorithms.
 
 The program handles invalid data, prints the results to the
 console, writes them to StatisticsResults.txt, and displays
-execution time.
+execution time. Phase timings and counters are written to
+StatisticsResults.metrics.json.
+
+CSV/TSV files with a header row can be streamed with --columns: every
+value column, optionally per group of a --key column, is summarized in
+a single pass.
+
+Usage:
+    python computeStatistics.py fileWithData.txt [--stream]
+        [--trace-memory]
+    python computeStatistics.py data.csv --columns COL[,COL...]
+        [--key COL] [--delimiter CHAR] [--trace-memory]
 """
-# pylint: disable=invalid-name
+# pylint: disable=invalid-name,wrong-import-position
 
+import argparse
+import csv
 import sys
-import time
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
 
-def read_numbers(file_name):
+from common.metrics import Metrics, metrics_path  # noqa: E402
+
+RESULTS_FILE = "StatisticsResults.txt"
+MAX_DISTINCT = 1_000_000
+
+
+def read_numbers(file_name, metrics=None):
     """
     Reads numeric values from a file.
 
@@ -23,11 +43,13 @@ def read_numbers(file_name):
 
     Args:
         file_name (str): Name of the file containing numbers.
+        metrics (Metrics): Counts lines and invalid rows, if given.
 
     Returns:
         list: A list of valid float numbers.
     """
     numbers = []
+    line_number = invalid_rows = 0
 
     try:
         with open(file_name, "r", encoding="utf-8") as file:
@@ -38,6 +60,7 @@ def read_numbers(file_name):
                     number = float(value)
                     numbers.append(number)
                 except ValueError:
+                    invalid_rows += 1
                     print(
                         f"Invalid data at line {line_number}: '{value}'"
                     )
@@ -46,6 +69,10 @@ def read_numbers(file_name):
         print(f"Error: File '{file_name}' not found.")
         sys.exit(1)
 
+    if metrics is not None:
+        metrics.count("lines", line_number)
+        metrics.count("invalid_rows", invalid_rows)
+
     if not numbers:
         print("Error: No valid numbers found in the file.")
         sys.exit(1)
@@ -152,6 +179,373 @@ def standard_deviation(var):
     return var ** 0.5
 
 
+class DistinctBudget:
+    """
+    Number of distinct values that accumulators sharing it may keep.
+
+    Every value -> count map entry of the accumulators is taken from
+    the budget, so their total memory stays bounded however many
+    groups and columns there are.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = MAX_DISTINCT if limit is None else limit
+        self.used = 0
+
+    def take(self, count=1):
+        """
+        Reserves entries.
+
+        Args:
+            count (int): Entries wanted.
+
+        Returns:
+            bool: False, reserving nothing, if the budget is exhausted.
+        """
+        if self.used + count > self.limit:
+            return False
+        self.used += count
+        return True
+
+    def release(self, count):
+        """
+        Gives entries back.
+
+        Args:
+            count (int): Entries no longer used.
+        """
+        self.used -= count
+
+
+class StatisticsAccumulator:
+    """
+    Streaming statistics of one column.
+
+    Values are added one at a time. The running total gives the mean,
+    Welford's algorithm gives the variance, and a value -> count map
+    gives the exact median and mode. Two accumulators are combined with
+    ``merge`` (Chan's parallel formula), so partial results of groups,
+    chunks or files can be added together.
+
+    The map grows with the number of distinct values, which for
+    continuous data is close to the number of rows. Its entries come
+    from a DistinctBudget, shared by all the accumulators of a file.
+    An accumulator that needs an entry when the budget is exhausted
+    drops its map and gives its entries back: count, mean and variance
+    stay exact, while its median and mode become None.
+    """
+
+    def __init__(self, budget=None):
+        self.count = 0
+        self.total = 0.0
+        self.running_mean = 0.0
+        self.m2 = 0.0
+        self.budget = budget or DistinctBudget()
+        self.frequency = {}
+        self.first_seen = {}
+
+    def add(self, number, position=None):
+        """
+        Adds one value.
+
+        Args:
+            number (float): Value to add.
+            position (int): Input position of the value, used to break
+                mode ties; defaults to the number of values added so far.
+                Accumulators that are merged must share one numbering.
+        """
+        if position is None:
+            position = self.count
+        self.count += 1
+        self.total += number
+        delta = number - self.running_mean
+        self.running_mean += delta / self.count
+        self.m2 += delta * (number - self.running_mean)
+        if self.frequency is None:
+            return
+        if number in self.frequency:
+            self.frequency[number] += 1
+        elif self.budget.take():
+            self.frequency[number] = 1
+            self.first_seen[number] = position
+        else:
+            self._drop_values()
+
+    def _drop_values(self):
+        """Drops the value map and returns its entries to the budget."""
+        if self.frequency is not None:
+            self.budget.release(len(self.frequency))
+            self.frequency = self.first_seen = None
+
+    def merge(self, other):
+        """
+        Adds the values of another accumulator.
+
+        Args:
+            other (StatisticsAccumulator): Accumulator to merge.
+        """
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.running_mean - self.running_mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.running_mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+
+        if other.frequency is None:
+            self._drop_values()
+        if self.frequency is None:
+            return
+        new_values = [number for number in other.frequency
+                      if number not in self.frequency]
+        if not self.budget.take(len(new_values)):
+            self._drop_values()
+            return
+        for number, times in other.frequency.items():
+            position = other.first_seen[number]
+            if number in self.frequency:
+                self.frequency[number] += times
+                self.first_seen[number] = min(self.first_seen[number],
+                                              position)
+            else:
+                self.frequency[number] = times
+                self.first_seen[number] = position
+
+    def median(self):
+        """
+        Finds the median by walking the sorted distinct values.
+
+        Returns:
+            float: Median value, or None if the value map was dropped.
+        """
+        if self.frequency is None:
+            return None
+        middle = self.count // 2
+        wanted = [middle - 1, middle] if self.count % 2 == 0 else [middle]
+        found = []
+        seen = 0
+
+        for number in sorted(self.frequency):
+            seen += self.frequency[number]
+            while wanted and wanted[0] < seen:
+                found.append(number)
+                wanted.pop(0)
+            if not wanted:
+                break
+
+        return sum(found) / len(found) if len(found) == 2 else found[0]
+
+    def mode(self):
+        """
+        Returns:
+            float: First value, in input order, with the highest count,
+            or None if the value map was dropped.
+        """
+        if self.frequency is None:
+            return None
+        return min(
+            self.frequency,
+            key=lambda number: (-self.frequency[number],
+                                self.first_seen[number]),
+        )
+
+    def statistics(self):
+        """
+        Returns:
+            dict: Count, mean, median, mode, variance and standard
+            deviation, as computed by the list-based functions.
+        """
+        var = self.m2 / self.count
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "median": self.median(),
+            "mode": self.mode(),
+            "variance": var,
+            "std_dev": standard_deviation(var),
+        }
+
+
+def format_statistics(stats):
+    """
+    Formats one set of statistics as result lines.
+
+    Args:
+        stats (dict): Values returned by StatisticsAccumulator.
+
+    Returns:
+        str: Count to Variance lines; median and mode read "n/a" when
+        there were too many distinct values to keep them.
+    """
+    median_value = "n/a" if stats["median"] is None else stats["median"]
+    mode_value = "n/a" if stats["mode"] is None else stats["mode"]
+    return (
+        f"Count: {stats['count']}\n"
+        f"Mean: {stats['mean']}\n"
+        f"Median: {median_value}\n"
+        f"Mode: {mode_value}\n"
+        f"Standard Deviation: {stats['std_dev']}\n"
+        f"Variance: {stats['variance']}\n"
+    )
+
+
+def stream_numbers(file_name, metrics=None):
+    """
+    Reads numeric values from a file into an accumulator.
+
+    Invalid data is reported but does not stop execution.
+
+    Args:
+        file_name (str): Name of the file containing numbers.
+        metrics (Metrics): Counts lines and invalid rows, if given.
+
+    Returns:
+        StatisticsAccumulator: Statistics of the valid numbers.
+    """
+    accumulator = StatisticsAccumulator()
+    line_number = invalid_rows = 0
+
+    try:
+        with open(file_name, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                value = line.strip()
+
+                try:
+                    accumulator.add(float(value))
+                except ValueError:
+                    invalid_rows += 1
+                    print(
+                        f"Invalid data at line {line_number}: '{value}'"
+                    )
+
+    except FileNotFoundError:
+        print(f"Error: File '{file_name}' not found.")
+        sys.exit(1)
+
+    if metrics is not None:
+        metrics.count("lines", line_number)
+        metrics.count("invalid_rows", invalid_rows)
+
+    if accumulator.count == 0:
+        print("Error: No valid numbers found in the file.")
+        sys.exit(1)
+
+    return accumulator
+
+
+def _column_positions(header, columns, key):
+    """
+    Finds the value and group columns in a header row.
+
+    Args:
+        header (list): Names of the header row.
+        columns (list): Names of the value columns.
+        key (str): Name of the group column, if any.
+
+    Returns:
+        tuple: (column, field index) pairs and the group field index,
+        None without a key. Exits if a column is missing or repeated.
+    """
+    repeated = sorted({name for name in columns if columns.count(name) > 1})
+    if repeated:
+        print(f"Error: Column(s) repeated: {', '.join(repeated)}")
+        sys.exit(1)
+
+    missing = [
+        name for name in [*columns, *([key] if key else [])]
+        if name not in header
+    ]
+    if missing:
+        print(f"Error: Column(s) not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    positions = [(name, header.index(name)) for name in columns]
+    return positions, header.index(key) if key else None
+
+
+def _add_row(accumulators, positions, row, line_number):
+    """
+    Adds the values of one row to the accumulators of its group.
+
+    Args:
+        accumulators (dict): Column -> StatisticsAccumulator.
+        positions (list): (column, field index) pairs.
+        row (list): Fields of the row.
+        line_number (int): Line of the row, used as its input position.
+
+    Returns:
+        int: Number of invalid values in the row.
+    """
+    invalid = 0
+    for name, position in positions:
+        value = row[position].strip() if position < len(row) else ""
+        try:
+            accumulators[name].add(float(value), line_number)
+        except ValueError:
+            invalid += 1
+            print(f"Invalid data at line {line_number}, "
+                  f"column {name}: '{value}'")
+    return invalid
+
+
+def stream_groups(file_name, columns, key=None, delimiter=",",
+                  metrics=None):
+    """
+    Reads a delimited file once and accumulates every column per group.
+
+    All the accumulators share one DistinctBudget of MAX_DISTINCT
+    values.
+
+    Args:
+        file_name (str): CSV/TSV file with a header row.
+        columns (list): Names of the value columns.
+        key (str): Name of the group column; one group if omitted.
+        delimiter (str): Field delimiter.
+        metrics (Metrics): Counts lines and invalid values, if given.
+
+    Returns:
+        dict: Group -> {column: StatisticsAccumulator}, in the order
+        groups first appear.
+    """
+    groups = {}
+    budget = DistinctBudget()
+    line_number = invalid_rows = 0
+
+    try:
+        with open(file_name, "r", encoding="utf-8", newline="") as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            positions, key_position = _column_positions(
+                next(reader, []), columns, key)
+
+            for line_number, row in enumerate(reader, start=2):
+                if not row:
+                    continue
+                group = None
+                if key is not None:
+                    group = (row[key_position]
+                             if key_position < len(row) else "")
+
+                if group not in groups:
+                    groups[group] = {
+                        name: StatisticsAccumulator(budget)
+                        for name in columns
+                    }
+                invalid_rows += _add_row(groups[group], positions, row,
+                                         line_number)
+
+    except FileNotFoundError:
+        print(f"Error: File '{file_name}' not found.")
+        sys.exit(1)
+
+    if metrics is not None:
+        metrics.count("lines", line_number)
+        metrics.count("invalid_rows", invalid_rows)
+        metrics.count("groups", len(groups))
+
+    return groups
+
+
 def write_results(results):
     """
     Writes the statistics results to a file.
@@ -159,48 +553,249 @@ def write_results(results):
     Args:
         results (str): Formatted statistics results.
     """
-    with open("StatisticsResults.txt", "w",
-              encoding="utf-8") as file:
+    with open(RESULTS_FILE, "w", encoding="utf-8") as file:
         file.write(results)
 
 
+def process_file(file_name, metrics=None):
+    """
+    Computes the statistics of one file.
+
+    Args:
+        file_name (str): Name of the file containing numbers.
+        metrics (Metrics): Started metrics receiving the phase timings;
+            a new one is started if omitted.
+
+    Returns:
+        str: Formatted statistics results.
+    """
+    if metrics is None:
+        metrics = Metrics("computeStatistics")
+        metrics.start()
+
+    with metrics.span("read"):
+        numbers = read_numbers(file_name, metrics)
+
+    with metrics.span("compute"):
+        avg = mean(numbers)
+        var = variance(numbers, avg)
+        stats = {
+            "count": len(numbers),
+            "mean": avg,
+            "median": median(numbers),
+            "mode": mode(numbers),
+            "variance": var,
+            "std_dev": standard_deviation(var),
+        }
+
+    with metrics.span("format"):
+        results = (
+            "Statistics Results\n"
+            "-------------------\n"
+            + format_statistics(stats)
+            + f"Execution Time: {metrics.elapsed_seconds():.6f} seconds\n"
+        )
+
+    return results
+
+
+def process_stream(file_name, metrics=None):
+    """
+    Computes the statistics of one file in a single streaming pass.
+
+    The results are the same as process_file, but the numbers are never
+    held in a list.
+
+    Args:
+        file_name (str): Name of the file containing numbers.
+        metrics (Metrics): Started metrics receiving the phase timings;
+            a new one is started if omitted.
+
+    Returns:
+        str: Formatted statistics results.
+    """
+    if metrics is None:
+        metrics = Metrics("computeStatistics")
+        metrics.start()
+
+    with metrics.span("read"):
+        accumulator = stream_numbers(file_name, metrics)
+
+    with metrics.span("compute"):
+        stats = accumulator.statistics()
+
+    with metrics.span("format"):
+        results = (
+            "Statistics Results\n"
+            "-------------------\n"
+            + format_statistics(stats)
+            + f"Execution Time: {metrics.elapsed_seconds():.6f} seconds\n"
+        )
+
+    return results
+
+
+def _grouped_blocks(groups, columns, key):
+    """
+    Computes the statistics of every group and column.
+
+    The merged "All Groups" accumulators get a DistinctBudget of their
+    own, so memory stays within twice MAX_DISTINCT values.
+
+    Args:
+        groups (dict): Values returned by stream_groups.
+        columns (list): Names of the value columns.
+        key (str): Name of the group column, if any.
+
+    Returns:
+        list: (title, statistics) pairs; statistics is None for a
+        column without values.
+    """
+    sections = [
+        ("" if key is None else f"Group: {group} | ", accumulators)
+        for group, accumulators in groups.items()
+    ]
+    if key:
+        budget = DistinctBudget()
+        totals = {name: StatisticsAccumulator(budget) for name in columns}
+        for accumulators in groups.values():
+            for name in columns:
+                totals[name].merge(accumulators[name])
+        sections.append(("All Groups | ", totals))
+
+    blocks = []
+    for prefix, accumulators in sections:
+        for name in columns:
+            title = f"{prefix}Column: {name}"
+            if accumulators[name].count == 0:
+                blocks.append((title, None))
+            else:
+                blocks.append((title, accumulators[name].statistics()))
+    return blocks
+
+
+def process_grouped(file_name, columns, key=None, delimiter=",",
+                    metrics=None):
+    """
+    Computes the statistics of every column, per group, of a CSV file.
+
+    With a key column, the per-group accumulators are merged into an
+    "All Groups" block for each column, titled apart from the groups so
+    that no group value can be mistaken for it.
+
+    Args:
+        file_name (str): CSV/TSV file with a header row.
+        columns (list): Names of the value columns.
+        key (str): Name of the group column, if any.
+        delimiter (str): Field delimiter.
+        metrics (Metrics): Started metrics receiving the phase timings;
+            a new one is started if omitted.
+
+    Returns:
+        str: Formatted statistics results, one block per group/column.
+    """
+    if metrics is None:
+        metrics = Metrics("computeStatistics")
+        metrics.start()
+
+    with metrics.span("read"):
+        groups = stream_groups(file_name, columns, key, delimiter, metrics)
+
+    with metrics.span("compute"):
+        blocks = _grouped_blocks(groups, columns, key)
+
+    with metrics.span("format"):
+        lines = ["Statistics Results\n-------------------\n"]
+        for title, stats in blocks:
+            body = format_statistics(stats) if stats else "Count: 0\n"
+            lines.append(f"{title}\n{body}\n")
+        lines.append(
+            f"Execution Time: {metrics.elapsed_seconds():.6f} seconds\n")
+
+    return "".join(lines)
+
+
+def parse_arguments(argv):
+    """
+    Parses command line arguments.
+
+    Args:
+        argv (list): Arguments without the program name.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="computeStatistics.py",
+        description="Compute descriptive statistics.",
+    )
+    parser.add_argument(
+        "file_name",
+        help="one number per line, or a CSV/TSV file with --columns",
+    )
+    parser.add_argument(
+        "--columns", metavar="COL[,COL...]",
+        help="value columns of a delimited file with a header row",
+    )
+    parser.add_argument(
+        "--key", metavar="COL",
+        help="column whose values group the rows",
+    )
+    parser.add_argument(
+        "--delimiter",
+        help="field delimiter: a character or 'tab' "
+             "(default: tab for .tsv files, comma otherwise)",
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="compute one-number-per-line files in a single pass",
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="record the peak memory in the metrics file (slower)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.key and not args.columns:
+        parser.error("--key needs --columns")
+    if args.delimiter in (None, ""):
+        args.delimiter = "\t" if args.file_name.endswith(".tsv") else ","
+    elif args.delimiter in ("tab", "\\t"):
+        args.delimiter = "\t"
+    return args
+
+
 def main():
     """
     Main function that orchestrates file reading,
     statistics calculation, and result output.
     """
     if len(sys.argv) < 2:
-        print("Usage: python computeStatistics.py fileWithData.txt")
+        print("Usage: python computeStatistics.py fileWithData.txt "
+              "[--stream] [--columns COL[,COL...] [--key COL] "
+              "[--delimiter CHAR]] [--trace-memory]")
         sys.exit(1)
 
-    file_name = sys.argv[1]
-
-    start_time = time.time()
+    args = parse_arguments(sys.argv[1:])
 
-    numbers = read_numbers(file_name)
+    metrics = Metrics("computeStatistics", trace_memory=args.trace_memory)
+    metrics.start()
 
-    avg = mean(numbers)
-    med = median(numbers)
-    mod = mode(numbers)
-    var = variance(numbers, avg)
-    std_dev = standard_deviation(var)
-
-    elapsed_time = time.time() - start_time
+    if args.columns:
+        columns = [name.strip() for name in args.columns.split(",")]
+        results = process_grouped(args.file_name, columns, args.key,
+                                  args.delimiter, metrics)
+    elif args.stream:
+        results = process_stream(args.file_name, metrics)
+    else:
+        results = process_file(args.file_name, metrics)
+    print(results)
 
-    results = (
-        f"Statistics Results\n"
-        f"-------------------\n"
-        f"Count: {len(numbers)}\n"
-        f"Mean: {avg}\n"
-        f"Median: {med}\n"
-        f"Mode: {mod}\n"
-        f"Standard Deviation: {std_dev}\n"
-        f"Variance: {var}\n"
-        f"Execution Time: {elapsed_time:.6f} seconds\n"
-    )
+    with metrics.span("write"):
+        write_results(results)
 
-    print(results)
-    write_results(results)
+    metrics.stop()
+    metrics.write_json(metrics_path(RESULTS_FILE))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+"""Unit tests for the streaming statistics of computeStatistics."""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# pylint: disable=wrong-import-position
+from computeStatistics import (  # noqa: E402
+    DistinctBudget, StatisticsAccumulator, format_statistics, mean, median,
+    mode, process_grouped, variance,
+)
+
+
+def accumulate(numbers, budget=None, first_position=0):
+    """Return an accumulator fed with numbers at consecutive positions."""
+    accumulator = StatisticsAccumulator(budget)
+    for position, number in enumerate(numbers, start=first_position):
+        accumulator.add(number, position)
+    return accumulator
+
+
+class TestStatisticsAccumulator(unittest.TestCase):
+    """Test cases for StatisticsAccumulator class."""
+
+    numbers = [4.0, 1.0, 7.0, 1.0, 9.5, 4.0, 2.0]
+
+    def test_same_as_list_functions(self):
+        """Streaming statistics match the list-based functions."""
+        stats = accumulate(self.numbers).statistics()
+
+        avg = mean(self.numbers)
+        self.assertEqual(stats["count"], len(self.numbers))
+        self.assertAlmostEqual(stats["mean"], avg)
+        self.assertEqual(stats["median"], median(self.numbers))
+        self.assertEqual(stats["mode"], mode(self.numbers))
+        self.assertAlmostEqual(stats["variance"],
+                               variance(self.numbers, avg))
+
+    def test_merge(self):
+        """Merged parts give the statistics of the whole input."""
+        merged = accumulate(self.numbers[:3])
+        merged.merge(accumulate(self.numbers[3:], first_position=3))
+        merged.merge(StatisticsAccumulator())
+
+        whole = accumulate(self.numbers).statistics()
+        for name, value in merged.statistics().items():
+            self.assertAlmostEqual(value, whole[name])
+
+    def test_mode_ties_keep_input_order_after_merge(self):
+        """The earliest value wins a tie, whatever the merge order."""
+        first, second = StatisticsAccumulator(), StatisticsAccumulator()
+        second.add(5.0, 2)
+        first.add(7.0, 3)
+        first.add(5.0, 4)
+        second.add(7.0, 5)
+
+        first.merge(second)
+
+        self.assertEqual(first.mode(), 5.0)
+
+    def test_shared_budget(self):
+        """Negative test: past the budget, median and mode are dropped."""
+        budget = DistinctBudget(4)
+        kept = accumulate([1.0, 2.0, 2.0], budget)
+        dropped = accumulate([3.0, 4.0, 5.0], budget)
+
+        self.assertEqual(kept.mode(), 2.0)
+        self.assertIsNone(dropped.median())
+        self.assertIsNone(dropped.mode())
+        self.assertEqual(dropped.count, 3)
+        self.assertAlmostEqual(dropped.statistics()["mean"], 4.0)
+        self.assertEqual(budget.used, 2)
+        self.assertIn("Median: n/a\nMode: n/a\n",
+                      format_statistics(dropped.statistics()))
+
+    def test_merge_over_budget(self):
+        """Negative test: a merge that needs too many values drops them."""
+        total = accumulate([1.0], DistinctBudget(2))
+        total.merge(accumulate([2.0, 3.0]))
+
+        self.assertIsNone(total.median())
+        self.assertEqual(total.budget.used, 0)
+
+
+class TestProcessGrouped(unittest.TestCase):
+    """Test cases for the grouped CSV statistics."""
+
+    def setUp(self):
+        """Create a CSV path in a temporary directory."""
+        # Must outlive setUp; removed by addCleanup.
+        # pylint: disable-next=consider-using-with
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "data.csv")
+
+    def run_grouped(self, text, columns, key=None):
+        """Write the CSV text and return the grouped results."""
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(text)
+        with redirect_stdout(StringIO()):
+            return process_grouped(self.path, columns, key)
+
+    def test_groups_and_all_groups_block(self):
+        """A group named "(all)" stays apart from the merged block."""
+        results = self.run_grouped(
+            "g,v\nB,5\n(all),7\nA,5\nB,x\n", ["v"], "g")
+
+        self.assertIn("Group: B | Column: v\nCount: 1\n", results)
+        self.assertIn("Group: (all) | Column: v\nCount: 1\n", results)
+        self.assertIn("All Groups | Column: v\nCount: 3\n", results)
+        self.assertIn("Mode: 5.0\n", results.split("All Groups")[1])
+        self.assertLess(results.index("Group: B"),
+                        results.index("Group: (all)"))
+
+    def test_columns_without_key(self):
+        """Each column gets one block without a key."""
+        results = self.run_grouped("a,b\n1,2\n3,\n", ["a", "b"])
+
+        self.assertIn("Column: a\nCount: 2\n", results)
+        self.assertIn("Column: b\nCount: 1\n", results)
+        self.assertNotIn("Group", results)
+
+    def test_repeated_column(self):
+        """Negative test: a column listed twice is rejected."""
+        with self.assertRaises(SystemExit):
+            self.run_grouped("a\n1\n2\n3\n", ["a", "a"])
@@ -6,26 +6,38 @@ to binary and hexadecimal using basic algorithms.
 
 Invalid data is reported but does not stop execution.
 Results are printed to the console and saved to
-ConvertionResults.txt along with execution time.
+ConvertionResults.txt along with execution time. Phase timings and
+counters are written to ConversionResults.metrics.json.
+
+Usage:
+    python convertNumbers.py fileWithData.txt [--trace-memory]
 """
 
-# pylint: disable=invalid-name
+# pylint: disable=invalid-name,wrong-import-position
 
 import sys
-import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from common.metrics import Metrics, metrics_path  # noqa: E402
 
+RESULTS_FILE = "ConversionResults.txt"
 
-def read_numbers(file_name):
+
+def read_numbers(file_name, metrics=None):
     """
     Reads integer numbers from a file.
 
     Args:
         file_name (str): File containing numeric data.
+        metrics (Metrics): Counts lines and invalid rows, if given.
 
     Returns:
         list: Valid integers.
     """
     numbers = []
+    line_number = invalid_rows = 0
 
     try:
         with open(file_name, "r", encoding="utf-8") as file:
@@ -36,6 +48,7 @@ def read_numbers(file_name):
                     number = int(value)
                     numbers.append(number)
                 except ValueError:
+                    invalid_rows += 1
                     print(
                         f"Invalid data at line {line_number}: '{value}'"
                     )
@@ -44,6 +57,10 @@ def read_numbers(file_name):
         print(f"Error: File '{file_name}' not found.")
         sys.exit(1)
 
+    if metrics is not None:
+        metrics.count("lines", line_number)
+        metrics.count("invalid_rows", invalid_rows)
+
     if not numbers:
         print("Error: No valid numbers found.")
         sys.exit(1)
@@ -124,48 +141,80 @@ def write_results(results):
     Args:
         results (str): Formatted results.
     """
-    with open("ConversionResults.txt", "w", encoding="utf-8") as file:
+    with open(RESULTS_FILE, "w", encoding="utf-8") as file:
         file.write(results)
 
 
-def main():
+def process_file(file_name, metrics=None):
     """
-    Main execution function.
+    Computes the conversion results of one file.
+
+    Args:
+        file_name (str): File containing the input data.
+        metrics (Metrics): Started metrics receiving the phase timings;
+            a new one is started if omitted.
+
+    Returns:
+        str: Formatted results, including the execution time line.
     """
-    if len(sys.argv) < 2:
-        print("Usage: python convertNumbers.py fileWithData.txt")
-        sys.exit(1)
+    if metrics is None:
+        metrics = Metrics("convertNumbers")
+        metrics.start()
+
+    with metrics.span("read"):
+        numbers = read_numbers(file_name, metrics)
 
-    file_name = sys.argv[1]
+    with metrics.span("compute"):
+        conversions = []
+        for number in numbers:
+            binary = decimal_to_binary(number)
+            conversions.append(
+                (number, binary, binary_to_hexadecimal(binary, number))
+            )
+        metrics.count("numbers", len(conversions))
 
-    start_time = time.time()
+    with metrics.span("format"):
+        output_lines = []
+        output_lines.append("Conversion Results")
+        output_lines.append("-------------------")
 
-    numbers = read_numbers(file_name)
+        for number, binary, hexadecimal in conversions:
+            line = (
+                f"Decimal: {number} | "
+                f"Binary: {binary} | "
+                f"Hexadecimal: {hexadecimal}"
+            )
 
-    output_lines = []
-    output_lines.append("Conversion Results")
-    output_lines.append("-------------------")
+            output_lines.append(line)
 
-    for number in numbers:
-        binary = decimal_to_binary(number)
-        hexadecimal = binary_to_hexadecimal(binary, number)
+        elapsed_time = metrics.elapsed_seconds()
+        time_line = f"\nExecution Time: {elapsed_time:.6f} seconds"
+        output_lines.append(time_line)
 
-        line = (
-            f"Decimal: {number} | "
-            f"Binary: {binary} | "
-            f"Hexadecimal: {hexadecimal}"
-        )
+    return "\n".join(output_lines)
+
+
+def main():
+    """
+    Main execution function.
+    """
+    if len(sys.argv) < 2:
+        print("Usage: python convertNumbers.py fileWithData.txt "
+              "[--trace-memory]")
+        sys.exit(1)
 
-        print(line)
-        output_lines.append(line)
+    metrics = Metrics("convertNumbers",
+                      trace_memory="--trace-memory" in sys.argv[2:])
+    metrics.start()
 
-    elapsed_time = time.time() - start_time
-    time_line = f"\nExecution Time: {elapsed_time:.6f} seconds"
+    results = process_file(sys.argv[1], metrics)
+    print(results)
 
-    print(time_line)
-    output_lines.append(time_line)
+    with metrics.span("write"):
+        write_results(results)
 
-    write_results("\n".join(output_lines))
+    metrics.stop()
+    metrics.write_json(metrics_path(RESULTS_FILE))
 
 
 if __name__ == "__main__":
@@ -4,26 +4,38 @@ wordCount.py
 Reads a text file and counts the frequency of each distinct word.
 Results are printed to the console and written to WordCountResults.txt.
 Invalid data is reported but execution continues.
-Execution time is displayed and recorded.
+Execution time is displayed and recorded. Phase timings and counters
+are written to WordCountResults.metrics.json.
+
+Usage:
+    python wordCount.py fileWithData.txt [--trace-memory]
 """
 
-# pylint: disable=invalid-name
+# pylint: disable=invalid-name,wrong-import-position
 
 import sys
-import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from common.metrics import Metrics, metrics_path  # noqa: E402
 
+RESULTS_FILE = "WordCountResults.txt"
 
-def read_words(file_name):
+
+def read_words(file_name, metrics=None):
     """
     Reads words from a file and returns a list of words.
 
     Args:
         file_name (str): File containing text data.
+        metrics (Metrics): Counts lines and empty lines, if given.
 
     Returns:
         list: List of words found in the file.
     """
     words = []
+    line_number = empty_lines = 0
 
     try:
         with open(file_name, "r", encoding="utf-8") as file:
@@ -31,6 +43,7 @@ def read_words(file_name):
                 line = line.strip()
 
                 if not line:
+                    empty_lines += 1
                     print(f"Empty line at {line_number}")
                     continue
 
@@ -51,6 +64,10 @@ def read_words(file_name):
         print(f"Error: File '{file_name}' not found.")
         sys.exit(1)
 
+    if metrics is not None:
+        metrics.count("lines", line_number)
+        metrics.count("invalid_rows", empty_lines)
+
     if not words:
         print("Error: No valid words found in file.")
         sys.exit(1)
@@ -86,7 +103,7 @@ def write_results(results):
     Args:
         results (str): Formatted results.
     """
-    with open("WordCountResults.txt", "w", encoding="utf-8") as file:
+    with open(RESULTS_FILE, "w", encoding="utf-8") as file:
         file.write(results)
 
 
@@ -116,39 +133,70 @@ def sort_frequencies(frequencies):
     return items
 
 
-def main():
+def process_file(file_name, metrics=None):
     """
-    Main execution function.
+    Computes the word count results of one file.
+
+    Args:
+        file_name (str): File containing the input data.
+        metrics (Metrics): Started metrics receiving the phase timings;
+            a new one is started if omitted.
+
+    Returns:
+        str: Formatted results, including the execution time line.
     """
-    if len(sys.argv) < 2:
-        print("Usage: python wordCount.py fileWithData.txt")
-        sys.exit(1)
+    if metrics is None:
+        metrics = Metrics("wordCount")
+        metrics.start()
+
+    with metrics.span("read"):
+        words = read_words(file_name, metrics)
+
+    with metrics.span("compute"):
+        frequencies = count_words(words)
+        metrics.count("words", len(words))
+        metrics.count("distinct_words", len(frequencies))
 
-    file_name = sys.argv[1]
+    with metrics.span("sort"):
+        sorted_words = sort_frequencies(frequencies)
 
-    start_time = time.time()
+    with metrics.span("format"):
+        output_lines = []
+        output_lines.append("Word Count Results")
+        output_lines.append("------------------")
 
-    words = read_words(file_name)
-    frequencies = count_words(words)
+        for word, count in sorted_words:
+            line = f"{word}: {count}"
+            output_lines.append(line)
 
-    output_lines = []
-    output_lines.append("Word Count Results")
-    output_lines.append("------------------")
+        elapsed_time = metrics.elapsed_seconds()
+        time_line = f"\nExecution Time: {elapsed_time:.6f} seconds"
+        output_lines.append(time_line)
 
-    sorted_words = sort_frequencies(frequencies)
+    return "\n".join(output_lines)
+
+
+def main():
+    """
+    Main execution function.
+    """
+    if len(sys.argv) < 2:
+        print("Usage: python wordCount.py fileWithData.txt "
+              "[--trace-memory]")
+        sys.exit(1)
 
-    for word, count in sorted_words:
-        line = f"{word}: {count}"
-        print(line)
-        output_lines.append(line)
+    metrics = Metrics("wordCount",
+                      trace_memory="--trace-memory" in sys.argv[2:])
+    metrics.start()
 
-    elapsed_time = time.time() - start_time
-    time_line = f"\nExecution Time: {elapsed_time:.6f} seconds"
+    results = process_file(sys.argv[1], metrics)
+    print(results)
 
-    print(time_line)
-    output_lines.append(time_line)
+    with metrics.span("write"):
+        write_results(results)
 
-    write_results("\n".join(output_lines))
+    metrics.stop()
+    metrics.write_json(metrics_path(RESULTS_FILE))
 
 
 if __name__ == "__main__":
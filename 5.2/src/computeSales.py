@@ -3,15 +3,122 @@
 computeSales.py
 
 Compute total sales cost based on a price catalogue and sales record.
+Phase timings and counters are written to SalesResults.metrics.json.
 """
 
-# pylint: disable=invalid-name
+# pylint: disable=invalid-name,wrong-import-position
 
+import argparse
+import hashlib
 import json
+import os
 import sys
-import time
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common.metrics import Metrics, metrics_path  # noqa: E402
+
+
+DEFAULT_SAMPLE_LIMIT = 5
+RESULTS_FILE = "SalesResults.txt"
+
+# Prices and collectors shared by every sales file of one run.
+PricingContext = namedtuple("PricingContext",
+                            ["cents_dict", "diagnostics", "metrics"])
+
+
+class Diagnostics:
+    """
+    Collect validation warnings without printing them one by one.
+
+    Every warning increments a per-category counter. Only the first
+    ``sample_limit`` offending entries of each category are kept as
+    samples, and they are echoed to the console only when ``verbose``
+    is set, so dirty inputs cannot turn the main loop into an
+    output-bound loop.
+    """
+
+    def __init__(self, sample_limit=DEFAULT_SAMPLE_LIMIT, verbose=False):
+        """
+        Args:
+            sample_limit (int): Samples kept per warning category.
+            verbose (bool): Echo sampled warnings to the console.
+        """
+        self.sample_limit = sample_limit
+        self.verbose = verbose
+        self.counts = {}
+        self.samples = {}
+
+    def warn(self, category, detail):
+        """
+        Record one warning.
+
+        Args:
+            category (str): Warning category, e.g. "unknown_product".
+            detail: Offending entry; only formatted if it is sampled.
+        """
+        count = self.counts.get(category, 0) + 1
+        self.counts[category] = count
+
+        if count > self.sample_limit:
+            return
+
+        self.samples.setdefault(category, []).append(detail)
+        if self.verbose:
+            print(f"WARNING: {category} -> {detail}")
+
+    def total(self):
+        """
+        Returns:
+            int: Number of warnings recorded across all categories.
+        """
+        return sum(self.counts.values())
+
+    def summary_lines(self):
+        """
+        Build a human readable summary of the recorded warnings.
+
+        Returns:
+            list: Lines with the count of every category.
+        """
+        lines = []
+        for category in sorted(self.counts):
+            count = self.counts[category]
+            shown = min(count, self.sample_limit)
+            lines.append(f"{category}: {count} (sampled {shown})")
+        return lines
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Counters and samples, ready to be dumped as JSON.
+        """
+        return {
+            "total": self.total(),
+            "sample_limit": self.sample_limit,
+            "counts": dict(self.counts),
+            "samples": {
+                category: list(items)
+                for category, items in self.samples.items()
+            },
+        }
+
+    def write_json(self, file_path):
+        """
+        Write the diagnostics to a JSON file.
+
+        Args:
+            file_path (str): Destination path.
+        """
+        try:
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file, indent=2, default=str)
+        except OSError as exc:
+            print(f"ERROR: Could not write diagnostics file -> {exc}")
+
 
 def load_json_file(file_path):
     """
@@ -35,117 +142,474 @@ def load_json_file(file_path):
     return None
 
 
-def build_price_dictionary(price_catalogue):
+def to_cents(price):
     """
-    Build a dictionary for quick product price lookup.
+    Convert a price to integer minor units (cents).
+
+    The conversion goes through Decimal so 0.1 + 0.2 style float
+    artefacts never reach the total; it runs once per catalogue entry.
+
+    Args:
+        price: Price as int, float or numeric string.
+
+    Returns:
+        int: Price in cents, rounded half up.
+    """
+    try:
+        amount = Decimal(str(price))
+    except InvalidOperation as exc:
+        raise ValueError(f"Invalid price: {price}") from exc
+    if not amount.is_finite():
+        raise ValueError(f"Invalid price: {price}")
+    return int((amount * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def format_cents(cents):
+    """
+    Format cents as a currency amount.
+
+    Args:
+        cents (int): Amount in cents.
+
+    Returns:
+        str: Amount such as "$1,234.50".
+    """
+    sign = "-" if cents < 0 else ""
+    units, minor = divmod(abs(cents), 100)
+    return f"{sign}${units:,}.{minor:02d}"
+
+
+def build_cents_dictionary(price_catalogue, diagnostics=None):
+    """
+    Build a product price lookup with prices in integer cents.
 
     Args:
         price_catalogue (list): List of product dictionaries.
+        diagnostics (Diagnostics): Collector for skipped entries.
 
     Returns:
-        dict: Dictionary with product name as key and price as value.
+        dict: Dictionary with product name as key and cents as value.
     """
-    price_dict = {}
+    if diagnostics is None:
+        diagnostics = Diagnostics(verbose=True)
+
+    cents_dict = {}
     for product in price_catalogue:
         try:
-            name = product["title"]
-            price = float(product["price"])
-            price_dict[name] = price
+            cents_dict[product["title"]] = to_cents(product["price"])
         except (KeyError, ValueError, TypeError):
-            print(f"WARNING: Invalid product entry skipped -> {product}")
-    return price_dict
+            diagnostics.warn("invalid_product", product)
+    return cents_dict
 
 
-def compute_sales_total(price_dict, sales_record):
+def compute_sales_cents(cents_dict, sales_record, diagnostics=None):
     """
-    Compute total sales cost.
+    Compute total sales cost exactly, accumulating integer cents.
 
     Args:
-        price_dict (dict): Product price dictionary.
+        cents_dict (dict): Product price dictionary in cents.
         sales_record (list): List of sales transactions.
+        diagnostics (Diagnostics): Collector for invalid sales.
 
     Returns:
-        float: Total sales cost.
+        int: Total sales cost in cents.
     """
-    total_cost = 0.0
+    if diagnostics is None:
+        diagnostics = Diagnostics(verbose=True)
+
+    warn = diagnostics.warn
+    total_cents = 0
 
     for sale in sales_record:
         try:
             product_name = sale["Product"]
             quantity = int(sale["Quantity"])
 
-            if product_name not in price_dict:
-                print(f"WARNING: Product not found -> {product_name}")
+            if product_name not in cents_dict:
+                warn("unknown_product", product_name)
                 continue
 
             if quantity < 0:
-                print(f"WARNING: Negative quantity -> {sale}")
+                warn("negative_quantity", sale)
 
-            total_cost += price_dict[product_name] * quantity
+            total_cents += cents_dict[product_name] * quantity
 
         except (KeyError, ValueError, TypeError):
-            print(f"WARNING: Invalid sale entry skipped -> {sale}")
+            warn("invalid_sale", sale)
+
+    return total_cents
+
+
+def file_digest(file_path):
+    """
+    Compute the SHA-256 digest of a file.
 
-    return total_cost
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-def write_results(total_cost, elapsed_time):
+class SalesLedger:
+    """
+    Append-only ledger of processed sales files.
+
+    Every processed file appends one JSON line holding its digest, its
+    own total and the running total in cents. Re-running with the same
+    ledger skips files that were already checkpointed, so only new
+    sales files are parsed. A torn last line left by a crash is cut off
+    when the ledger is loaded, so the next checkpoint starts on a new
+    line.
+    """
+
+    def __init__(self, file_path):
+        """
+        Args:
+            file_path (str): Path of the ledger (JSON lines) file.
+        """
+        self.file_path = file_path
+        self.entries = []
+        self.catalogue_digest = None
+        self._load()
+
+    def _load(self):
+        """Read existing checkpoints and cut off a torn last line."""
+        valid_size = 0
+        try:
+            with open(self.file_path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self.entries.append(entry)
+                    valid_size += len(line)
+        except FileNotFoundError:
+            return
+
+        if valid_size < os.path.getsize(self.file_path):
+            print(f"WARNING: Truncating torn ledger entry -> {self.file_path}")
+            os.truncate(self.file_path, valid_size)
+
+        if self.entries:
+            self.catalogue_digest = self.entries[0]["catalogue"]
+
+    @property
+    def running_cents(self):
+        """int: Running total of the last checkpoint."""
+        if not self.entries:
+            return 0
+        return self.entries[-1]["running_cents"]
+
+    def find(self, digest):
+        """
+        Args:
+            digest (str): Sales file digest.
+
+        Returns:
+            dict or None: Checkpoint for that file, if any.
+        """
+        for entry in self.entries:
+            if entry["digest"] == digest:
+                return entry
+        return None
+
+    def append(self, sales_file, digest, catalogue_digest, cents):
+        """
+        Checkpoint a processed sales file.
+
+        Args:
+            sales_file (str): Path of the processed file.
+            digest (str): Digest of the processed file.
+            catalogue_digest (str): Digest of the price catalogue.
+            cents (int): Total of this file in cents.
+
+        Returns:
+            dict: The appended checkpoint.
+        """
+        entry = {
+            "file": str(sales_file),
+            "digest": digest,
+            "catalogue": catalogue_digest,
+            "cents": cents,
+            "running_cents": self.running_cents + cents,
+        }
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.entries.append(entry)
+        self.catalogue_digest = catalogue_digest
+        return entry
+
+
+def format_results(total_cents, elapsed_time, diagnostics=None,
+                   ledger_lines=None):
     """
-    Write results to SalesResults.txt file.
+    Format the results written to SalesResults.txt.
 
     Args:
-        total_cost (float): Computed total cost.
+        total_cents (int): Computed total cost in cents.
         elapsed_time (float): Execution time.
+        diagnostics (Diagnostics): Warnings summary to append, if any.
+        ledger_lines (list): Ledger summary to append, if any.
+
+    Returns:
+        str: Results text.
     """
     output_text = (
         "SALES RESULTS\n"
         "-------------------------\n"
-        f"Total Sales: ${total_cost:,.2f}\n"
+        f"Total Sales: {format_cents(total_cents)}\n"
         f"Execution Time: {elapsed_time:.6f} seconds\n"
     )
 
-    print(output_text)
+    if ledger_lines:
+        output_text += (
+            "\nLEDGER\n"
+            "-------------------------\n"
+            + "\n".join(ledger_lines) + "\n"
+        )
+
+    if diagnostics is not None and diagnostics.total():
+        output_text += (
+            "\nWARNINGS\n"
+            "-------------------------\n"
+            + "\n".join(diagnostics.summary_lines()) + "\n"
+        )
+    return output_text
+
 
+def save_results(output_text):
+    """
+    Save formatted results to SalesResults.txt file.
+
+    Args:
+        output_text (str): Results text.
+    """
     try:
-        with open("SalesResults.txt", "w", encoding="utf-8") as file:
+        with open(RESULTS_FILE, "w", encoding="utf-8") as file:
             file.write(output_text)
     except OSError as exc:
         print(f"ERROR: Could not write results file -> {exc}")
 
 
+def load_sales(sales_file, metrics):
+    """
+    Load one sales file, exiting if it cannot be read.
+
+    Args:
+        sales_file (str): Path of the sales record.
+        metrics (Metrics): Times the read and counts files and sales.
+
+    Returns:
+        list: Sales transactions.
+    """
+    with metrics.span("read"):
+        sales_record = load_json_file(sales_file)
+    if sales_record is None:
+        print("ERROR: Cannot process files due to previous errors.")
+        sys.exit(1)
+
+    metrics.count("sales_files")
+    metrics.count("sales", len(sales_record))
+    return sales_record
+
+
+def sales_file_cents(sales_file, context):
+    """
+    Load one sales file and compute its total.
+
+    Args:
+        sales_file (str): Path of the sales record.
+        context (PricingContext): Prices, diagnostics and metrics.
+
+    Returns:
+        int: Total of the file in cents.
+    """
+    sales_record = load_sales(sales_file, context.metrics)
+    with context.metrics.span("compute"):
+        return compute_sales_cents(context.cents_dict, sales_record,
+                                   context.diagnostics)
+
+
+def process_with_ledger(ledger_file, price_file, sales_files, context):
+    """
+    Add only the sales files missing from the ledger to its running total.
+
+    Args:
+        ledger_file (str): Path of the ledger file.
+        price_file (str): Path of the price catalogue.
+        sales_files (list): Sales files to include.
+        context (PricingContext): Prices, diagnostics and metrics;
+            files found in the ledger are counted as cache hits.
+
+    Returns:
+        tuple: Running total in cents and the ledger summary lines.
+    """
+    ledger = SalesLedger(ledger_file)
+    catalogue_digest = file_digest(price_file)
+
+    if ledger.catalogue_digest not in (None, catalogue_digest):
+        print("ERROR: Ledger was built with a different price catalogue.")
+        sys.exit(1)
+
+    processed = skipped = 0
+    for sales_file in sales_files:
+        digest = file_digest(sales_file)
+        if ledger.find(digest) is not None:
+            skipped += 1
+            context.metrics.count("cache_hits")
+            continue
+
+        cents = sales_file_cents(sales_file, context)
+        ledger.append(sales_file, digest, catalogue_digest, cents)
+        processed += 1
+
+    lines = [
+        f"Checkpoints: {len(ledger.entries)}",
+        f"Processed: {processed}",
+        f"Skipped (already in ledger): {skipped}",
+    ]
+    return ledger.running_cents, lines
+
+
+def parse_arguments(argv):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list): Arguments without the program name.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="computeSales.py",
+        description="Compute total sales cost.",
+    )
+    parser.add_argument("price_file", help="priceCatalogue.json")
+    parser.add_argument(
+        "sales_files", nargs="+", metavar="sales_file",
+        help="salesRecord.json (several files are added together)",
+    )
+    parser.add_argument(
+        "--ledger", metavar="FILE",
+        help="append-only checkpoint file; files already recorded "
+             "in it are skipped and added from the running total",
+    )
+    parser.add_argument(
+        "--diagnostics", metavar="FILE",
+        help="write warning counters and samples to a JSON file",
+    )
+    parser.add_argument(
+        "--sample-limit", type=int, default=DEFAULT_SAMPLE_LIMIT,
+        help="warnings kept per category (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true",
+        help="echo sampled warnings to the console",
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="record the peak memory in the metrics file (slower)",
+    )
+    return parser.parse_args(argv)
+
+
 def main():
     """
     Main function.
     """
-    if len(sys.argv) != 3:
+    if len(sys.argv) < 3:
         print(
             "Usage: python computeSales.py "
-            "priceCatalogue.json salesRecord.json"
+            "priceCatalogue.json salesRecord.json [salesRecord.json ...] "
+            "[--ledger FILE] [--diagnostics FILE] [--sample-limit N] "
+            "[--verbose] [--trace-memory]"
         )
         sys.exit(1)
 
-    start_time = time.time()
+    args = parse_arguments(sys.argv[1:])
+
+    metrics = Metrics("computeSales", trace_memory=args.trace_memory)
+    metrics.start()
+
+    diagnostics = Diagnostics(args.sample_limit, args.verbose)
+    results = process_sales(args.price_file, args.sales_files, diagnostics,
+                            args.ledger, metrics)
+    print(results)
+
+    with metrics.span("write"):
+        save_results(results)
+
+    if args.diagnostics:
+        diagnostics.write_json(args.diagnostics)
+
+    metrics.stop()
+    metrics.write_json(metrics_path(RESULTS_FILE))
+
 
-    price_file = sys.argv[1]
-    sales_file = sys.argv[2]
+def process_sales(price_file, sales_files, diagnostics=None,
+                  ledger_file=None, metrics=None):
+    """
+    Compute the total of sales files and format the results.
+
+    Args:
+        price_file (str): Path of the price catalogue.
+        sales_files (list): Sales files added together.
+        diagnostics (Diagnostics): Collector for warnings.
+        ledger_file (str): Checkpoint ledger to use, if any.
+        metrics (Metrics): Started metrics receiving the phase timings;
+            a new one is started if omitted.
 
-    if not Path(price_file).is_file() or not Path(sales_file).is_file():
-        print("ERROR: One or both files do not exist.")
+    Returns:
+        str: Results text, as written to SalesResults.txt.
+    """
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+    if metrics is None:
+        metrics = Metrics("computeSales")
+        metrics.start()
+
+    if not all(Path(path).is_file() for path in [price_file, *sales_files]):
+        print("ERROR: One or more files do not exist.")
         sys.exit(1)
 
-    price_catalogue = load_json_file(price_file)
-    sales_record = load_json_file(sales_file)
+    with metrics.span("read"):
+        price_catalogue = load_json_file(price_file)
 
-    if price_catalogue is None or sales_record is None:
+    if price_catalogue is None:
         print("ERROR: Cannot process files due to previous errors.")
         sys.exit(1)
 
-    price_dict = build_price_dictionary(price_catalogue)
-    total_cost = compute_sales_total(price_dict, sales_record)
-
-    elapsed_time = time.time() - start_time
+    with metrics.span("parse"):
+        cents_dict = build_cents_dictionary(price_catalogue, diagnostics)
+    metrics.count("products", len(cents_dict))
 
-    write_results(total_cost, elapsed_time)
+    context = PricingContext(cents_dict, diagnostics, metrics)
+    if ledger_file:
+        total_cents, ledger_lines = process_with_ledger(
+            ledger_file, price_file, sales_files, context
+        )
+    else:
+        total_cents, ledger_lines = 0, None
+        for sales_file in sales_files:
+            total_cents += sales_file_cents(sales_file, context)
+    metrics.count("warnings", diagnostics.total())
+
+    with metrics.span("format"):
+        return format_results(total_cents, metrics.elapsed_seconds(),
+                              diagnostics, ledger_lines)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+"""Unit tests for the computeSales checkpoint ledger."""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# pylint: disable=wrong-import-position
+from computeSales import SalesLedger  # noqa: E402
+
+
+class TestSalesLedger(unittest.TestCase):
+    """Test cases for SalesLedger class."""
+
+    def setUp(self):
+        """Create a ledger path in a temporary directory."""
+        # Must outlive setUp; removed by addCleanup.
+        # pylint: disable-next=consider-using-with
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "ledger.jsonl")
+
+    def test_append_and_reload(self):
+        """Checkpoints survive a reload with their running total."""
+        ledger = SalesLedger(self.path)
+        ledger.append("a.json", "A", "CAT", 150)
+        ledger.append("b.json", "B", "CAT", 250)
+
+        reloaded = SalesLedger(self.path)
+        self.assertEqual(reloaded.running_cents, 400)
+        self.assertEqual(reloaded.catalogue_digest, "CAT")
+        self.assertIsNotNone(reloaded.find("B"))
+
+    def test_torn_tail_truncated(self):
+        """Negative test: a torn last line is cut off, not appended to."""
+        SalesLedger(self.path).append("a.json", "A", "CAT", 150)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write('{"file": "x", "dig')
+
+        with redirect_stdout(StringIO()):
+            ledger = SalesLedger(self.path)
+        self.assertEqual(len(ledger.entries), 1)
+        ledger.append("b.json", "B", "CAT", 250)
+
+        reloaded = SalesLedger(self.path)
+        self.assertEqual([entry["digest"] for entry in reloaded.entries],
+                         ["A", "B"])
+        self.assertEqual(reloaded.running_cents, 400)
@@ -0,0 +1,387 @@
+"""Load test of the reservation models on seeded data.
+
+Seeds hotels, customers and reservations in a temporary directory, then
+replays a mix of operations with one or more worker threads and reports
+throughput, latency percentiles, bytes read and written per operation
+and peak memory. The data/ folder is never touched.
+
+Usage (from the 6.2 folder):
+    python -m benchmarks.load_test [--hotels N] [--customers N]
+        [--reservations N] [--operations N] [--workers 1 8]
+        [--mix create=1,display=5,reserve=3,cancel=1]
+        [--backend json|sharded|sqlite] [--shards N] [--trace-memory]
+"""
+
+import argparse
+import os
+import random
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import (Dict, Iterator, List, NamedTuple, Optional, Sequence,
+                    Tuple)
+
+from models.customer import CUSTOMER_FILE, Customer
+from models.hotel import HOTEL_FILE, Hotel
+from models.reservation import RESERVATION_FILE, Reservation
+from service.loadgen import percentile
+from storage.backend import JsonBackend
+from storage.file_manager import FileManager
+from storage.migrate import migrate
+from storage.repository import REPOSITORY
+from storage.shards import DEFAULT_SHARDS, ShardedJsonBackend
+from storage.sqlite_backend import SqliteBackend
+
+
+OPERATIONS = ("create", "display", "reserve", "cancel")
+DEFAULT_MIX = {"create": 0.1, "display": 0.5, "reserve": 0.3, "cancel": 0.1}
+FIRST_NIGHT = date(2030, 1, 1)
+NIGHTS = 365
+
+
+class LoadTestConfig(NamedTuple):
+    """Options of a benchmark run, one field per command line option."""
+
+    hotels: int = 100
+    customers: int = 1000
+    reservations: int = 10000
+    operations: int = 2000
+    workers: Sequence[int] = (1, 4)
+    mix: Optional[Dict[str, float]] = None
+    backend: str = "json"
+    shards: int = DEFAULT_SHARDS
+    trace_memory: bool = False
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "create=1,display=5" into operation fractions."""
+    weights = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'.")
+        weights[name] = float(weight)
+
+    total = sum(weights.values())
+    if total <= 0 or min(weights.values()) < 0:
+        raise ValueError("Operation weights must be positive.")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def seed(directory: str, hotels: int, customers: int,
+         reservations: int, seed_value: int = 0) -> List[str]:
+    """Write the JSON collections under directory/data.
+
+    Reservations are dated stays, so hotels keep every room for good.
+    Returns the reservation IDs.
+    """
+    rng = random.Random(seed_value)
+    data = os.path.join(directory, "data")
+    os.makedirs(data, exist_ok=True)
+
+    FileManager.save_data(os.path.join(directory, HOTEL_FILE), [
+        Hotel(f"H{number}", f"Hotel {number}", f"L{number % 10}",
+              1000).to_dict()
+        for number in range(hotels)
+    ])
+    FileManager.save_data(os.path.join(directory, CUSTOMER_FILE), [
+        Customer(f"C{number}", f"Customer {number}",
+                 f"c{number}@bench.com", str(number)).to_dict()
+        for number in range(customers)
+    ])
+
+    records = []
+    for _ in range(reservations):
+        check_in = FIRST_NIGHT + timedelta(rng.randrange(NIGHTS))
+        records.append({
+            "reservation_id": str(
+                uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "customer_id": f"C{rng.randrange(customers)}",
+            "hotel_id": f"H{rng.randrange(hotels)}",
+            "check_in": check_in.isoformat(),
+            "check_out": (check_in + timedelta(rng.randint(1, 7)))
+            .isoformat(),
+        })
+    FileManager.save_data(os.path.join(directory, RESERVATION_FILE), records)
+    return [record["reservation_id"] for record in records]
+
+
+@contextmanager
+def working_directory(directory: str) -> Iterator[None]:
+    """Run the models against directory/data instead of data/."""
+    previous = os.getcwd()
+    os.chdir(directory)
+    REPOSITORY.invalidate()
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+        REPOSITORY.invalidate()
+
+
+@contextmanager
+def storage_backend(name: str, shards: int) -> Iterator[None]:
+    """Serve the seeded collections from the named backend."""
+    if name == "json":
+        yield
+        return
+
+    if name == "sharded":
+        backend = ShardedJsonBackend(shards)
+    elif name == "sqlite":
+        backend = SqliteBackend("data/benchmark.db")
+        migrate(backend)
+    else:
+        raise ValueError(f"Unknown backend '{name}'.")
+
+    REPOSITORY.use_backend(backend)
+    try:
+        yield
+    finally:
+        REPOSITORY.use_backend(JsonBackend())
+        backend.close()
+
+
+def io_counters() -> Tuple[Optional[int], Optional[int]]:
+    """Return bytes read and written by the process so far (Linux)."""
+    try:
+        with open("/proc/self/io", "r", encoding="utf-8") as file:
+            fields = dict(line.split(": ") for line in file)
+    except OSError:
+        return None, None
+    return int(fields["rchar"]), int(fields["wchar"])
+
+
+# Worker threads only need run(); the rest is shared state.
+# pylint: disable-next=too-few-public-methods
+class Workload:
+    """Operations shared by the worker threads of one run."""
+
+    def __init__(self, hotels: int, customers: int,
+                 reservation_ids: List[str]) -> None:
+        self.hotels = hotels
+        self.customers = customers
+        self._reservation_ids = list(reservation_ids)
+        self._guard = threading.Lock()
+        self._created = 0
+
+    def _take_reservation(self, rng: random.Random) -> Optional[str]:
+        with self._guard:
+            if not self._reservation_ids:
+                return None
+            ids = self._reservation_ids
+            position = rng.randrange(len(ids))
+            ids[position], ids[-1] = ids[-1], ids[position]
+            return ids.pop()
+
+    def run(self, operation: str, rng: random.Random) -> None:
+        """Run one operation; ValueError reports a business failure."""
+        if operation == "create":
+            with self._guard:
+                self._created += 1
+                number = self._created
+            Customer.create_customer(Customer(
+                f"NEW{number}", "New", f"new{number}@bench.com", "0"))
+        elif operation == "display":
+            Hotel.display_hotel(f"H{rng.randrange(self.hotels)}")
+        elif operation == "reserve":
+            check_in = FIRST_NIGHT + timedelta(rng.randrange(NIGHTS))
+            reservation_id = Reservation.create_reservation(
+                f"C{rng.randrange(self.customers)}",
+                f"H{rng.randrange(self.hotels)}",
+                check_in, check_in + timedelta(rng.randint(1, 7)),
+            )
+            with self._guard:
+                self._reservation_ids.append(reservation_id)
+        else:
+            reservation_id = self._take_reservation(rng)
+            if reservation_id is None:
+                raise ValueError("Reservation not found.")
+            Reservation.cancel_reservation(reservation_id)
+
+
+class Measurements:
+    """Latencies and failures recorded by the worker threads."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self._guard = threading.Lock()
+
+    def record(self, operation: str, seconds: float, failed: bool) -> None:
+        """Record one operation."""
+        with self._guard:
+            self.latencies.append(seconds)
+            if failed:
+                self.errors[operation] += 1
+
+    def failures(self) -> int:
+        """Return the number of failed operations."""
+        return sum(self.errors.values())
+
+
+def _worker(workload: Workload, operations: int, mix: Dict[str, float],
+            seed_value: int, measurements: Measurements) -> None:
+    """Run operations drawn from the mix and record their outcome.
+
+    Any exception counts as a failure of its operation, so a crash is
+    reported instead of silently ending the thread.
+    """
+    rng = random.Random(seed_value)
+    names, weights = list(mix), list(mix.values())
+    for operation in rng.choices(names, weights, k=operations):
+        started = time.perf_counter()
+        try:
+            workload.run(operation, rng)
+            failed = False
+        except Exception:  # pylint: disable=broad-except
+            failed = True
+        measurements.record(operation, time.perf_counter() - started,
+                            failed)
+
+
+def _run_threads(workload: Workload, workers: int, operations: int,
+                 mix: Dict[str, float]) -> Measurements:
+    """Split operations between worker threads and wait for them."""
+    measurements = Measurements()
+    threads = [
+        threading.Thread(target=_worker, args=(
+            workload, operations // workers
+            + (number < operations % workers), mix, number, measurements,
+        ))
+        for number in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return measurements
+
+
+def _per_operation(before: Optional[int], after: Optional[int],
+                   count: int) -> Optional[float]:
+    """Return the bytes counted per operation, or None if unknown."""
+    if before is None or after is None or not count:
+        return None
+    return (after - before) / count
+
+
+def run_workload(workload: Workload, workers: int,
+                 config: LoadTestConfig) -> Dict:
+    """Run the configured operations with some workers and measure them."""
+    if config.trace_memory:
+        tracemalloc.start()
+    read_before, written_before = io_counters()
+    started = time.perf_counter()
+    measurements = _run_threads(workload, workers, config.operations,
+                                config.mix or DEFAULT_MIX)
+    elapsed = time.perf_counter() - started
+    read_after, written_after = io_counters()
+    traced_peak = None
+    if config.trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies = measurements.latencies
+    count = len(latencies)
+    return {
+        "workers": workers,
+        "operations": count,
+        "errors": measurements.failures(),
+        "errors_by_operation": dict(measurements.errors),
+        "seconds": elapsed,
+        "operations_per_second": count / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "read_per_operation": _per_operation(read_before, read_after, count),
+        "written_per_operation": _per_operation(written_before,
+                                                written_after, count),
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "traced_peak_bytes": traced_peak,
+    }
+
+
+def run_benchmark(config: LoadTestConfig = LoadTestConfig()) -> List[Dict]:
+    """Run the workload once per worker count and return the reports.
+
+    The data is seeded once in a temporary directory and each run gets
+    a fresh copy of it.
+    """
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="reservation-bench-") as tmp:
+        seeded = os.path.join(tmp, "seed")
+        reservation_ids = seed(seeded, config.hotels, config.customers,
+                               config.reservations)
+
+        for count in config.workers:
+            run_directory = os.path.join(tmp, f"run-{count}")
+            shutil.copytree(seeded, run_directory)
+            with working_directory(run_directory), \
+                    storage_backend(config.backend, config.shards):
+                workload = Workload(config.hotels, config.customers,
+                                    reservation_ids)
+                report = run_workload(workload, count, config)
+            report["backend"] = config.backend
+            reports.append(report)
+    return reports
+
+
+def _bytes(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value / 1024:.1f} KiB"
+
+
+def print_report(reports: List[Dict]) -> None:
+    """Print one block per run."""
+    print("Load Test Results")
+    print("-----------------")
+    for report in reports:
+        print(f"{report['backend']} backend, {report['workers']} workers: "
+              f"{report['operations']} operations "
+              f"({report['errors']} errors)")
+        for operation, errors in sorted(report["errors_by_operation"].items()):
+            print(f"  {operation} failures: {errors}")
+        print(f"  Throughput: {report['operations_per_second']:.1f} ops/sec")
+        print(f"  Latency p50/p95/p99: {report['p50_ms']:.3f} / "
+              f"{report['p95_ms']:.3f} / {report['p99_ms']:.3f} ms")
+        print(f"  Read per op: {_bytes(report['read_per_operation'])}, "
+              f"written per op: {_bytes(report['written_per_operation'])}")
+        print(f"  Peak RSS: {report['peak_rss_kib'] / 1024:.1f} MiB")
+        if report["traced_peak_bytes"] is not None:
+            print(f"  Traced peak: "
+                  f"{report['traced_peak_bytes'] / 2 ** 20:.1f} MiB")
+
+
+def main() -> None:
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=100)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--reservations", type=int, default=10000)
+    parser.add_argument("--operations", type=int, default=2000,
+                        help="operations per run, split between workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--backend", default="json",
+                        choices=("json", "sharded", "sqlite"))
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report the tracemalloc peak (slower)")
+    args = parser.parse_args()
+
+    print_report(run_benchmark(LoadTestConfig(
+        args.hotels, args.customers, args.reservations, args.operations,
+        args.workers, args.mix, args.backend, args.shards,
+        args.trace_memory,
+    )))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Memory used by reservations in each in-memory representation.
+
+Usage:
+    python -m benchmarks.memory_footprint [--count N] [--customers N]
+                                          [--hotels N]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from models.columnar import ReservationRecord, ReservationTable
+
+
+def generate(count: int, customers: int, hotels: int) -> Iterator[Dict]:
+    """Yield reservations shaped like the ones loaded from JSON.
+
+    Every string is a new object, as it is after ``json.load``.
+    """
+    rng = random.Random(0)
+    first = date(2030, 1, 1)
+    for number in range(count):
+        record = {
+            "reservation_id": str(
+                uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "customer_id": f"C{rng.randrange(customers)}",
+            "hotel_id": f"H{rng.randrange(hotels)}",
+        }
+        if number % 2:
+            check_in = first + timedelta(rng.randrange(365))
+            record["check_in"] = check_in.isoformat()
+            record["check_out"] = (check_in + timedelta(3)).isoformat()
+        yield record
+
+
+def _dicts(records: Iterator[Dict]) -> Dict[str, Dict]:
+    return {record["reservation_id"]: record for record in records}
+
+
+def _tuples(records: Iterator[Dict]) -> List[ReservationRecord]:
+    return [ReservationRecord.from_dict(record) for record in records]
+
+
+def _table(records: Iterator[Dict]) -> ReservationTable:
+    return ReservationTable.from_records(records)
+
+
+REPRESENTATIONS: Tuple[Tuple[str, Callable], ...] = (
+    ("dict table (current)", _dicts),
+    ("ReservationRecord list", _tuples),
+    ("ReservationTable", _table),
+)
+
+
+def measure(build: Callable, count: int, customers: int,
+            hotels: int) -> int:
+    """Return the bytes still allocated after building a representation."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build(generate(count, customers, hotels))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def main() -> None:
+    """Measure every representation and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--hotels", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Memory for {args.count} reservations")
+    print("-" * 56)
+    for name, build in REPRESENTATIONS:
+        used = measure(build, args.count, args.customers, args.hotels)
+        print(f"{name:<24} {used / 2 ** 20:10.1f} MiB "
+              f"{used / args.count:8.1f} B/reservation")
+
+
+if __name__ == "__main__":
+    main()
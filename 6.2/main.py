@@ -1,4 +1,71 @@
-"""Main execution file."""
+"""Main execution file.
+
+Usage:
+    python main.py [serve] [--host HOST] [--port PORT] [--sqlite DB]
+                           [--shards N] [--columnar]
+    python main.py loadgen [--host HOST] [--port PORT] [--clients N]
+                           [--requests N] [--hotels N]
+"""
+
+import argparse
+import asyncio
+
+from models.columnar import ReservationLayout
+from models.reservation import RESERVATION_FILE
+from service.loadgen import print_report, run_load
+from service.server import DEFAULT_HOST, DEFAULT_PORT, ReservationService
+from storage.repository import REPOSITORY
+from storage.shards import ShardedJsonBackend
+from storage.sqlite_backend import SqliteBackend
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Reservation System")
+    parser.add_argument("command", nargs="?", default="serve",
+                        choices=("serve", "loadgen"))
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sqlite", metavar="DB",
+                        help="serve from an SQLite database")
+    parser.add_argument("--shards", type=int, metavar="N",
+                        help="serve from JSON files split into N shards")
+    parser.add_argument("--columnar", action="store_true",
+                        help="keep reservations in columns in memory")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay", type=float, default=0.002,
+                        help="seconds to wait for more requests")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500,
+                        help="requests sent by each load client")
+    parser.add_argument("--hotels", type=int, default=10)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the service or the load generator."""
+    args = parse_arguments()
+
+    if args.command == "loadgen":
+        print_report(asyncio.run(run_load(
+            args.host, args.port, args.clients, args.requests, args.hotels
+        )))
+        return
+
+    if args.sqlite:
+        REPOSITORY.use_backend(SqliteBackend(args.sqlite))
+    elif args.shards:
+        REPOSITORY.use_backend(ShardedJsonBackend(args.shards))
+    if args.columnar:
+        REPOSITORY.use_layout(RESERVATION_FILE, ReservationLayout)
+
+    service = ReservationService(args.host, args.port,
+                                 args.max_batch, args.max_delay)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        print("Reservation System Stopped")
+
 
 if __name__ == "__main__":
-    print("Reservation System Running")
+    main()
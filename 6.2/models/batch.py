@@ -0,0 +1,37 @@
+"""Helpers shared by the batch model operations."""
+
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+def valid_items(items: Iterable[Any], kinds: Tuple[type, ...]) -> List:
+    """Return the items that are instances of one of the kinds."""
+    return [item for item in items if isinstance(item, kinds)]
+
+
+def run_batch(items: Iterable[Any], create: Callable[[Any], str],
+              kinds: Tuple[type, ...] = (dict,)) -> Dict[str, List]:
+    """Create every item, collecting the failures per item.
+
+    Returns a report with the IDs of the created items and, for each
+    failed item, its position in the batch and the error message. An
+    item that is not an instance of ``kinds`` is reported as failed
+    without calling ``create``. A failed item leaves the others
+    unaffected.
+    """
+    report: Dict[str, List] = {"created": [], "failed": []}
+    names = " or ".join(kind.__name__ for kind in kinds)
+
+    for index, item in enumerate(items):
+        if not isinstance(item, kinds):
+            report["failed"].append({
+                "index": index,
+                "error": f"Item must be a {names}, "
+                         f"not {type(item).__name__}.",
+            })
+            continue
+        try:
+            report["created"].append(create(item))
+        except (KeyError, TypeError, ValueError) as error:
+            report["failed"].append({"index": index, "error": str(error)})
+
+    return report
@@ -0,0 +1,368 @@
+"""Compact record type and column-oriented table for reservations.
+
+By default the repository keeps reservations as dictionaries. Opt in
+to the column layout with::
+
+    REPOSITORY.use_layout(RESERVATION_FILE, ReservationLayout)
+
+or ``python main.py --columnar``. benchmarks/memory_footprint.py
+measures both representations.
+"""
+
+import uuid
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from datetime import date
+from itertools import chain
+from typing import (Any, Callable, Dict, Iterable, Iterator, List,
+                    NamedTuple, Optional)
+
+
+class ReservationRecord(NamedTuple):
+    """One reservation as an immutable tuple instead of a dict."""
+
+    reservation_id: str
+    customer_id: str
+    hotel_id: str
+    check_in: Optional[str] = None
+    check_out: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, record: Dict) -> "ReservationRecord":
+        """Build a record from its JSON dictionary."""
+        return cls(record["reservation_id"], record["customer_id"],
+                   record["hotel_id"], record.get("check_in"),
+                   record.get("check_out"))
+
+    def to_dict(self) -> Dict:
+        """Convert to the JSON dictionary format."""
+        record = {
+            "reservation_id": self.reservation_id,
+            "customer_id": self.customer_id,
+            "hotel_id": self.hotel_id,
+        }
+        if self.check_in is not None:
+            record["check_in"] = self.check_in
+            record["check_out"] = self.check_out
+        return record
+
+
+# A string interner needs a single lookup method.
+# pylint: disable-next=too-few-public-methods
+class _Interner:
+    """Maps repeated strings to small integer codes."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        """Return the code of a value, assigning one if needed."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+# One attribute per column and per index.
+# pylint: disable-next=too-many-instance-attributes
+class ReservationTable:
+    """Reservations stored column by column.
+
+    UUID reservation IDs take 16 bytes each in one bytearray, other IDs
+    are kept aside. Customer and hotel IDs are interned and stored as
+    4-byte codes, dates as 4-byte day ordinals (0 when undated).
+
+    IDs are found through a sorted ``array("Q")`` holding the first four
+    bytes of each UUID next to its row, searched with bisect. Rows
+    appended since the last merge wait in a small dict and are merged
+    into the array once they reach an eighth of it. Per-customer and
+    per-hotel row arrays serve ``by_customer()`` and ``by_hotel()``.
+    Deleted rows are cleared in the ``_alive`` map, leaving their
+    columns untouched, and are skipped until ``compact()`` is called.
+    """
+
+    ID_SIZE = 16
+    MERGE_MIN = 1024
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty every column and index."""
+        self._ids = bytearray()
+        self._text_ids: Dict[str, int] = {}
+        self._text_rows: Dict[int, str] = {}
+        self._index = array("Q")
+        self._recent: Dict[bytes, int] = {}
+        self._customers = array("I")
+        self._hotels = array("I")
+        self._check_in = array("i")
+        self._check_out = array("i")
+        self._alive = bytearray()
+        self._customer_codes = _Interner()
+        self._hotel_codes = _Interner()
+        self._customer_rows: List[array] = []
+        self._hotel_rows: List[array] = []
+        self._count = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "ReservationTable":
+        """Build a table from JSON dictionaries."""
+        table = cls()
+        for record in records:
+            table.append(record)
+        table._merge()
+        return table
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def dead_rows(self) -> int:
+        """Return how many deleted rows ``compact()`` would drop."""
+        return len(self._alive) - self._count
+
+    @staticmethod
+    def _uuid_bytes(reservation_id: str) -> Optional[bytes]:
+        """Return the 16 bytes of a UUID ID, or None for other IDs.
+
+        Only the canonical lowercase hyphenated text counts as a UUID;
+        other spellings are kept as text so they come back unchanged.
+        """
+        try:
+            value = uuid.UUID(reservation_id)
+        except (AttributeError, TypeError, ValueError):
+            return None
+        return value.bytes if str(value) == reservation_id else None
+
+    @staticmethod
+    def _ordinal(value: Optional[str]) -> int:
+        return date.fromisoformat(value).toordinal() if value else 0
+
+    @staticmethod
+    def _add_row(rows: List[array], code: int, row: int) -> None:
+        """Record a row under the code of a customer or hotel."""
+        if code == len(rows):
+            rows.append(array("I"))
+        rows[code].append(row)
+
+    def _raw_id(self, row: int) -> bytes:
+        """Return the 16 ID bytes stored in a row."""
+        start = row * self.ID_SIZE
+        return bytes(self._ids[start:start + self.ID_SIZE])
+
+    def _merge(self) -> None:
+        """Move the recently appended IDs into the sorted index."""
+        if self._recent:
+            self._index = array("Q", sorted(chain(self._index, (
+                int.from_bytes(raw[:4], "big") << 32 | row
+                for raw, row in self._recent.items()
+            ))))
+            self._recent.clear()
+
+    def _find_uuid(self, raw_id: bytes) -> Optional[int]:
+        """Return the live row holding a UUID, or None."""
+        row = self._recent.get(raw_id)
+        if row is not None:
+            return row
+
+        prefix = int.from_bytes(raw_id[:4], "big")
+        position = bisect_left(self._index, prefix << 32)
+        while position < len(self._index):
+            entry = self._index[position]
+            if entry >> 32 != prefix:
+                break
+            row = entry & 0xFFFFFFFF
+            if self._alive[row] and self._raw_id(row) == raw_id:
+                return row
+            position += 1
+        return None
+
+    def append(self, record: Dict) -> int:
+        """Add a reservation and return its row number.
+
+        Raises:
+            ValueError: If the reservation ID is already stored.
+        """
+        reservation_id = record["reservation_id"]
+        if self.find(reservation_id) is not None:
+            raise ValueError(f"Reservation {reservation_id} exists.")
+
+        row = len(self._alive)
+        raw_id = self._uuid_bytes(reservation_id)
+        if raw_id is None:
+            self._text_ids[reservation_id] = row
+            self._text_rows[row] = reservation_id
+            self._ids += bytes(self.ID_SIZE)
+        else:
+            self._ids += raw_id
+            self._recent[raw_id] = row
+
+        customer = self._customer_codes.code(record["customer_id"])
+        hotel = self._hotel_codes.code(record["hotel_id"])
+        self._customers.append(customer)
+        self._hotels.append(hotel)
+        self._add_row(self._customer_rows, customer, row)
+        self._add_row(self._hotel_rows, hotel, row)
+        self._check_in.append(self._ordinal(record.get("check_in")))
+        self._check_out.append(self._ordinal(record.get("check_out")))
+        self._alive.append(1)
+        self._count += 1
+
+        if len(self._recent) >= max(self.MERGE_MIN, len(self._index) // 8):
+            self._merge()
+        return row
+
+    def find(self, reservation_id: str) -> Optional[int]:
+        """Return the row of a live reservation, or None."""
+        raw_id = self._uuid_bytes(reservation_id)
+        if raw_id is None:
+            return self._text_ids.get(reservation_id)
+        return self._find_uuid(raw_id)
+
+    def row(self, row: int) -> ReservationRecord:
+        """Return the reservation stored in a row."""
+        if row in self._text_rows:
+            reservation_id = self._text_rows[row]
+        else:
+            reservation_id = str(uuid.UUID(bytes=self._raw_id(row)))
+        check_in, check_out = self._check_in[row], self._check_out[row]
+        return ReservationRecord(
+            reservation_id,
+            self._customer_codes.values[self._customers[row]],
+            self._hotel_codes.values[self._hotels[row]],
+            date.fromordinal(check_in).isoformat() if check_in else None,
+            date.fromordinal(check_out).isoformat() if check_out else None,
+        )
+
+    def get(self, reservation_id: str) -> Optional[ReservationRecord]:
+        """Return a reservation by ID, or None."""
+        row = self.find(reservation_id)
+        return None if row is None else self.row(row)
+
+    def delete(self, reservation_id: str) -> bool:
+        """Remove a reservation; return False if it is missing."""
+        row = self.find(reservation_id)
+        if row is None:
+            return False
+        if row in self._text_rows:
+            del self._text_ids[self._text_rows.pop(row)]
+        else:
+            self._recent.pop(self._raw_id(row), None)
+        self._alive[row] = 0
+        self._count -= 1
+        return True
+
+    def _matching(self, rows: List[array], interner: _Interner,
+                  value: str) -> List[ReservationRecord]:
+        """Return the live rows recorded under a customer or hotel."""
+        code = interner.codes.get(value)
+        if code is None:
+            return []
+        return [self.row(row) for row in rows[code] if self._alive[row]]
+
+    def by_customer(self, customer_id: str) -> List[ReservationRecord]:
+        """Return the reservations of a customer."""
+        return self._matching(self._customer_rows, self._customer_codes,
+                              customer_id)
+
+    def by_hotel(self, hotel_id: str) -> List[ReservationRecord]:
+        """Return the reservations of a hotel."""
+        return self._matching(self._hotel_rows, self._hotel_codes,
+                              hotel_id)
+
+    def records(self) -> Iterator[Dict]:
+        """Yield the live reservations as JSON dictionaries."""
+        for row, alive in enumerate(self._alive):
+            if alive:
+                yield self.row(row).to_dict()
+
+    def compact(self) -> None:
+        """Drop deleted rows."""
+        live = list(self.records())
+        self._reset()
+        for record in live:
+            self.append(record)
+        self._merge()
+
+
+class _ColumnIndex:
+    """Repository index answered by the rows of a ReservationTable.
+
+    The table keeps its customer and hotel rows up to date itself, so
+    ``add``, ``remove`` and ``rebuild`` have nothing to do.
+    """
+
+    def __init__(self, lookup: Callable[[Any], List[ReservationRecord]]):
+        self._lookup = lookup
+
+    def add(self, key: Any, record: Dict) -> None:
+        """Nothing to do; the table indexes its rows."""
+
+    def remove(self, key: Any, record: Dict) -> None:
+        """Nothing to do; the table indexes its rows."""
+
+    def rebuild(self, items: Iterable) -> None:
+        """Nothing to do; the table indexes its rows."""
+
+    def lookup(self, value: Any) -> List[str]:
+        """Return the IDs of the reservations with the value."""
+        return [record.reservation_id for record in self._lookup(value)]
+
+
+class ReservationLayout(MutableMapping):
+    """Repository table keeping reservations in a ReservationTable.
+
+    Maps reservation IDs to records like the default dict layout, but
+    every record read is a new dictionary built from the columns, so a
+    changed record must be assigned back to be stored. Storing a record
+    again moves it to the end of the table. The table is compacted once
+    deleted rows outnumber live ones.
+    """
+
+    def __init__(self) -> None:
+        self.table = ReservationTable()
+
+    def __getitem__(self, reservation_id: str) -> Dict:
+        record = self.table.get(reservation_id)
+        if record is None:
+            raise KeyError(reservation_id)
+        return record.to_dict()
+
+    def __setitem__(self, reservation_id: str, record: Dict) -> None:
+        if record["reservation_id"] != reservation_id:
+            raise ValueError("Key does not match the reservation ID.")
+        self._delete(reservation_id)
+        self.table.append(record)
+
+    def __delitem__(self, reservation_id: str) -> None:
+        if not self._delete(reservation_id):
+            raise KeyError(reservation_id)
+
+    def _delete(self, reservation_id: str) -> bool:
+        """Delete a reservation, compacting the table when due."""
+        deleted = self.table.delete(reservation_id)
+        if (deleted and self.table.dead_rows
+                > len(self.table) + ReservationTable.MERGE_MIN):
+            self.table.compact()
+        return deleted
+
+    def __iter__(self) -> Iterator[str]:
+        return (record["reservation_id"] for record in self.table.records())
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def values(self) -> List[Dict]:
+        """Return every record, reading each row once."""
+        return list(self.table.records())
+
+    def index(self, field: str) -> Optional[_ColumnIndex]:
+        """Return the table's own index of a field, if it has one."""
+        lookups = {"customer_id": self.table.by_customer,
+                   "hotel_id": self.table.by_hotel}
+        lookup = lookups.get(field)
+        return None if lookup is None else _ColumnIndex(lookup)
@@ -1,15 +1,24 @@
 """Customer model."""
 
-from typing import Dict
-from storage.file_manager import FileManager
+import os
+from typing import Dict, Iterable, Union
+from models.batch import run_batch
+from storage.locks import LOCKS
+from storage.repository import REPOSITORY
 
 
 CUSTOMER_FILE = "data/customers.json"
+CUSTOMER_LOCK = os.path.join(os.path.dirname(CUSTOMER_FILE), ".locks",
+                             "customers.lock")
+
+REPOSITORY.register(CUSTOMER_FILE, "customer_id")
 
 
 class Customer:
     """Represents a customer."""
 
+    __slots__ = ("customer_id", "name", "email", "phone")
+
     def __init__(self, customer_id: str,
                  name: str, email: str, phone: str) -> None:
 
@@ -22,28 +31,50 @@ class Customer:
         self.phone = phone
 
     def to_dict(self) -> Dict:
-        """Convert object to dictionary."""
-        return self.__dict__
+        """Convert object to a new dictionary."""
+        return {field: getattr(self, field) for field in self.__slots__}
 
     @staticmethod
     def create_customer(customer: "Customer") -> None:
-        """Create new customer."""
-        customers = FileManager.load_data(CUSTOMER_FILE)
+        """Create new customer.
+
+        The ID check and the write happen while CUSTOMER_LOCK is held,
+        so two threads or processes cannot create the same customer.
+        """
+        with LOCKS.hold(CUSTOMER_LOCK), REPOSITORY.batch():
+            Customer._insert(customer)
+
+    @staticmethod
+    def create_customers(
+            customers: Iterable[Union["Customer", Dict]]) -> Dict:
+        """Create many customers with a single write.
+
+        Items may be Customer objects or dictionaries of Customer
+        arguments. Returns the report described in
+        models.batch.run_batch.
+        """
+        with LOCKS.hold(CUSTOMER_LOCK), REPOSITORY.batch():
+            return run_batch(customers, Customer._insert,
+                             (Customer, dict))
+
+    @staticmethod
+    def _insert(customer: Union["Customer", Dict]) -> str:
+        """Validate and store one customer, returning its ID."""
+        if isinstance(customer, dict):
+            customer = Customer(**customer)
 
-        for item in customers:
-            if item["customer_id"] == customer.customer_id:
-                raise ValueError("Customer ID already exists.")
+        if REPOSITORY.get(CUSTOMER_FILE, customer.customer_id) is not None:
+            raise ValueError("Customer ID already exists.")
 
-        customers.append(customer.to_dict())
-        FileManager.save_data(CUSTOMER_FILE, customers)
+        REPOSITORY.insert(CUSTOMER_FILE, customer.to_dict())
+        return customer.customer_id
 
     @staticmethod
     def display_customer(customer_id: str) -> Dict:
         """Return customer info."""
-        customers = FileManager.load_data(CUSTOMER_FILE)
+        customer = REPOSITORY.get(CUSTOMER_FILE, customer_id)
 
-        for customer in customers:
-            if customer["customer_id"] == customer_id:
-                return customer
+        if customer is None:
+            raise ValueError("Customer not found.")
 
-        raise ValueError("Customer not found.")
+        return dict(customer)
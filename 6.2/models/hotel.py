@@ -1,15 +1,27 @@
 """Hotel model."""
 
-from typing import Dict
-from storage.file_manager import FileManager
+import os
+import zlib
+from contextlib import ExitStack
+from typing import Any, ContextManager, Dict, Iterable, List, Union
+from models.batch import run_batch, valid_items
+from storage.locks import LOCKS
+from storage.repository import REPOSITORY
 
 
 HOTEL_FILE = "data/hotels.json"
+LOCK_DIR = os.path.join(os.path.dirname(HOTEL_FILE), ".locks")
+LOCK_STRIPES = 64
+
+REPOSITORY.register(HOTEL_FILE, "hotel_id", indexes=("location",))
 
 
 class Hotel:
     """Represents a hotel entity."""
 
+    __slots__ = ("hotel_id", "name", "location", "total_rooms",
+                 "available_rooms")
+
     def __init__(self, hotel_id: str, name: str,
                  location: str, total_rooms: int) -> None:
 
@@ -23,50 +35,137 @@ class Hotel:
         self.available_rooms = total_rooms
 
     def to_dict(self) -> Dict:
-        """Convert object to dictionary."""
-        return self.__dict__
+        """Convert object to a new dictionary."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @staticmethod
+    def lock(hotel_id: Any) -> ContextManager[None]:
+        """Return the thread and process lock guarding one hotel.
+
+        Hotels are spread over LOCK_STRIPES lock files, so bookings for
+        different hotels rarely wait for each other.
+        """
+        return LOCKS.hold(Hotel._lock_path(hotel_id))
+
+    @staticmethod
+    def lock_many(hotel_ids: Iterable[Any]) -> ContextManager[None]:
+        """Return one lock covering several hotels.
+
+        Stripes are taken in a fixed order so two batches can never
+        wait for each other.
+        """
+        paths = sorted({Hotel._lock_path(h) for h in hotel_ids})
+        stack = ExitStack()
+        for path in paths:
+            stack.enter_context(LOCKS.hold(path))
+        return stack
+
+    @staticmethod
+    def _lock_path(hotel_id: Any) -> str:
+        """Return the lock file of the stripe a hotel belongs to.
+
+        IDs are hashed as ``str(hotel_id)``, so invalid IDs of any type
+        get a stripe and fail later with the usual validation error.
+        """
+        stripe = zlib.crc32(str(hotel_id).encode("utf-8")) % LOCK_STRIPES
+        return os.path.join(LOCK_DIR, f"hotel-{stripe:02d}.lock")
 
     @staticmethod
     def create_hotel(hotel: "Hotel") -> None:
         """Create new hotel."""
-        hotels = FileManager.load_data(HOTEL_FILE)
+        with Hotel.lock(hotel.hotel_id), REPOSITORY.batch():
+            Hotel._insert(hotel)
 
-        for item in hotels:
-            if item["hotel_id"] == hotel.hotel_id:
-                raise ValueError("Hotel ID already exists.")
+    @staticmethod
+    def create_hotels(hotels: Iterable[Union["Hotel", Dict]]) -> Dict:
+        """Create many hotels with a single write.
 
-        hotels.append(hotel.to_dict())
-        FileManager.save_data(HOTEL_FILE, hotels)
+        Items may be Hotel objects or dictionaries of Hotel arguments.
+        Returns the report described in models.batch.run_batch.
+        """
+        hotels = list(hotels)
+        hotel_ids = [
+            h.get("hotel_id") if isinstance(h, dict) else h.hotel_id
+            for h in valid_items(hotels, (Hotel, dict))
+        ]
+
+        with Hotel.lock_many(hotel_ids), REPOSITORY.batch():
+            return run_batch(hotels, Hotel._insert, (Hotel, dict))
+
+    @staticmethod
+    def _insert(hotel: Union["Hotel", Dict]) -> str:
+        """Validate and store one hotel, returning its ID."""
+        if isinstance(hotel, dict):
+            hotel = Hotel(**hotel)
+
+        if REPOSITORY.get(HOTEL_FILE, hotel.hotel_id) is not None:
+            raise ValueError("Hotel ID already exists.")
+
+        REPOSITORY.insert(HOTEL_FILE, hotel.to_dict())
+        return hotel.hotel_id
 
     @staticmethod
     def delete_hotel(hotel_id: str) -> None:
-        """Delete hotel."""
-        hotels = FileManager.load_data(HOTEL_FILE)
-        hotels = [h for h in hotels if h["hotel_id"] != hotel_id]
-        FileManager.save_data(HOTEL_FILE, hotels)
+        """Delete hotel.
+
+        Runs under the hotel lock, so it cannot interleave with a
+        booking of the same hotel.
+        """
+        with Hotel.lock(hotel_id), REPOSITORY.batch():
+            REPOSITORY.delete(HOTEL_FILE, hotel_id)
 
     @staticmethod
     def display_hotel(hotel_id: str) -> Dict:
         """Return hotel information."""
-        hotels = FileManager.load_data(HOTEL_FILE)
+        hotel = REPOSITORY.get(HOTEL_FILE, hotel_id)
 
-        for hotel in hotels:
-            if hotel["hotel_id"] == hotel_id:
-                return hotel
+        if hotel is None:
+            raise ValueError("Hotel not found.")
 
-        raise ValueError("Hotel not found.")
+        return dict(hotel)
+
+    @staticmethod
+    def hotels_by_location(location: str) -> List[Dict]:
+        """Return all hotels in a location."""
+        return [
+            dict(hotel)
+            for hotel in REPOSITORY.find_by(HOTEL_FILE, "location", location)
+        ]
 
     @staticmethod
     def reserve_room(hotel_id: str) -> None:
-        """Reserve a room if available."""
-        hotels = FileManager.load_data(HOTEL_FILE)
-
-        for hotel in hotels:
-            if hotel["hotel_id"] == hotel_id:
-                if hotel["available_rooms"] <= 0:
-                    raise ValueError("No rooms available.")
-                hotel["available_rooms"] -= 1
-                FileManager.save_data(HOTEL_FILE, hotels)
+        """Reserve a room if available.
+
+        The availability check and the decrement run under the hotel
+        lock and are written before it is released, so concurrent
+        bookings can never start from the same stale counter.
+        """
+        with Hotel.lock(hotel_id), REPOSITORY.batch():
+            hotel = REPOSITORY.get(HOTEL_FILE, hotel_id)
+
+            if hotel is None:
+                raise ValueError("Hotel not found.")
+
+            if hotel["available_rooms"] <= 0:
+                raise ValueError("No rooms available.")
+
+            REPOSITORY.update(HOTEL_FILE, hotel_id, {
+                "available_rooms": hotel["available_rooms"] - 1
+            })
+
+    @staticmethod
+    def release_room(hotel_id: str) -> None:
+        """Give back a room taken with reserve_room.
+
+        Nothing happens if the hotel was deleted meanwhile.
+        """
+        with Hotel.lock(hotel_id), REPOSITORY.batch():
+            hotel = REPOSITORY.get(HOTEL_FILE, hotel_id)
+
+            if hotel is None:
                 return
 
-        raise ValueError("Hotel not found.")
+            REPOSITORY.update(HOTEL_FILE, hotel_id, {
+                "available_rooms": min(hotel["available_rooms"] + 1,
+                                       hotel["total_rooms"])
+            })
@@ -0,0 +1,141 @@
+"""Date-range room inventory backed by segment trees."""
+
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+
+DateLike = Union[date, str]
+
+# Day ordinals covered by the trees: every date up to the year 2870.
+DOMAIN_SIZE = 1 << 20
+
+
+def parse_stay(check_in: DateLike, check_out: DateLike) -> Tuple[date, date]:
+    """Validate a stay and return its dates.
+
+    Dates may be date objects or ISO strings (YYYY-MM-DD). The stay
+    covers the nights from check_in up to, not including, check_out.
+    """
+    try:
+        start = (check_in if isinstance(check_in, date)
+                 else date.fromisoformat(check_in))
+        end = (check_out if isinstance(check_out, date)
+               else date.fromisoformat(check_out))
+    except (TypeError, ValueError) as error:
+        raise ValueError("Invalid date format.") from error
+
+    if end <= start:
+        raise ValueError("Check-out must be after check-in.")
+    if end.toordinal() >= DOMAIN_SIZE:
+        raise ValueError("Date out of range.")
+    return start, end
+
+
+class OccupancyTree:
+    """Sparse segment tree of booked rooms per night.
+
+    Supports adding to a range of nights and reading the highest
+    occupancy of a range, both in O(log DOMAIN_SIZE). Nodes are created
+    only for the ranges that were ever booked. Pending additions stay
+    in the node that covers the whole range instead of being pushed to
+    the children.
+    """
+
+    def __init__(self) -> None:
+        self._peak: Dict[int, int] = {}
+        self._added: Dict[int, int] = {}
+
+    def add(self, start: date, end: date, rooms: int) -> None:
+        """Add rooms to every night of [start, end)."""
+        self._add(1, 0, DOMAIN_SIZE, (start.toordinal(), end.toordinal()),
+                  rooms)
+
+    def _add(self, node: int, low: int, high: int,
+             nights: Tuple[int, int], rooms: int) -> None:
+        start, end = nights
+        if end <= low or high <= start:
+            return
+        if start <= low and high <= end:
+            self._added[node] = self._added.get(node, 0) + rooms
+            self._peak[node] = self._peak.get(node, 0) + rooms
+            return
+
+        middle = (low + high) // 2
+        self._add(2 * node, low, middle, nights, rooms)
+        self._add(2 * node + 1, middle, high, nights, rooms)
+        self._peak[node] = self._added.get(node, 0) + max(
+            self._peak.get(2 * node, 0), self._peak.get(2 * node + 1, 0)
+        )
+
+    def peak(self, start: Optional[date] = None,
+             end: Optional[date] = None) -> int:
+        """Return the highest occupancy of [start, end), or of all dates."""
+        if start is None or end is None:
+            return self._peak.get(1, 0)
+        return self._peak_in(1, 0, DOMAIN_SIZE, start.toordinal(),
+                             end.toordinal())
+
+    def _peak_in(self, node: int, low: int, high: int,
+                 start: int, end: int) -> int:
+        if end <= low or high <= start or node not in self._peak:
+            return 0
+        if start <= low and high <= end:
+            return self._peak[node]
+
+        middle = (low + high) // 2
+        return self._added.get(node, 0) + max(
+            self._peak_in(2 * node, low, middle, start, end),
+            self._peak_in(2 * node + 1, middle, high, start, end),
+        )
+
+
+class DateInventory:
+    """Occupancy trees of every hotel, built lazily from reservations.
+
+    ``load`` returns the reservations of one hotel and ``version``
+    changes whenever the reservations were reloaded from storage; the
+    trees are then rebuilt on demand. Callers must hold the hotel lock
+    while booking or releasing.
+    """
+
+    def __init__(self, load: Callable[[str], Iterable[Dict]],
+                 version: Callable[[], Any]) -> None:
+        self._load = load
+        self._version = version
+        self._seen_version: Any = None
+        self._trees: Dict[str, OccupancyTree] = {}
+        self._guard = threading.Lock()
+
+    def tree(self, hotel_id: str) -> OccupancyTree:
+        """Return the occupancy tree of a hotel."""
+        version = self._version()
+        with self._guard:
+            if version != self._seen_version:
+                self._trees = {}
+                self._seen_version = version
+            tree = self._trees.get(hotel_id)
+            if tree is None:
+                tree = self._trees[hotel_id] = OccupancyTree()
+                for reservation in self._load(hotel_id):
+                    if "check_in" in reservation:
+                        tree.add(*parse_stay(reservation["check_in"],
+                                             reservation["check_out"]), 1)
+            return tree
+
+    def peak(self, hotel_id: str, check_in: Optional[DateLike] = None,
+             check_out: Optional[DateLike] = None) -> int:
+        """Return the most rooms booked on one night of the stay."""
+        if check_in is None or check_out is None:
+            return self.tree(hotel_id).peak()
+        return self.tree(hotel_id).peak(*parse_stay(check_in, check_out))
+
+    def book(self, hotel_id: str, check_in: DateLike,
+             check_out: DateLike) -> None:
+        """Take one room for every night of the stay."""
+        self.tree(hotel_id).add(*parse_stay(check_in, check_out), 1)
+
+    def release(self, hotel_id: str, check_in: DateLike,
+                check_out: DateLike) -> None:
+        """Give back one room for every night of the stay."""
+        self.tree(hotel_id).add(*parse_stay(check_in, check_out), -1)
@@ -1,44 +1,145 @@
 """Reservation model."""
 
 import uuid
-from storage.file_manager import FileManager
+from typing import Dict, Iterable, List, Optional
+from storage.repository import REPOSITORY
+from models.batch import run_batch, valid_items
 from models.hotel import Hotel
+from models.inventory import DateInventory, DateLike, parse_stay
 
 RESERVATION_FILE = "data/reservations.json"
 
+REPOSITORY.register(RESERVATION_FILE, "reservation_id",
+                    indexes=("customer_id", "hotel_id"))
+
+INVENTORY = DateInventory(
+    load=lambda hotel_id: REPOSITORY.find_by(
+        RESERVATION_FILE, "hotel_id", hotel_id),
+    version=lambda: REPOSITORY.version(RESERVATION_FILE),
+)
+
 
 class Reservation:
     """Represents a reservation."""
 
     @staticmethod
-    def create_reservation(customer_id: str,
-                           hotel_id: str) -> None:
-        """Create reservation."""
-        reservation_id = str(uuid.uuid4())
+    def create_reservation(customer_id: str, hotel_id: str,
+                           check_in: Optional[DateLike] = None,
+                           check_out: Optional[DateLike] = None) -> str:
+        """Create reservation and return its ID.
+
+        Without dates a room is taken from the hotel for good. With
+        check_in and check_out (ISO dates) the room is only booked for
+        those nights. The room and the reservation record are written
+        together while the hotel lock is held.
+        """
+        request = {"customer_id": customer_id, "hotel_id": hotel_id}
+        if check_in is not None or check_out is not None:
+            request.update(check_in=check_in, check_out=check_out)
 
-        Hotel.reserve_room(hotel_id)
+        with Hotel.lock(hotel_id), REPOSITORY.batch():
+            return Reservation._insert(request)
 
-        reservations = FileManager.load_data(RESERVATION_FILE)
+    @staticmethod
+    def create_reservations(requests: Iterable[Dict]) -> Dict:
+        """Create many reservations with a single write.
 
-        reservations.append({
-            "reservation_id": reservation_id,
-            "customer_id": customer_id,
-            "hotel_id": hotel_id
-        })
+        Each request is a dictionary with customer_id and hotel_id, and
+        optionally check_in and check_out. The locks of every hotel
+        involved are held until the batch is written. Returns the report
+        described in models.batch.run_batch.
+        """
+        requests = list(requests)
+        hotel_ids = [
+            request.get("hotel_id")
+            for request in valid_items(requests, (dict,))
+        ]
 
-        FileManager.save_data(RESERVATION_FILE, reservations)
+        with Hotel.lock_many(hotel_ids), REPOSITORY.batch():
+            return run_batch(requests, Reservation._insert)
+
+    @staticmethod
+    def _insert(request: Dict) -> str:
+        """Reserve a room and store one reservation, returning its ID.
+
+        Dated stays fit in the rooms not taken for good. A room taken
+        for good must be free on every night already booked.
+        """
+        reservation = {
+            "reservation_id": str(uuid.uuid4()),
+            "customer_id": request["customer_id"],
+            "hotel_id": request["hotel_id"],
+        }
+        hotel = Hotel.display_hotel(reservation["hotel_id"])
+
+        if "check_in" in request or "check_out" in request:
+            start, end = parse_stay(request.get("check_in"),
+                                    request.get("check_out"))
+            if (INVENTORY.peak(hotel["hotel_id"], start, end)
+                    >= hotel["available_rooms"]):
+                raise ValueError("No rooms available.")
+            INVENTORY.book(hotel["hotel_id"], start, end)
+            reservation["check_in"] = start.isoformat()
+            reservation["check_out"] = end.isoformat()
+        else:
+            if INVENTORY.peak(hotel["hotel_id"]) >= hotel["available_rooms"]:
+                raise ValueError("No rooms available.")
+            Hotel.reserve_room(hotel["hotel_id"])
+
+        REPOSITORY.insert(RESERVATION_FILE, reservation)
+        return reservation["reservation_id"]
 
     @staticmethod
     def cancel_reservation(reservation_id: str) -> None:
-        """Cancel reservation."""
-        reservations = FileManager.load_data(RESERVATION_FILE)
+        """Cancel reservation and give its room back to the hotel."""
+        reservation = REPOSITORY.get(RESERVATION_FILE, reservation_id)
+        if reservation is None:
+            raise ValueError("Reservation not found.")
 
-        new_reservations = [
-            r for r in reservations
-            if r["reservation_id"] != reservation_id
+        hotel_id = reservation["hotel_id"]
+        with Hotel.lock(hotel_id), REPOSITORY.batch():
+            reservation = REPOSITORY.get(RESERVATION_FILE, reservation_id)
+            if reservation is None:
+                raise ValueError("Reservation not found.")
+
+            if "check_in" in reservation:
+                INVENTORY.release(hotel_id, reservation["check_in"],
+                                  reservation["check_out"])
+            else:
+                Hotel.release_room(hotel_id)
+            REPOSITORY.delete(RESERVATION_FILE, reservation_id)
+
+    @staticmethod
+    def is_available(hotel_id: str, check_in: DateLike,
+                     check_out: DateLike) -> bool:
+        """Tell whether a hotel has a room for every night of a stay."""
+        hotel = Hotel.display_hotel(hotel_id)
+        return (INVENTORY.peak(hotel_id, check_in, check_out)
+                < hotel["available_rooms"])
+
+    @staticmethod
+    def available_hotels(location: str, check_in: DateLike,
+                         check_out: DateLike) -> List[Dict]:
+        """Return the hotels of a location with a room for the stay."""
+        parse_stay(check_in, check_out)
+        return [
+            hotel for hotel in Hotel.hotels_by_location(location)
+            if INVENTORY.peak(hotel["hotel_id"], check_in, check_out)
+            < hotel["available_rooms"]
         ]
 
-        if len(new_reservations) == len(reservations):
-            raise ValueError("Reservation not found.")
+    @staticmethod
+    def reservations_by_customer(customer_id: str) -> List[Dict]:
+        """Return all reservations of a customer."""
+        return [
+            dict(reservation) for reservation in REPOSITORY.find_by(
+                RESERVATION_FILE, "customer_id", customer_id)
+        ]
 
-        FileManager.save_data(RESERVATION_FILE, new_reservations)
+    @staticmethod
+    def reservations_by_hotel(hotel_id: str) -> List[Dict]:
+        """Return all reservations of a hotel."""
+        return [
+            dict(reservation) for reservation in REPOSITORY.find_by(
+                RESERVATION_FILE, "hotel_id", hotel_id)
+        ]
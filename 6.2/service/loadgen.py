@@ -0,0 +1,138 @@
+"""Load generator for the reservation service."""
+
+import asyncio
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+
+class ServiceClient:
+    """Client sending one request at a time over a connection."""
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "ServiceClient":
+        """Open a connection to the service."""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def call(self, op: str, **args: Any) -> Dict:
+        """Send one request and return its response."""
+        self._next_id += 1
+        request = {"id": self._next_id, "op": op, "args": args}
+        self._writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return json.loads(await self._reader.readline())
+
+    async def close(self) -> None:
+        """Close the connection."""
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the value below which the fraction of values falls."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[position]
+
+
+async def _seed(client: ServiceClient, hotels: int) -> None:
+    """Create the hotels and the customer used by the workload."""
+    await client.call("create_customer", customer_id="LOAD-C",
+                      name="Load", email="load@test.com", phone="0")
+    for number in range(hotels):
+        await client.call("create_hotel", hotel_id=f"LOAD-H{number}",
+                          name=f"Load {number}", location="LOAD",
+                          total_rooms=1000)
+
+
+async def _worker(client: ServiceClient, hotels: int, requests: int,
+                  latencies: List[float], seed: int) -> int:
+    """Run a mix of bookings, cancellations and lookups."""
+    rng = random.Random(seed)
+    first = date(2030, 1, 1)
+    booked: List[str] = []
+    errors = 0
+
+    for _ in range(requests):
+        hotel_id = f"LOAD-H{rng.randrange(hotels)}"
+        choice = rng.random()
+        started = time.perf_counter()
+        if choice < 0.5:
+            check_in = first + timedelta(rng.randrange(365))
+            response = await client.call(
+                "create_reservation", customer_id="LOAD-C",
+                hotel_id=hotel_id, check_in=check_in.isoformat(),
+                check_out=(check_in + timedelta(rng.randint(1, 7)))
+                .isoformat(),
+            )
+            if response["ok"]:
+                booked.append(response["result"])
+        elif choice < 0.7 and booked:
+            response = await client.call(
+                "cancel_reservation",
+                reservation_id=booked.pop(rng.randrange(len(booked))),
+            )
+        else:
+            response = await client.call("display_hotel", hotel_id=hotel_id)
+        latencies.append(time.perf_counter() - started)
+        errors += not response["ok"]
+
+    return errors
+
+
+async def run_load(host: str, port: int, clients: int = 8,
+                   requests: int = 500, hotels: int = 10) -> Dict:
+    """Drive the service with concurrent clients and report statistics.
+
+    Returns requests per second and latency percentiles in
+    milliseconds.
+    """
+    seeder = await ServiceClient.connect(host, port)
+    await _seed(seeder, hotels)
+    await seeder.close()
+
+    connections = [
+        await ServiceClient.connect(host, port) for _ in range(clients)
+    ]
+    latencies: List[float] = []
+
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(
+        _worker(client, hotels, requests, latencies, seed)
+        for seed, client in enumerate(connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    for client in connections:
+        await client.close()
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Print a load test report."""
+    print("Load Test Results")
+    print("-----------------")
+    print(f"Requests: {report['requests']} ({report['errors']} errors)")
+    print(f"Elapsed: {report['seconds']:.3f} seconds")
+    print(f"Throughput: {report['requests_per_second']:.1f} requests/sec")
+    print(f"Latency p50: {report['p50_ms']:.3f} ms")
+    print(f"Latency p99: {report['p99_ms']:.3f} ms")
@@ -0,0 +1,249 @@
+"""Asyncio JSON-lines server exposing the reservation models."""
+
+import asyncio
+import json
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from models.customer import CUSTOMER_LOCK, Customer
+from models.hotel import Hotel
+from models.reservation import RESERVATION_FILE, Reservation
+from storage.locks import LOCKS
+from storage.repository import REPOSITORY
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+OPERATIONS: Dict[str, Callable[..., Any]] = {
+    "ping": lambda: "pong",
+    "create_hotel": lambda **args: Hotel.create_hotel(Hotel(**args)),
+    "delete_hotel": Hotel.delete_hotel,
+    "display_hotel": Hotel.display_hotel,
+    "hotels_by_location": Hotel.hotels_by_location,
+    "create_customer": (
+        lambda **args: Customer.create_customer(Customer(**args))
+    ),
+    "display_customer": Customer.display_customer,
+    "create_reservation": Reservation.create_reservation,
+    "cancel_reservation": Reservation.cancel_reservation,
+    "reservations_by_customer": Reservation.reservations_by_customer,
+    "reservations_by_hotel": Reservation.reservations_by_hotel,
+    "is_available": Reservation.is_available,
+    "available_hotels": Reservation.available_hotels,
+}
+
+# Operations that change no hotel and need no lock.
+READ_ONLY = frozenset((
+    "ping", "display_hotel", "hotels_by_location", "display_customer",
+    "reservations_by_customer", "reservations_by_hotel", "is_available",
+    "available_hotels",
+))
+
+Request = Tuple[Dict, "asyncio.Future[Dict]"]
+
+
+def execute(request: Dict) -> Dict:
+    """Run one request and build its response.
+
+    The request runs in its own repository batch, so a request that
+    fails leaves nothing behind in the shared commit.
+    """
+    response: Dict[str, Any] = {"id": request.get("id")}
+    try:
+        operation = OPERATIONS[request["op"]]
+        with REPOSITORY.batch():
+            response["result"] = operation(**request.get("args", {}))
+        response["ok"] = True
+    except KeyError as error:
+        response.update(ok=False, error=f"Unknown field or op: {error}")
+    except (TypeError, ValueError) as error:
+        response.update(ok=False, error=str(error))
+    except Exception as error:  # pylint: disable=broad-except
+        response.update(ok=False, error=f"Internal error: {error!r}")
+    return response
+
+
+def touched_hotels(requests: List[Dict]) -> Set[str]:
+    """Return the hotels the write requests of a batch may change."""
+    hotel_ids = set()
+    for request in requests:
+        args = request.get("args")
+        if request.get("op") in READ_ONLY or not isinstance(args, dict):
+            continue
+        if "hotel_id" in args:
+            hotel_ids.add(str(args["hotel_id"]))
+        elif "reservation_id" in args:
+            reservation = REPOSITORY.get(RESERVATION_FILE,
+                                         str(args["reservation_id"]))
+            if reservation is not None:
+                hotel_ids.add(reservation["hotel_id"])
+    return hotel_ids
+
+
+def execute_batch(requests: List[Dict]) -> List[Dict]:
+    """Run requests in one repository batch, sharing a single commit.
+
+    The locks of the hotels the write requests touch are held until the
+    commit, so other processes never see those hotels half written.
+    CUSTOMER_LOCK is taken up front too when the batch creates
+    customers, after the hotel locks as every other caller does.
+    Read-only batches take no lock.
+    """
+    creates_customers = any(
+        request.get("op") == "create_customer" for request in requests
+    )
+    customer_lock = (LOCKS.hold(CUSTOMER_LOCK) if creates_customers
+                     else nullcontext())
+    with Hotel.lock_many(touched_hotels(requests)), customer_lock:
+        with REPOSITORY.batch():
+            return [execute(request) for request in requests]
+
+
+# Settings plus the asyncio objects of one running server.
+# pylint: disable-next=too-many-instance-attributes
+class ReservationService:
+    """Line protocol server grouping concurrent requests in micro-batches.
+
+    Each line is a JSON object ``{"id": ..., "op": ..., "args": {...}}``
+    and gets one JSON line back with ``ok`` and ``result`` or ``error``.
+    Requests arriving within ``max_delay`` seconds of each other, up to
+    ``max_batch`` of them, are executed together in a worker thread and
+    answered once their shared commit is done.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_batch: int = 64, max_delay: float = 0.002) -> None:
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self._stopped = False
+        self._queue: Optional["asyncio.Queue[Optional[Request]]"] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batcher: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Start listening; ``port`` is updated when 0 was requested."""
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Start the server and run until cancelled."""
+        await self.start()
+        print(f"Reservation System Running on {self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """Stop accepting clients and flush what is pending.
+
+        The batches already queued are run; requests arriving later
+        are answered with an error.
+        """
+        self._stopped = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            await self._queue.put(None)
+            await self._batcher
+            self._batcher = None
+        while self._queue is not None and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                self._answer(item, self._stopped_response(item[0]))
+        REPOSITORY.commit()
+
+    @staticmethod
+    def _stopped_response(request: Dict) -> Dict:
+        return {"id": request.get("id"), "ok": False,
+                "error": "Service stopped."}
+
+    @staticmethod
+    def _answer(item: Request, response: Dict) -> None:
+        """Resolve the future of a queued request."""
+        future = item[1]
+        if not future.done():
+            future.set_result(response)
+
+    async def submit(self, request: Dict) -> Dict:
+        """Queue a request and wait for its response."""
+        if self._stopped:
+            return self._stopped_response(request)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+        """Answer every line a client sends, in order."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be an object.")
+                except ValueError as error:
+                    response = {"id": None, "ok": False, "error": str(error)}
+                else:
+                    response = await self.submit(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _run_batches(self) -> None:
+        """Collect queued requests into micro-batches and run them.
+
+        Returns once the ``None`` put by ``stop()`` is taken, after
+        running the requests queued before it.
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            requests = [request for request, _ in batch]
+            try:
+                responses = await loop.run_in_executor(
+                    None, execute_batch, requests
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                responses = [
+                    {"id": request.get("id"), "ok": False,
+                     "error": f"Commit failed: {error}"}
+                    for request in requests
+                ]
+            self.batches += 1
+
+            for item, response in zip(batch, responses):
+                self._answer(item, response)
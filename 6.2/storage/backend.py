@@ -0,0 +1,154 @@
+"""Storage backends used by the Repository."""
+
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from storage.file_manager import FileManager
+from storage.locks import LOCKS, LockManager
+from storage.wal import WriteAheadLog
+
+
+Operation = Tuple[str, Any, Any]
+Changes = Tuple[List[Any], List[Dict]]
+
+
+class StorageBackend(ABC):
+    """Interface between the Repository and the persisted collections.
+
+    Collections are identified by their JSON file path, so models keep
+    the same constants whatever backend is in use. Subclasses must
+    implement ``load``, ``signature`` and ``write``; the other methods
+    default to no-ops. Backends that can read one record without the
+    rest of its collection set ``fetches_by_key`` and implement
+    ``fetch``; those that can query an indexed field implement
+    ``find``.
+    """
+
+    fetches_by_key = False
+
+    def register(self, file_path: str, primary_key: str,
+                 indexes: Tuple[str, ...]) -> None:
+        """Prepare storage for a collection."""
+
+    @abstractmethod
+    def load(self, file_path: str) -> List[Dict]:
+        """Return every record of a collection."""
+
+    def load_changes(self, file_path: str) -> Optional[Changes]:
+        """Return what others changed since the last load, if known.
+
+        The result holds the keys whose records may be stale and the
+        current version of those records. None means the whole
+        collection must be loaded again.
+        """
+        del file_path
+
+    def fetch(self, file_path: str, key: Any) -> Optional[Dict]:
+        """Return a copy of one record, or None if it is missing."""
+        raise ValueError("Storage backend does not fetch single records.")
+
+    def find(self, file_path: str, field: str,
+             value: Any) -> Optional[List[Dict]]:
+        """Return the records whose indexed field equals the value.
+
+        None means the backend cannot query the field by itself and the
+        collection must be loaded.
+        """
+        del file_path, field, value
+
+    @abstractmethod
+    def signature(self, file_path: str) -> Any:
+        """Return a value that changes when others modify a collection."""
+
+    @abstractmethod
+    def write(self, file_path: str, table: Dict[Any, Dict],
+              operations: List[Operation]) -> None:
+        """Persist queued operations; ``table`` is the merged state."""
+
+    def lock(self, file_path: str) -> ContextManager[None]:
+        """Return the lock held while a collection is merged and written."""
+        del file_path
+        return nullcontext()
+
+    def transaction(self) -> ContextManager[None]:
+        """Return a block making the writes of one commit atomic."""
+        return nullcontext()
+
+    def use_log(self, file_path: str, primary_key: str, sync_every: int,
+                compact_every: int) -> WriteAheadLog:
+        """Persist a collection through an append-only log."""
+        raise ValueError("Storage backend does not support logs.")
+
+    def sync(self) -> None:
+        """Force buffered writes to disk."""
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class JsonBackend(StorageBackend):
+    """One JSON file per collection, optionally with a write-ahead log.
+
+    Plain collections are rewritten through FileManager on every flush.
+    A ``<file>.lock`` process lock is held while a collection is merged
+    and written.
+    """
+
+    def __init__(self, locks: Optional[LockManager] = None) -> None:
+        self._locks = locks or LOCKS
+        self._logs: Dict[str, WriteAheadLog] = {}
+
+    def use_log(self, file_path: str, primary_key: str, sync_every: int,
+                compact_every: int) -> WriteAheadLog:
+        """Switch a collection to a write-ahead log over its JSON file."""
+        log = WriteAheadLog(file_path, primary_key, sync_every,
+                            compact_every)
+        self._logs[file_path] = log
+        return log
+
+    def load(self, file_path: str) -> List[Dict]:
+        """Read the JSON file, replaying its log if it has one."""
+        if file_path in self._logs:
+            return self._logs[file_path].load()
+        return FileManager.load_data(file_path)
+
+    def signature(self, file_path: str) -> Any:
+        """Return mtime, size and inode of the file and of its log."""
+        paths = [file_path]
+        if file_path in self._logs:
+            paths.append(self._logs[file_path].log_path)
+
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        return tuple(signature)
+
+    def write(self, file_path: str, table: Dict[Any, Dict],
+              operations: List[Operation]) -> None:
+        """Rewrite the JSON file, or append the operations to its log."""
+        log = self._logs.get(file_path)
+        if log is None:
+            FileManager.save_data(file_path, list(table.values()))
+            return
+
+        log.append(operations)
+        if log.needs_compaction():
+            log.compact(list(table.values()))
+
+    @contextmanager
+    def lock(self, file_path: str) -> Iterator[None]:
+        """Hold the ``<file>.lock`` process lock."""
+        with self._locks.hold(f"{file_path}.lock"):
+            yield
+
+    def sync(self) -> None:
+        """Fsync every write-ahead log."""
+        for log in self._logs.values():
+            log.sync()
@@ -1,6 +1,8 @@
 """File manager module to handle JSON persistence."""
 
 import json
+import os
+import tempfile
 from typing import Any, List
 
 
@@ -22,6 +24,57 @@ class FileManager:
 
     @staticmethod
     def save_data(file_path: str, data: List[Any]) -> None:
-        """Save data to JSON file."""
-        with open(file_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
+        """Save data to JSON file through a temporary file and a rename.
+
+        Readers never see a half written file, even if the process dies
+        in the middle of the write.
+        """
+        FileManager._write_atomic(file_path, data, durable=False)
+
+    @staticmethod
+    def replace_data(file_path: str, data: Any) -> None:
+        """Save data like save_data, fsyncing the file and its directory.
+
+        Once this returns, the new version survives a crash.
+        """
+        FileManager._write_atomic(file_path, data, durable=True)
+
+    @staticmethod
+    def _sync_directory(directory: str) -> None:
+        """Fsync a directory so that a rename in it is durable."""
+        descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def _file_mode(file_path: str) -> int:
+        """Return the permissions to give the new version of a file."""
+        try:
+            return os.stat(file_path).st_mode & 0o777
+        except FileNotFoundError:
+            return 0o644
+
+    @staticmethod
+    def _write_atomic(file_path: str, data: Any,
+                      durable: bool) -> None:
+        """Write JSON to a unique temporary file and rename it."""
+        directory, name = os.path.split(os.path.abspath(file_path))
+        handle, temp_path = tempfile.mkstemp(
+            prefix=f".{name}.", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=4)
+                if durable:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.chmod(temp_path, FileManager._file_mode(file_path))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        if durable:
+            FileManager._sync_directory(directory)
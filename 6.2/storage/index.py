@@ -0,0 +1,40 @@
+"""Secondary hash index over repository collections."""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class SecondaryIndex:
+    """Maps a field value to the primary keys of the records holding it.
+
+    Keys are kept in insertion order, so lookups return records in the
+    same order as a scan of the collection would.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self._entries: Dict[Any, Dict[Any, None]] = {}
+
+    def add(self, key: Any, record: Dict) -> None:
+        """Index a record under its field value."""
+        value = record.get(self.field)
+        self._entries.setdefault(value, {})[key] = None
+
+    def remove(self, key: Any, record: Dict) -> None:
+        """Drop a record from the index."""
+        value = record.get(self.field)
+        keys = self._entries.get(value)
+        if keys is None:
+            return
+        keys.pop(key, None)
+        if not keys:
+            del self._entries[value]
+
+    def lookup(self, value: Any) -> List[Any]:
+        """Return the primary keys of the records with the value."""
+        return list(self._entries.get(value, ()))
+
+    def rebuild(self, items: Iterable[Tuple[Any, Dict]]) -> None:
+        """Index every (key, record) pair from scratch."""
+        self._entries = {}
+        for key, record in items:
+            self.add(key, record)
@@ -0,0 +1,84 @@
+"""Named locks shared by threads and processes."""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# A lock registry only needs to hand out held locks.
+# pylint: disable-next=too-few-public-methods
+class LockManager:
+    """Re-entrant locks identified by a lock file path.
+
+    Threads of one process are serialized by a ``threading.RLock`` per
+    path. Processes are serialized by an exclusive ``flock`` on the lock
+    file, taken only by the outermost holder in the process. Where
+    ``fcntl`` is unavailable the locks only cover threads.
+    """
+
+    def __init__(self) -> None:
+        self._guard = threading.Lock()
+        self._locks: Dict[str, threading.RLock] = {}
+        self._files: Dict[str, int] = {}
+        self._local = threading.local()
+
+    def _depths(self) -> Dict[str, int]:
+        """Return how deep the current thread holds each lock."""
+        if not hasattr(self._local, "depths"):
+            self._local.depths = {}
+        return self._local.depths
+
+    @contextmanager
+    def hold(self, lock_path: str) -> Iterator[None]:
+        """Hold the lock for the duration of the block."""
+        with self._guard:
+            lock = self._locks.setdefault(lock_path, threading.RLock())
+
+        with lock:
+            depths = self._depths()
+            depth = depths.get(lock_path, 0)
+            if depth == 0:
+                self._files[lock_path] = self._lock_file(lock_path)
+            depths[lock_path] = depth + 1
+            try:
+                yield
+            finally:
+                depths[lock_path] = depth
+                if depth == 0:
+                    self._unlock_file(self._files.pop(lock_path))
+
+    @staticmethod
+    def _lock_file(lock_path: str) -> int:
+        """Open the lock file and take the process lock on it.
+
+        Returns the file descriptor, closed again by ``_unlock_file``.
+        """
+        directory = os.path.dirname(lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        descriptor = os.open(lock_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(descriptor)
+            raise
+        return descriptor
+
+    @staticmethod
+    def _unlock_file(descriptor: int) -> None:
+        """Release the process lock and close the lock file."""
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_UN)
+        finally:
+            os.close(descriptor)
+
+
+LOCKS = LockManager()
@@ -0,0 +1,63 @@
+"""Copy the JSON collections into a SQLite database.
+
+Usage (from the 6.2 folder):
+    python -m storage.migrate data/reservation_system.db
+"""
+
+import sys
+from typing import Dict, Optional
+
+from storage.backend import JsonBackend, StorageBackend
+from storage.repository import REPOSITORY, Repository
+from storage.sqlite_backend import SqliteBackend
+
+
+def migrate(target: SqliteBackend,
+            repository: Optional[Repository] = None,
+            source: Optional[StorageBackend] = None) -> Dict[str, int]:
+    """Copy every registered collection from source into target.
+
+    Args:
+        target: Database receiving the records.
+        repository: Repository whose collections are copied.
+        source: Backend the records are read from, JSON by default.
+
+    Returns:
+        Number of records copied per collection file.
+    """
+    repository = repository or REPOSITORY
+    source = source or JsonBackend()
+    counts = {}
+
+    for file_path, (key, indexes) in repository.schema().items():
+        source.register(file_path, key, indexes)
+        target.register(file_path, key, indexes)
+
+        records = source.load(file_path)
+        target.replace_all(file_path, records)
+        counts[file_path] = len(records)
+
+    return counts
+
+
+def main() -> None:
+    """Migrate data/*.json into the database given on the command line."""
+    if len(sys.argv) != 2:
+        print("Usage: python -m storage.migrate database.db")
+        sys.exit(1)
+
+    # Importing the models registers their collections.
+    # pylint: disable=import-outside-toplevel,unused-import
+    import models.customer  # noqa: F401
+    import models.reservation  # noqa: F401
+
+    backend = SqliteBackend(sys.argv[1])
+    try:
+        for file_path, count in migrate(backend).items():
+            print(f"{file_path}: {count} records migrated.")
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
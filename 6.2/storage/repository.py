@@ -0,0 +1,434 @@
+"""In-memory repository that caches collections between calls."""
+
+import threading
+from contextlib import contextmanager
+from typing import (Any, Callable, Dict, Iterable, Iterator, List,
+                    MutableMapping, Optional, Tuple)
+
+from storage.backend import (Changes, JsonBackend, Operation,
+                             StorageBackend)
+from storage.index import SecondaryIndex
+from storage.wal import WriteAheadLog
+
+Layout = Callable[[], MutableMapping[Any, Dict]]
+
+
+# Per-collection cache state, locks and settings are kept in parallel maps.
+# pylint: disable-next=too-many-instance-attributes
+class Repository:
+    """Write-back cache over the collections of a StorageBackend.
+
+    Each collection is loaded once and kept in memory as a table keyed
+    by its primary key, plus one hash index per declared secondary
+    field. The table is a dict unless ``use_layout`` picked another
+    mapping; a layout table may serve some fields from its own
+    ``index(field)`` instead of a SecondaryIndex. Changes are applied
+    to the cached records and queued as operations; dirty collections
+    are written when ``flush_every`` operations are queued, when a
+    ``batch()`` block ends or on ``commit()``. A batch that raises is
+    rolled back instead.
+
+    ``flush_every`` stays 1 by default: nothing flushes the queue when
+    the process exits, so a single model call is only durable, and
+    visible to other processes, if it is written before it returns.
+    Bulk APIs and the service group their writes with ``batch()``, and
+    callers that can commit on their own may raise ``flush_every``.
+
+    Lookups in a collection that is not cached yet are served by the
+    backend alone when it can: by key for the sharded and SQLite
+    backends, by indexed field for SQLite. Writes and ``records`` load
+    the whole collection.
+
+    Collections modified outside the process are detected through the
+    backend signature (mtime, size and inode for JSON files). They are
+    reloaded, or only their changed records are swapped in when the
+    backend can tell which ones changed, and the queued operations are
+    replayed on top of the fresh data before writing.
+
+    The repository is thread-safe. Writers are serialized: a thread
+    takes the writer lock at its first change and, inside a batch,
+    keeps it until its outermost batch ends, so no other thread can
+    commit, or have rolled back, operations of a batch still open.
+    Reads never wait for it. The writer lock is always taken before the
+    internal mutex. Every flush holds the backend lock of the collection
+    while it reloads and writes it, so changes from other processes are
+    merged instead of overwritten. The default backend is JsonBackend.
+    """
+
+    def __init__(self, flush_every: int = 1,
+                 backend: Optional[StorageBackend] = None) -> None:
+        self.flush_every = flush_every
+        self._backend = backend or JsonBackend()
+        self._mutex = threading.RLock()
+        self._writer = threading.RLock()
+        self._local = threading.local()
+        self._keys: Dict[str, str] = {}
+        self._index_fields: Dict[str, Tuple[str, ...]] = {}
+        self._layouts: Dict[str, Layout] = {}
+        self._tables: Dict[str, MutableMapping[Any, Dict]] = {}
+        self._indexes: Dict[str, Dict[str, SecondaryIndex]] = {}
+        self._signatures: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._pending: Dict[str, List[Operation]] = {}
+        self._pending_count = 0
+
+    def register(self, file_path: str, primary_key: str,
+                 indexes: Iterable[str] = ()) -> None:
+        """Declare the primary key and indexed fields of a collection."""
+        with self._mutex:
+            self._keys[file_path] = primary_key
+            self._index_fields[file_path] = tuple(indexes)
+            self._backend.register(file_path, primary_key, tuple(indexes))
+            self.invalidate(file_path)
+
+    def schema(self) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+        """Return the primary key and indexed fields of each collection."""
+        with self._mutex:
+            return {
+                file_path: (key, self._index_fields[file_path])
+                for file_path, key in self._keys.items()
+            }
+
+    def use_backend(self, backend: StorageBackend) -> None:
+        """Flush pending changes and switch to another backend."""
+        with self._writer, self._mutex:
+            self.commit()
+            self._backend = backend
+            for file_path, (key, indexes) in self.schema().items():
+                backend.register(file_path, key, indexes)
+            self.invalidate()
+
+    def use_log(self, file_path: str, sync_every: int = 1,
+                compact_every: int = 1000) -> WriteAheadLog:
+        """Persist a collection through an append-only log.
+
+        The collection is recovered from its snapshot and log on the
+        next access.
+        """
+        with self._writer, self._mutex:
+            self.commit()
+            log = self._backend.use_log(file_path, self._keys[file_path],
+                                        sync_every, compact_every)
+            self.invalidate(file_path)
+            return log
+
+    def use_layout(self, file_path: str, layout: Layout) -> None:
+        """Keep the cached records of a collection in another mapping.
+
+        ``layout`` builds an empty mapping from primary key to record,
+        such as models.columnar.ReservationLayout.
+        """
+        with self._writer, self._mutex:
+            self.commit()
+            self._layouts[file_path] = layout
+            self.invalidate(file_path)
+
+    def _table(self, file_path: str) -> MutableMapping[Any, Dict]:
+        """Return the cached table, reloading it if the file changed.
+
+        Callers must hold the repository mutex.
+        """
+        signature = self._backend.signature(file_path)
+        if file_path not in self._tables:
+            self._reload(file_path, signature)
+        elif signature != self._signatures[file_path]:
+            changes = self._backend.load_changes(file_path)
+            if changes is None:
+                self._reload(file_path, signature)
+            else:
+                self._merge(file_path, signature, changes)
+        return self._tables[file_path]
+
+    def _reload(self, file_path: str, signature: Any) -> None:
+        """Read a collection from storage and replay queued operations."""
+        field = self._keys[file_path]
+        records = self._backend.load(file_path)
+        layout = self._layouts.get(file_path)
+        if layout is None:
+            table = {record.get(field): record for record in records}
+        else:
+            table = layout()
+            for record in records:
+                table[record.get(field)] = record
+
+        own_index = getattr(table, "index", None)
+        indexes = {}
+        for index_field in self._index_fields.get(file_path, ()):
+            index = own_index(index_field) if own_index else None
+            if index is None:
+                index = SecondaryIndex(index_field)
+            index.rebuild(table.items())
+            indexes[index_field] = index
+
+        self._tables[file_path] = table
+        self._indexes[file_path] = indexes
+        self._signatures[file_path] = signature
+        self._versions[file_path] = self._versions.get(file_path, 0) + 1
+
+        for operation in self._pending.get(file_path, []):
+            self._apply(file_path, operation)
+
+    def _merge(self, file_path: str, signature: Any,
+               changes: Changes) -> None:
+        """Swap in the records others changed and replay queued operations."""
+        stale, fresh = changes
+        field = self._keys[file_path]
+        table = self._tables[file_path]
+        indexes = self._indexes[file_path].values()
+
+        for key in stale:
+            record = table.pop(key, None)
+            if record is not None:
+                for index in indexes:
+                    index.remove(key, record)
+        for record in fresh:
+            key = record.get(field)
+            table[key] = record
+            for index in indexes:
+                index.add(key, record)
+
+        self._signatures[file_path] = signature
+        self._versions[file_path] += 1
+        for operation in self._pending.get(file_path, []):
+            self._apply(file_path, operation)
+
+    def _apply(self, file_path: str, operation: Operation) -> bool:
+        """Apply one operation to the cached table and its indexes."""
+        kind, key, value = operation
+        table = self._tables[file_path]
+        indexes = self._indexes[file_path].values()
+
+        record = table.get(key)
+        if record is None and kind != "insert":
+            return False
+
+        if record is not None:
+            for index in indexes:
+                index.remove(key, record)
+
+        if kind == "insert":
+            table.pop(key, None)
+            table[key] = record = value
+        elif kind == "update":
+            record.update(value)
+            table[key] = record
+        else:
+            del table[key]
+            return True
+
+        for index in indexes:
+            index.add(key, record)
+        return True
+
+    def _change(self, file_path: str, operation: Operation) -> bool:
+        """Apply an operation, queue it and flush if due.
+
+        Inside a batch the writer lock is kept until the outermost batch
+        ends; outside, it is released once the operation is queued.
+        """
+        if self._batch_depth():
+            if not self._local.writing:
+                self._writer.acquire()  # pylint: disable=consider-using-with
+                self._local.writing = True
+            with self._mutex:
+                changed = self._queue(file_path, operation)
+                if changed:
+                    self._local.operations.append((file_path, operation))
+                return changed
+
+        with self._writer, self._mutex:
+            changed = self._queue(file_path, operation)
+            if changed and self._pending_count >= self.flush_every:
+                self.commit()
+            return changed
+
+    def _queue(self, file_path: str, operation: Operation) -> bool:
+        """Apply an operation to the cache and queue it for writing."""
+        self._table(file_path)
+        changed = self._apply(file_path, operation)
+        if changed:
+            self._pending.setdefault(file_path, []).append(operation)
+            self._pending_count += 1
+        return changed
+
+    def version(self, file_path: str) -> int:
+        """Return a number that changes each time a collection is reloaded.
+
+        Caches derived from a collection use it to know when changes
+        made outside the repository invalidated them.
+        """
+        with self._mutex:
+            self._table(file_path)
+            return self._versions[file_path]
+
+    def records(self, file_path: str) -> List[Dict]:
+        """Return every cached record of a collection.
+
+        The records are owned by the repository and must not be
+        modified by the caller.
+        """
+        with self._mutex:
+            return list(self._table(file_path).values())
+
+    def get(self, file_path: str, key: Any) -> Optional[Dict]:
+        """Return the record with the given primary key.
+
+        A collection that is not cached yet is not loaded when the
+        backend can fetch the record alone.
+        """
+        with self._mutex:
+            if (file_path not in self._tables
+                    and self._backend.fetches_by_key):
+                return self._fetch(file_path, key)
+            return self._table(file_path).get(key)
+
+    def _fetch(self, file_path: str, key: Any) -> Optional[Dict]:
+        """Read one record from the backend and replay queued operations."""
+        record = self._backend.fetch(file_path, key)
+        for kind, queued_key, value in self._pending.get(file_path, []):
+            if queued_key != key:
+                continue
+            if kind == "insert":
+                record = dict(value)
+            elif kind == "delete":
+                record = None
+            elif record is not None:
+                record.update(value)
+        return record
+
+    def find_by(self, file_path: str, field: str, value: Any) -> List[Dict]:
+        """Return the records whose indexed field equals the value.
+
+        A collection that is not cached yet and has no queued
+        operations is not loaded when the backend can run the query.
+        """
+        with self._mutex:
+            if (file_path not in self._tables
+                    and not self._pending.get(file_path)
+                    and field in self._index_fields[file_path]):
+                records = self._backend.find(file_path, field, value)
+                if records is not None:
+                    return records
+            table = self._table(file_path)
+            index = self._indexes[file_path].get(field)
+            if index is None:
+                raise ValueError(f"Field '{field}' is not indexed.")
+            return [table[key] for key in index.lookup(value)]
+
+    def insert(self, file_path: str, record: Dict) -> None:
+        """Add a record to a collection."""
+        key = record[self._keys[file_path]]
+        self._change(file_path, ("insert", key, dict(record)))
+
+    def update(self, file_path: str, key: Any, changes: Dict) -> bool:
+        """Update fields of a record; return False if it is missing."""
+        return self._change(file_path, ("update", key, dict(changes)))
+
+    def delete(self, file_path: str, key: Any) -> bool:
+        """Remove a record; return False if it is missing."""
+        return self._change(file_path, ("delete", key, None))
+
+    def commit(self) -> None:
+        """Write every dirty collection in one backend transaction.
+
+        Waits while another thread has a batch with changes open.
+        """
+        with self._writer, self._mutex:
+            if not self._pending:
+                return
+            try:
+                with self._backend.transaction():
+                    for file_path in self._pending:
+                        with self._backend.lock(file_path):
+                            self._flush(file_path)
+            except BaseException:
+                # Drop what could not be stored; the cache is reloaded.
+                for file_path in self._pending:
+                    self.invalidate(file_path)
+                raise
+            finally:
+                self._pending.clear()
+                self._pending_count = 0
+
+    def _flush(self, file_path: str) -> None:
+        """Merge queued operations with storage and write them."""
+        table = self._table(file_path)
+        self._backend.write(file_path, table, self._pending[file_path])
+        self._signatures[file_path] = self._backend.signature(file_path)
+
+    def sync(self) -> None:
+        """Flush dirty collections and fsync every log."""
+        with self._writer, self._mutex:
+            self.commit()
+            self._backend.sync()
+
+    def _batch_depth(self) -> int:
+        """Return how many batch blocks the current thread is in."""
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def batch(self) -> Iterator["Repository"]:
+        """Defer writes until the thread's outermost batch block ends.
+
+        If the block raises, the operations it queued are discarded and
+        the collections they touched are read again, so nothing of the
+        block is written. Once the block changes something, other
+        threads wait to write or commit until the outermost block ends.
+        """
+        depth = self._batch_depth()
+        if depth == 0:
+            self._local.operations = []
+            self._local.writing = False
+        mark = len(self._local.operations)
+        self._local.depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self._local.depth = depth
+            try:
+                self._rollback(mark)
+            finally:
+                if depth == 0:
+                    self._release_writer()
+            raise
+        self._local.depth = depth
+        if depth == 0:
+            try:
+                self.commit()
+            finally:
+                self._release_writer()
+
+    def _release_writer(self) -> None:
+        """Release the writer lock if the current thread's batch took it."""
+        if self._local.writing:
+            self._local.writing = False
+            self._writer.release()
+
+    def _rollback(self, mark: int) -> None:
+        """Discard the operations the current thread queued after mark."""
+        with self._mutex:
+            operations = self._local.operations[mark:]
+            del self._local.operations[mark:]
+            for file_path, operation in operations:
+                pending = self._pending.get(file_path, [])
+                for position, queued in enumerate(pending):
+                    if queued is operation:
+                        del pending[position]
+                        self._pending_count -= 1
+                        break
+                if not pending:
+                    self._pending.pop(file_path, None)
+            for file_path in {file_path for file_path, _ in operations}:
+                self.invalidate(file_path)
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Drop cached records so they are read again on next access."""
+        with self._mutex:
+            paths = [file_path] if file_path else list(self._tables)
+            for path in paths:
+                self._tables.pop(path, None)
+                self._indexes.pop(path, None)
+                self._signatures.pop(path, None)
+
+
+REPOSITORY = Repository()
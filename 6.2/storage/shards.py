@@ -0,0 +1,365 @@
+"""Collections split by key hash into lazily loaded shard files.
+
+Usage (from the 6.2 folder), to shard or reshard every collection:
+    python -m storage.shards SHARDS [data/hotels.json ...]
+"""
+
+import json
+import os
+import sys
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage.backend import Changes, Operation, StorageBackend
+from storage.file_manager import FileManager
+from storage.locks import LOCKS, LockManager
+
+
+DEFAULT_SHARDS = 16
+
+
+# Paths and settings plus the per-shard caches and pending changes.
+# pylint: disable-next=too-many-instance-attributes
+class ShardedStore:
+    """A collection stored as several JSON files.
+
+    ``data/hotels.json`` becomes ``data/hotels/manifest.json`` plus
+    ``data/hotels/shard-0003-of-0016.json`` files, and a record lives in
+    shard ``crc32(key) % shards``. Shards are read on first access and
+    read again only when their file changes. ``flush()`` rewrites only
+    the shards holding changed records, then the manifest, so a stat
+    of the manifest tells whether anything changed.
+
+    Changes not flushed yet are kept per shard. If another process
+    rewrote the shard meanwhile, they are replayed over its new
+    content instead of overwriting it.
+
+    Records returned by ``get()`` are owned by the store and must not
+    be modified; ``put()`` stores a copy.
+    """
+
+    def __init__(self, file_path: str, primary_key: str,
+                 shards: int = DEFAULT_SHARDS) -> None:
+        self.file_path = file_path
+        self.directory = os.path.splitext(file_path)[0]
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        self.primary_key = primary_key
+        self.shards = shards
+        self._manifest_stat: Any = None
+        self._tables: Dict[int, Dict[Any, Dict]] = {}
+        self._stats: Dict[int, Any] = {}
+        self._changes: Dict[int, Dict[Any, Optional[Dict]]] = {}
+        self._layout_changed = False
+        self.refresh()
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int, int]]:
+        """Return mtime, size and inode of a file, or None."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def exists(self) -> bool:
+        """Return True if the collection has been sharded."""
+        return os.path.exists(self.manifest_path)
+
+    def refresh(self) -> None:
+        """Follow the manifest, dropping every shard if the count changed."""
+        stat = self._stat(self.manifest_path)
+        if stat == self._manifest_stat:
+            return
+        self._manifest_stat = stat
+        if stat is None:
+            return
+
+        with open(self.manifest_path, "r", encoding="utf-8") as file:
+            shards = json.load(file)["shards"]
+        if shards != self.shards:
+            self.shards = shards
+            self._tables.clear()
+            self._stats.clear()
+            self._changes.clear()
+            self._layout_changed = True
+
+    def shard_of(self, key: Any) -> int:
+        """Return the shard number holding a key."""
+        return zlib.crc32(str(key).encode("utf-8")) % self.shards
+
+    def shard_path(self, shard: int) -> str:
+        """Return the file of a shard."""
+        return os.path.join(
+            self.directory, f"shard-{shard:04d}-of-{self.shards:04d}.json")
+
+    def _table(self, shard: int) -> Dict[Any, Dict]:
+        """Return a shard, reading it if it is missing or changed."""
+        path = self.shard_path(shard)
+        stat = self._stat(path)
+        if shard in self._tables and stat == self._stats[shard]:
+            return self._tables[shard]
+
+        records = FileManager.load_data(path) if stat else []
+        table = {record.get(self.primary_key): record for record in records}
+        for key, record in self._changes.get(shard, {}).items():
+            if record is None:
+                table.pop(key, None)
+            else:
+                table[key] = record
+        self._tables[shard] = table
+        self._stats[shard] = stat
+        return table
+
+    def signature(self) -> Any:
+        """Return the stat of the manifest, rewritten by every flush."""
+        self.refresh()
+        return self._manifest_stat
+
+    def get(self, key: Any) -> Optional[Dict]:
+        """Return a record, reading only the shard that holds it."""
+        self.refresh()
+        return self._table(self.shard_of(key)).get(key)
+
+    def records(self) -> List[Dict]:
+        """Return every record, shard by shard."""
+        self.refresh()
+        self._layout_changed = False
+        return [
+            record for shard in range(self.shards)
+            for record in self._table(shard).values()
+        ]
+
+    def reload_changed(self) -> Optional[Tuple[List[Any], List[Dict]]]:
+        """Read again the loaded shards whose file changed.
+
+        Returns the keys the changed shards held before and the records
+        they hold now, or None if the shard count changed since the last
+        ``records()`` call and everything must be read again.
+        """
+        self.refresh()
+        if self._layout_changed:
+            return None
+
+        stale: List[Any] = []
+        fresh: List[Dict] = []
+        for shard in sorted(self._tables):
+            if self._stat(self.shard_path(shard)) != self._stats[shard]:
+                stale.extend(self._tables[shard])
+                fresh.extend(self._table(shard).values())
+        return stale, fresh
+
+    def put(self, record: Dict) -> None:
+        """Add or replace a record."""
+        key = record[self.primary_key]
+        shard = self.shard_of(key)
+        record = dict(record)
+        self._table(shard)[key] = record
+        self._changes.setdefault(shard, {})[key] = record
+
+    def remove(self, key: Any) -> bool:
+        """Remove a record; return False if it is missing."""
+        shard = self.shard_of(key)
+        table = self._table(shard)
+        if key not in table:
+            return False
+        del table[key]
+        self._changes.setdefault(shard, {})[key] = None
+        return True
+
+    def _write_manifest(self, durable: bool) -> None:
+        """Write the manifest, changing its signature."""
+        write = FileManager.replace_data if durable else FileManager.save_data
+        write(self.manifest_path,
+              {"primary_key": self.primary_key, "shards": self.shards})
+        self._manifest_stat = self._stat(self.manifest_path)
+
+    def flush(self, durable: bool = False) -> List[int]:
+        """Write the changed shards and the manifest.
+
+        Returns the numbers of the shards written. If a write fails,
+        the unwritten shards are dropped from memory and read again on
+        next access.
+        """
+        written = sorted(self._changes)
+        if not written and self._manifest_stat is not None:
+            return written
+
+        write = FileManager.replace_data if durable else FileManager.save_data
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for shard in written:
+                path = self.shard_path(shard)
+                write(path, list(self._table(shard).values()))
+                self._stats[shard] = self._stat(path)
+                del self._changes[shard]
+            self._write_manifest(durable)
+        except BaseException:
+            for shard in self._changes:
+                self._tables.pop(shard, None)
+                self._stats.pop(shard, None)
+            self._changes.clear()
+            raise
+        return written
+
+    def rebalance(self, shards: int) -> int:
+        """Redistribute the records over a new number of shards.
+
+        A collection that is not sharded yet is read from its single
+        JSON file. The new shards are fsynced before the manifest
+        switches to them, then the old shard files are removed.
+
+        Returns:
+            Number of records stored.
+        """
+        if shards < 1:
+            raise ValueError("Shard count must be positive.")
+
+        self.refresh()
+        if self.exists():
+            records = self.records()
+            old_paths = {self.shard_path(shard)
+                         for shard in range(self.shards)}
+        elif os.path.exists(self.file_path):
+            records = FileManager.load_data(self.file_path)
+            old_paths = set()
+        else:
+            records, old_paths = [], set()
+
+        self.shards = shards
+        self._tables = {shard: {} for shard in range(shards)}
+        self._stats = {shard: None for shard in range(shards)}
+        self._changes = {}
+        for record in records:
+            key = record.get(self.primary_key)
+            self._tables[self.shard_of(key)][key] = record
+            self._changes.setdefault(self.shard_of(key), {})[key] = record
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for shard in range(shards):
+                path = self.shard_path(shard)
+                FileManager.replace_data(
+                    path, list(self._tables[shard].values()))
+                self._stats[shard] = self._stat(path)
+            self._changes.clear()
+            self._write_manifest(durable=True)
+        except BaseException:
+            self._tables.clear()
+            self._stats.clear()
+            self._changes.clear()
+            self._manifest_stat = None
+            self.refresh()
+            raise
+
+        for path in old_paths - {self.shard_path(shard)
+                                 for shard in range(shards)}:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(records)
+
+
+class ShardedJsonBackend(StorageBackend):
+    """Collections stored as ShardedStore files.
+
+    A collection that has no shards yet is split from its JSON file when
+    it is registered. Each flush rewrites only the shards touched by the
+    queued operations. Checking for changes stats only the manifest,
+    and after another process wrote, ``load_changes`` reads again only
+    the shards that changed. Until a collection is loaded, ``fetch``
+    serves single records from the shard holding them. The
+    ``<file>.lock`` process lock is the same one JsonBackend uses.
+    """
+
+    fetches_by_key = True
+
+    def __init__(self, shards: int = DEFAULT_SHARDS,
+                 locks: Optional[LockManager] = None) -> None:
+        self.shards = shards
+        self._locks = locks or LOCKS
+        self._stores: Dict[str, ShardedStore] = {}
+
+    def register(self, file_path: str, primary_key: str,
+                 indexes: Tuple[str, ...]) -> None:
+        """Open the store of a collection, sharding it if needed."""
+        store = ShardedStore(file_path, primary_key, self.shards)
+        if not store.exists():
+            with self.lock(file_path):
+                store.refresh()
+                if not store.exists():
+                    store.rebalance(self.shards)
+        self._stores[file_path] = store
+
+    def store(self, file_path: str) -> ShardedStore:
+        """Return the store of a registered collection."""
+        return self._stores[file_path]
+
+    def load(self, file_path: str) -> List[Dict]:
+        """Return copies of every record, reading every shard."""
+        return [dict(record) for record in self._stores[file_path].records()]
+
+    def fetch(self, file_path: str, key: Any) -> Optional[Dict]:
+        """Return a copy of one record, reading only its shard."""
+        record = self._stores[file_path].get(key)
+        return None if record is None else dict(record)
+
+    def load_changes(self, file_path: str) -> Optional[Changes]:
+        """Return the records of the shards changed by others."""
+        changes = self._stores[file_path].reload_changed()
+        if changes is None:
+            return None
+        stale, fresh = changes
+        return stale, [dict(record) for record in fresh]
+
+    def signature(self, file_path: str) -> Any:
+        """Return the stat of the collection manifest."""
+        return self._stores[file_path].signature()
+
+    def write(self, file_path: str, table: Dict[Any, Dict],
+              operations: List[Operation]) -> None:
+        """Store the touched records and flush only their shards."""
+        store = self._stores[file_path]
+        for _, key, _ in operations:
+            record = table.get(key)
+            if record is None:
+                store.remove(key)
+            else:
+                store.put(record)
+        store.flush()
+
+    @contextmanager
+    def lock(self, file_path: str) -> Iterator[None]:
+        """Hold the ``<file>.lock`` process lock."""
+        with self._locks.hold(f"{file_path}.lock"):
+            yield
+
+
+def main() -> None:
+    """Shard the given collections, or every registered one."""
+    if (len(sys.argv) < 2 or not sys.argv[1].isdigit()
+            or int(sys.argv[1]) < 1):
+        print("Usage: python -m storage.shards SHARDS [collection.json ...]")
+        sys.exit(1)
+
+    # Importing the models registers their collections.
+    # pylint: disable=import-outside-toplevel,unused-import
+    import models.customer  # noqa: F401
+    import models.reservation  # noqa: F401
+    from storage.repository import REPOSITORY
+
+    shards = int(sys.argv[1])
+    schema = REPOSITORY.schema()
+    for file_path in sys.argv[2:] or list(schema):
+        if file_path not in schema:
+            print(f"Error: {file_path} is not a known collection.")
+            continue
+        store = ShardedStore(file_path, schema[file_path][0])
+        with LOCKS.hold(f"{file_path}.lock"):
+            count = store.rebalance(shards)
+        print(f"{file_path}: {count} records in {shards} shards.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Embedded SQLite storage backend."""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage.backend import Changes, Operation, StorageBackend
+
+CHANGE_TABLE = "_changes"
+CHANGE_HISTORY = 10000
+
+
+class SqliteBackend(StorageBackend):
+    """Stores each collection as a table of one SQLite database.
+
+    A table holds the primary key, one indexed column per secondary
+    field and the record as JSON text. Statements are parameterized
+    with fixed SQL text, so sqlite3 reuses its prepared statements.
+    All collections written by one Repository commit share a single
+    ``BEGIN IMMEDIATE`` transaction; a reservation and its room update
+    are therefore stored together or not at all.
+
+    Single records are read by primary key and ``find`` queries the
+    field indexes, so a collection is only loaded whole once it is
+    written. Every write also appends the touched keys to a shared
+    change table; after another connection commits, ``load_changes``
+    reads back only the records it touched. The change table keeps the
+    last ``CHANGE_HISTORY`` entries, and a reader that fell further
+    behind loads the collection again.
+    """
+
+    fetches_by_key = True
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._connection = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False,
+            cached_statements=256,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._schemas: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self._sql: Dict[str, Dict[str, str]] = {}
+        self._seen: Dict[str, int] = {}
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} "
+            "(seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "collection TEXT NOT NULL, key TEXT NOT NULL)"
+        )
+
+    @staticmethod
+    def table_name(file_path: str) -> str:
+        """Return the table used for a collection file.
+
+        The name is the path without its extension, so collections in
+        different folders never share a table.
+        """
+        return Path(file_path).with_suffix("").as_posix()
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        """Quote an SQL identifier."""
+        return '"' + name.replace('"', '""') + '"'
+
+    def register(self, file_path: str, primary_key: str,
+                 indexes: Tuple[str, ...]) -> None:
+        """Create the table of a collection and its field indexes."""
+        table = self._quote(self.table_name(file_path))
+        columns = [self._quote(field) for field in indexes]
+        column_defs = "".join(f", {column}" for column in columns)
+        column_list = "".join(f", {column}" for column in columns)
+        placeholders = ", ?" * len(columns)
+        assignments = "".join(
+            f", {column} = excluded.{column}" for column in columns
+        )
+
+        with self._lock:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(key TEXT PRIMARY KEY{column_defs}, data TEXT NOT NULL)"
+            )
+            for field, column in zip(indexes, columns):
+                index = self._quote(f"{self.table_name(file_path)}_{field}")
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index} "
+                    f"ON {table} ({column})"
+                )
+
+        self._schemas[file_path] = (primary_key, tuple(indexes))
+        self._sql[file_path] = {
+            "select": f"SELECT data FROM {table} ORDER BY rowid",
+            "fetch": f"SELECT data FROM {table} WHERE key = ?",
+            **{
+                f"find:{field}": (
+                    f"SELECT data FROM {table} WHERE {column} = ? "
+                    "ORDER BY rowid"
+                )
+                for field, column in zip(indexes, columns)
+            },
+            "upsert": (
+                f"INSERT INTO {table} (key{column_list}, data) "
+                f"VALUES (?{placeholders}, ?) ON CONFLICT(key) "
+                f"DO UPDATE SET data = excluded.data{assignments}"
+            ),
+            "delete": f"DELETE FROM {table} WHERE key = ?",
+            "clear": f"DELETE FROM {table}",
+        }
+
+    def _row(self, file_path: str, key: Any, record: Dict) -> List[Any]:
+        """Return the upsert parameters of one record."""
+        indexes = self._schemas[file_path][1]
+        return [key, *(record.get(field) for field in indexes),
+                json.dumps(record)]
+
+    def load(self, file_path: str) -> List[Dict]:
+        """Return the records of a collection in insertion order."""
+        with self._snapshot():
+            rows = self._connection.execute(
+                self._sql[file_path]["select"]
+            ).fetchall()
+            self._seen[file_path] = self._last_change()
+        return [json.loads(data) for (data,) in rows]
+
+    def load_changes(self, file_path: str) -> Optional[Changes]:
+        """Return the records others touched since the last load."""
+        seen = self._seen.get(file_path)
+        if seen is None:
+            return None
+        with self._snapshot():
+            first = self._connection.execute(
+                f"SELECT MIN(seq) FROM {CHANGE_TABLE}"
+            ).fetchone()[0]
+            if first is not None and first > seen + 1:
+                return None
+            rows = self._connection.execute(
+                f"SELECT DISTINCT key FROM {CHANGE_TABLE} "
+                "WHERE collection = ? AND seq > ?",
+                (self.table_name(file_path), seen),
+            ).fetchall()
+            stale = [json.loads(key) for (key,) in rows]
+            fresh = [
+                record for record in (
+                    self.fetch(file_path, key) for key in stale
+                ) if record is not None
+            ]
+            self._seen[file_path] = self._last_change()
+        return stale, fresh
+
+    def fetch(self, file_path: str, key: Any) -> Optional[Dict]:
+        """Return one record read by its primary key."""
+        with self._lock:
+            row = self._connection.execute(
+                self._sql[file_path]["fetch"], (key,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def find(self, file_path: str, field: str,
+             value: Any) -> Optional[List[Dict]]:
+        """Return the records whose field equals the value, in order.
+
+        None values are left to the Repository, since SQL equality
+        never matches NULL.
+        """
+        sql = self._sql[file_path].get(f"find:{field}")
+        if sql is None or value is None:
+            return None
+        with self._lock:
+            rows = self._connection.execute(sql, (value,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def _last_change(self) -> int:
+        """Return the sequence number of the newest change entry."""
+        return self._connection.execute(
+            f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_TABLE}"
+        ).fetchone()[0]
+
+    def _log_changes(self, file_path: str, keys: List[Any]) -> None:
+        """Record the touched keys and drop entries past the history.
+
+        Callers must be inside a write transaction.
+        """
+        name = self.table_name(file_path)
+        self._connection.executemany(
+            f"INSERT INTO {CHANGE_TABLE} (collection, key) VALUES (?, ?)",
+            [(name, json.dumps(key)) for key in keys],
+        )
+        last = self._last_change()
+        self._connection.execute(
+            f"DELETE FROM {CHANGE_TABLE} WHERE seq <= ?",
+            (last - CHANGE_HISTORY,),
+        )
+        self._seen[file_path] = last
+
+    def signature(self, file_path: str) -> Any:
+        """Return the data version, bumped by other connections' commits."""
+        with self._lock:
+            return self._connection.execute(
+                "PRAGMA data_version"
+            ).fetchone()[0]
+
+    def write(self, file_path: str, table: Dict[Any, Dict],
+              operations: List[Operation]) -> None:
+        """Upsert or delete the records touched by the operations."""
+        sql = self._sql[file_path]
+        upserts, deletes = [], []
+        for key in dict.fromkeys(key for _, key, _ in operations):
+            record = table.get(key)
+            if record is None:
+                deletes.append((key,))
+            else:
+                upserts.append(self._row(file_path, key, record))
+
+        with self.transaction():
+            self._connection.executemany(sql["delete"], deletes)
+            self._connection.executemany(sql["upsert"], upserts)
+            self._log_changes(file_path, [
+                key for key, *_ in deletes + upserts
+            ])
+
+    def replace_all(self, file_path: str, records: List[Dict]) -> None:
+        """Replace the content of a collection, e.g. when migrating."""
+        sql = self._sql[file_path]
+        primary_key = self._schemas[file_path][0]
+        with self.transaction():
+            old_keys = [
+                json.loads(data).get(primary_key)
+                for (data,) in self._connection.execute(sql["select"])
+            ]
+            self._connection.execute(sql["clear"])
+            self._connection.executemany(sql["upsert"], [
+                self._row(file_path, record.get(primary_key), record)
+                for record in records
+            ])
+            self._log_changes(file_path, old_keys + [
+                record.get(primary_key) for record in records
+            ])
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run the block in one write transaction; nested blocks join it."""
+        with self._lock:
+            if self._depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._connection.execute("COMMIT")
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[None]:
+        """Run reads on one snapshot, inside the open transaction if any."""
+        with self._lock:
+            if self._depth:
+                yield
+                return
+            self._connection.execute("BEGIN")
+            try:
+                yield
+            finally:
+                self._connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,154 @@
+"""Append-only write-ahead log for a JSON collection."""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from storage.file_manager import FileManager
+
+
+Operation = Tuple[str, Any, Any]
+
+
+class WriteAheadLog:
+    """Log-structured persistence for one collection.
+
+    The regular JSON file is used as snapshot. Every committed operation
+    is appended as one JSON line to ``<file>.wal``, so a change costs
+    O(1) disk I/O instead of a rewrite of the whole collection. The log
+    is fsynced every ``sync_every`` operations and folded into a new
+    snapshot every ``compact_every`` operations.
+
+    Loading replays the log over the snapshot and stops at a line that
+    is not complete, which may be another process appending. Such a
+    torn line is only cut off by ``append``, which runs under the
+    collection lock, so it can only be a leftover of a crash. Operations
+    carry absolute values, so replaying a log over a snapshot that
+    already contains them, after a crash during compaction, is harmless.
+    """
+
+    TAIL_BLOCK = 4096
+
+    def __init__(self, file_path: str, primary_key: str,
+                 sync_every: int = 1, compact_every: int = 1000) -> None:
+        self.file_path = file_path
+        self.log_path = f"{file_path}.wal"
+        self.primary_key = primary_key
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self._unsynced = 0
+        self._logged = 0
+
+    def load(self) -> List[Dict]:
+        """Recover the collection from the snapshot and the log.
+
+        The files are only read, so no lock is needed.
+        """
+        table = {
+            record.get(self.primary_key): record
+            for record in FileManager.load_data(self.file_path)
+        }
+        self._logged = 0
+
+        try:
+            with open(self.log_path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._replay(table, entry)
+                    self._logged += 1
+        except FileNotFoundError:
+            pass
+
+        return list(table.values())
+
+    def _cut_torn_tail(self) -> None:
+        """Cut a line left incomplete by a crash off the end of the log.
+
+        Callers must hold the collection lock, so that no append of
+        another process is in progress.
+        """
+        try:
+            file = open(self.log_path, "r+b")
+        except FileNotFoundError:
+            return
+        with file:
+            size = end = file.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - self.TAIL_BLOCK)
+                file.seek(start)
+                block = file.read(end - start)
+                if end == size and block.endswith(b"\n"):
+                    return
+                newline = block.rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            print(f"Warning: truncating torn entry in {self.log_path}.")
+            file.truncate(end)
+
+    @staticmethod
+    def _replay(table: Dict[Any, Dict], entry: Dict) -> None:
+        """Apply one logged operation to a table."""
+        key = entry["key"]
+        if entry["op"] == "insert":
+            table.pop(key, None)
+            table[key] = entry["value"]
+        elif entry["op"] == "update":
+            if key in table:
+                table[key].update(entry["value"])
+        else:
+            table.pop(key, None)
+
+    def append(self, operations: Iterable[Operation]) -> None:
+        """Append operations to the log, fsyncing when due.
+
+        Callers must hold the collection lock.
+        """
+        self._cut_torn_tail()
+        lines = [
+            json.dumps({"op": kind, "key": key, "value": value}) + "\n"
+            for kind, key, value in operations
+        ]
+        with open(self.log_path, "a", encoding="utf-8") as file:
+            file.writelines(lines)
+            file.flush()
+            self._unsynced += len(lines)
+            if self._unsynced >= self.sync_every:
+                os.fsync(file.fileno())
+                self._unsynced = 0
+        self._logged += len(lines)
+
+    def sync(self) -> None:
+        """Force pending log appends to disk."""
+        if not self._unsynced or not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "a", encoding="utf-8") as file:
+            os.fsync(file.fileno())
+        self._unsynced = 0
+
+    def needs_compaction(self) -> bool:
+        """Tell whether the log grew past ``compact_every`` entries."""
+        return self._logged >= self.compact_every
+
+    def compact(self, records: List[Dict]) -> None:
+        """Write a new snapshot and empty the log.
+
+        The snapshot and its directory are fsynced before the log is
+        emptied, so a crash never loses both. Callers must hold the
+        collection lock.
+        """
+        FileManager.replace_data(self.file_path, records)
+        with open(self.log_path, "w", encoding="utf-8"):
+            pass
+        self._logged = 0
+        self._unsynced = 0
+
+    def export_json(self, target_path: Optional[str] = None) -> None:
+        """Write the recovered collection in the plain JSON format."""
+        FileManager.replace_data(target_path or self.file_path, self.load())
@@ -0,0 +1,65 @@
+"""Repository tests shared by every storage backend."""
+
+import os
+import tempfile
+import unittest
+from abc import ABC, abstractmethod
+
+from storage.backend import StorageBackend
+from storage.repository import Repository
+
+
+class BackendContract(ABC, unittest.TestCase):
+    """Behaviour every storage backend must provide.
+
+    Subclasses implement ``make_backend()``, called once per repository
+    opened on the same storage. Import this module rather than the
+    class, so test runners do not collect the base class itself.
+    """
+
+    @abstractmethod
+    def make_backend(self) -> StorageBackend:
+        """Return a new backend on the storage of the test."""
+
+    def setUp(self):
+        """Open a repository in a temporary directory."""
+        # Must outlive setUp; removed by addCleanup.
+        # pylint: disable-next=consider-using-with
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.items = os.path.join(self.tmp.name, "items.json")
+        self.backend = self.make_backend()
+        self.addCleanup(self.backend.close)
+        self.repo = self.open_repository(self.backend)
+
+    def open_repository(self, backend=None):
+        """Open a repository, on a new backend unless one is given."""
+        if backend is None:
+            backend = self.make_backend()
+            self.addCleanup(backend.close)
+        repo = Repository(backend=backend)
+        repo.register(self.items, "item_id", indexes=("group",))
+        return repo
+
+    def test_changes_persisted(self):
+        """Inserts, updates and deletes reach the storage."""
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        self.repo.insert(self.items, {"item_id": "B", "group": "x"})
+        self.repo.update(self.items, "A", {"group": "y"})
+        self.repo.delete(self.items, "B")
+
+        other = self.open_repository()
+        self.assertEqual(other.records(self.items),
+                         [{"item_id": "A", "group": "y"}])
+        self.assertEqual(len(other.find_by(self.items, "group", "y")), 1)
+
+    def test_other_repository_detected(self):
+        """Writes from another repository are picked up."""
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        other = self.open_repository()
+        other.insert(self.items, {"item_id": "B", "group": "x"})
+        other.update(self.items, "A", {"group": "y"})
+
+        self.assertIsNotNone(self.repo.get(self.items, "B"))
+        self.assertEqual(len(self.repo.find_by(self.items, "group", "x")), 1)
+        self.assertEqual(len(self.repo.find_by(self.items, "group", "y")), 1)
@@ -0,0 +1,177 @@
+"""Unit tests for the compact reservation representations."""
+
+import unittest
+import uuid
+
+from models.columnar import (ReservationLayout, ReservationRecord,
+                             ReservationTable)
+from models.customer import Customer
+from models.hotel import Hotel
+from models.reservation import RESERVATION_FILE, Reservation
+from storage.file_manager import FileManager
+from storage.repository import REPOSITORY
+
+
+def make_records(count):
+    """Return reservations alternating between undated and dated."""
+    records = []
+    for number in range(count):
+        record = {
+            "reservation_id": str(uuid.uuid4()),
+            "customer_id": f"C{number % 3}",
+            "hotel_id": f"H{number % 2}",
+        }
+        if number % 2:
+            record["check_in"] = "2026-03-01"
+            record["check_out"] = "2026-03-04"
+        records.append(record)
+    return records
+
+
+class TestReservationTable(unittest.TestCase):
+    """Test cases for ReservationTable class."""
+
+    def setUp(self):
+        """Build a table of sample reservations."""
+        self.records = make_records(10)
+        self.table = ReservationTable.from_records(self.records)
+
+    def test_round_trip(self):
+        """Records come back exactly as they were stored."""
+        self.assertEqual(len(self.table), 10)
+        self.assertEqual(list(self.table.records()), self.records)
+        self.assertEqual(
+            ReservationRecord.from_dict(self.records[1]).to_dict(),
+            self.records[1],
+        )
+
+    def test_find_and_filters(self):
+        """Lookups by ID, customer and hotel."""
+        record = self.records[4]
+        self.assertEqual(self.table.get(record["reservation_id"]),
+                         ReservationRecord.from_dict(record))
+        self.assertEqual(len(self.table.by_customer("C0")), 4)
+        self.assertEqual(len(self.table.by_hotel("H1")), 5)
+        self.assertEqual(self.table.by_hotel("NONE"), [])
+
+    def test_delete_and_compact(self):
+        """Deleted rows disappear from lookups and after compaction."""
+        removed = self.records[0]["reservation_id"]
+        self.assertTrue(self.table.delete(removed))
+        self.assertFalse(self.table.delete(removed))
+        self.assertIsNone(self.table.find(removed))
+        self.assertEqual(len(self.table.by_customer("C0")), 3)
+
+        self.table.compact()
+        self.assertEqual(len(self.table), 9)
+        self.assertEqual(list(self.table.records()), self.records[1:])
+
+    def test_non_uuid_ids(self):
+        """Negative test: IDs that are not UUIDs are still supported."""
+        self.table.append({"reservation_id": "legacy-1",
+                           "customer_id": "C9", "hotel_id": "H9"})
+        self.assertEqual(self.table.get("legacy-1").customer_id, "C9")
+        self.assertIsNone(self.table.get("legacy-2"))
+        self.assertTrue(self.table.delete("legacy-1"))
+        self.assertIsNone(self.table.find("legacy-1"))
+
+    def test_non_canonical_uuid_kept_as_text(self):
+        """Negative test: other UUID spellings are not normalized."""
+        canonical = str(uuid.uuid4())
+        spellings = [canonical.upper(), "{" + canonical + "}",
+                     canonical.replace("-", "")]
+        for number, reservation_id in enumerate(spellings):
+            self.table.append({"reservation_id": reservation_id,
+                               "customer_id": f"C{number}",
+                               "hotel_id": "H9"})
+
+        self.assertIsNone(self.table.find(canonical))
+        for reservation_id in spellings:
+            self.assertEqual(self.table.get(reservation_id).reservation_id,
+                             reservation_id)
+        self.assertEqual(
+            [record.reservation_id for record in self.table.by_hotel("H9")],
+            spellings)
+
+    def test_nil_uuid_not_deleted_row(self):
+        """Negative test: a deleted row does not match the nil UUID."""
+        nil = str(uuid.UUID(int=0))
+        self.assertTrue(self.table.delete(self.records[0]["reservation_id"]))
+        self.assertIsNone(self.table.find(nil))
+        self.assertFalse(self.table.delete(nil))
+        self.assertEqual(len(self.table), 9)
+
+        self.table.append({"reservation_id": nil, "customer_id": "C0",
+                           "hotel_id": "H0"})
+        self.assertEqual(self.table.get(nil).reservation_id, nil)
+        self.assertEqual(len(self.table.by_customer("C0")), 4)
+
+    def test_duplicate_id(self):
+        """Negative test: an ID can only be stored once."""
+        with self.assertRaises(ValueError):
+            self.table.append(self.records[3])
+
+    def test_lookups_across_merges(self):
+        """IDs stay reachable after they move into the sorted index."""
+        table = ReservationTable()
+        table.MERGE_MIN = 4
+        records = make_records(50)
+        for record in records:
+            table.append(record)
+        self.assertTrue(table.delete(records[7]["reservation_id"]))
+
+        for record in records[:7] + records[8:]:
+            self.assertEqual(table.get(record["reservation_id"]).to_dict(),
+                             record)
+        self.assertIsNone(table.get(records[7]["reservation_id"]))
+        table.append(records[7])
+        self.assertIsNotNone(table.find(records[7]["reservation_id"]))
+        self.assertEqual(len(table), 50)
+
+
+class TestReservationLayout(unittest.TestCase):
+    """Test cases for ReservationLayout class."""
+
+    def setUp(self):
+        """Reset the files and keep reservations in columns."""
+        for file_path in ("data/hotels.json", "data/customers.json",
+                          RESERVATION_FILE):
+            FileManager.save_data(file_path, [])
+        REPOSITORY.use_layout(RESERVATION_FILE, ReservationLayout)
+        self.addCleanup(REPOSITORY.use_layout, RESERVATION_FILE, dict)
+        Hotel.create_hotel(Hotel("H1", "Hotel1", "MX", 3))
+        Customer.create_customer(Customer("C1", "John", "j@mail.com", "1"))
+
+    def test_models_on_columns(self):
+        """Reservations are created, listed and cancelled as usual."""
+        kept = Reservation.create_reservation("C1", "H1")
+        cancelled = Reservation.create_reservation(
+            "C1", "H1", "2026-03-01", "2026-03-04")
+        Reservation.cancel_reservation(cancelled)
+
+        self.assertEqual(
+            [record["reservation_id"]
+             for record in Reservation.reservations_by_hotel("H1")],
+            [kept])
+        self.assertEqual(len(Reservation.reservations_by_customer("C1")), 1)
+        self.assertEqual(FileManager.load_data(RESERVATION_FILE),
+                         [{"reservation_id": kept, "customer_id": "C1",
+                           "hotel_id": "H1"}])
+
+    def test_update_assigned_back(self):
+        """A changed record is stored by assigning it back."""
+        layout = ReservationLayout()
+        record = make_records(1)[0]
+        layout[record["reservation_id"]] = record
+
+        changed = layout[record["reservation_id"]]
+        changed["hotel_id"] = "H7"
+        self.assertEqual(layout.table.by_hotel("H7"), [])
+        layout[record["reservation_id"]] = changed
+
+        self.assertEqual(len(layout), 1)
+        self.assertEqual(layout.index("hotel_id").lookup("H7"),
+                         [record["reservation_id"]])
+        self.assertIsNone(layout.index("check_in"))
+        with self.assertRaises(KeyError):
+            del layout["NONE"]
@@ -0,0 +1,123 @@
+"""Stress tests for concurrent reservations."""
+
+import multiprocessing
+import threading
+import time
+import unittest
+from unittest import mock
+
+from models.customer import Customer
+from models.hotel import Hotel
+from models.reservation import Reservation
+from storage.file_manager import FileManager
+from storage.repository import REPOSITORY
+
+
+HOTEL_FILE = "data/hotels.json"
+CUSTOMER_FILE = "data/customers.json"
+RESERVATION_FILE = "data/reservations.json"
+
+ROOMS = 10
+WRITERS = 8
+ATTEMPTS = 4
+
+
+def book_rooms(results, attempts):
+    """Try to book rooms, recording how many succeeded."""
+    booked = 0
+    for _ in range(attempts):
+        try:
+            Reservation.create_reservation("C1", "H1")
+            booked += 1
+        except ValueError:
+            pass
+    results.put(booked)
+
+
+class TestConcurrency(unittest.TestCase):
+    """Check that parallel writers never overbook a hotel."""
+
+    def setUp(self):
+        """Reset all files."""
+        FileManager.save_data(HOTEL_FILE, [])
+        FileManager.save_data(CUSTOMER_FILE, [])
+        FileManager.save_data(RESERVATION_FILE, [])
+
+        Hotel.create_hotel(Hotel("H1", "Hotel1", "MX", ROOMS))
+        Hotel.create_hotel(Hotel("H2", "Hotel2", "MX", ROOMS))
+        Customer.create_customer(
+            Customer("C1", "John", "john@mail.com", "123"))
+
+    def assert_not_overbooked(self, booked):
+        """Bookings, counter and stored reservations must agree."""
+        self.assertEqual(booked, ROOMS)
+
+        hotels = {h["hotel_id"]: h for h in FileManager.load_data(HOTEL_FILE)}
+        self.assertEqual(hotels["H1"]["available_rooms"], 0)
+        self.assertEqual(hotels["H2"]["available_rooms"], ROOMS)
+        self.assertEqual(len(FileManager.load_data(RESERVATION_FILE)), ROOMS)
+
+    def test_parallel_threads(self):
+        """Threads competing for the same hotel."""
+        results = multiprocessing.Queue()
+        threads = [
+            threading.Thread(target=book_rooms, args=(results, ATTEMPTS))
+            for _ in range(WRITERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        booked = sum(results.get() for _ in threads)
+        self.assert_not_overbooked(booked)
+
+    def test_parallel_customer_creation(self):
+        """Negative test: only one thread creates a given customer."""
+        get = REPOSITORY.get
+
+        def slow_get(file_path, key):
+            record = get(file_path, key)
+            time.sleep(0.01)
+            return record
+
+        created = []
+
+        def create():
+            try:
+                Customer.create_customer(
+                    Customer("C2", "Ann", "ann@mail.com", "456"))
+                created.append(True)
+            except ValueError:
+                pass
+
+        threads = [threading.Thread(target=create) for _ in range(WRITERS)]
+        with mock.patch.object(REPOSITORY, "get", slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(created), 1)
+        customers = FileManager.load_data(CUSTOMER_FILE)
+        self.assertEqual([c["customer_id"] for c in customers], ["C1", "C2"])
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(),
+        "requires fork start method",
+    )
+    def test_parallel_processes(self):
+        """Processes competing for the same hotel."""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [
+            context.Process(target=book_rooms, args=(results, ATTEMPTS))
+            for _ in range(WRITERS)
+        ]
+        for process in processes:
+            process.start()
+        booked = sum(results.get(timeout=60) for _ in processes)
+        for process in processes:
+            process.join()
+
+        self.assert_not_overbooked(booked)
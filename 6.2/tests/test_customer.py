@@ -1,6 +1,7 @@
 """Unit tests for Customer model."""
 
 import unittest
+from unittest import mock
 from models.customer import Customer
 from storage.file_manager import FileManager
 
@@ -40,3 +41,36 @@ class TestCustomer(unittest.TestCase):
         """Negative test: customer not found."""
         with self.assertRaises(ValueError):
             Customer.display_customer("INVALID")
+
+    def test_create_customers_batch(self):
+        """Test batch creation with one write and per-item failures."""
+        Customer.create_customer(Customer("C1", "John", "j@mail.com", "1"))
+        batch = [
+            {"customer_id": "C2", "name": "Ann", "email": "a@mail.com",
+             "phone": "2"},
+            {"customer_id": "C3", "name": "Bad", "email": "bad",
+             "phone": "3"},
+            Customer("C1", "Dup", "d@mail.com", "4"),
+            Customer("C4", "Bob", "b@mail.com", "5"),
+            Customer("C4", "Bob", "b@mail.com", "5"),
+            None,
+        ]
+
+        with mock.patch.object(FileManager, "save_data",
+                               wraps=FileManager.save_data) as save:
+            report = Customer.create_customers(batch)
+
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(report["created"], ["C2", "C4"])
+        self.assertEqual([f["index"] for f in report["failed"]],
+                         [1, 2, 4, 5])
+        self.assertEqual(len(FileManager.load_data(CUSTOMER_FILE)), 3)
+
+    def test_to_dict_is_a_copy(self):
+        """Customers use slots and to_dict does not alias the object."""
+        customer = Customer("C1", "John", "john@mail.com", "123")
+        data = customer.to_dict()
+        data["name"] = "Changed"
+
+        self.assertEqual(customer.name, "John")
+        self.assertFalse(hasattr(customer, "__dict__"))
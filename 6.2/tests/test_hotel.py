@@ -1,6 +1,7 @@
 """Unit tests for Hotel model."""
 
 import unittest
+from unittest import mock
 from models.hotel import Hotel
 from storage.file_manager import FileManager
 
@@ -65,11 +66,47 @@ class TestHotel(unittest.TestCase):
         hotel = Hotel("H1", "Hotel1", "MX", 5)
         Hotel.create_hotel(hotel)
 
-        Hotel.delete_hotel("H1")
+        with mock.patch.object(Hotel, "lock", wraps=Hotel.lock) as lock:
+            Hotel.delete_hotel("H1")
 
+        lock.assert_called_once_with("H1")
         data = FileManager.load_data(HOTEL_FILE)
         self.assertEqual(len(data), 0)
 
+    def test_hotels_by_location(self):
+        """Test location lookup after create and delete."""
+        Hotel.create_hotel(Hotel("H1", "Hotel1", "MX", 5))
+        Hotel.create_hotel(Hotel("H2", "Hotel2", "US", 5))
+        Hotel.create_hotel(Hotel("H3", "Hotel3", "MX", 5))
+        Hotel.delete_hotel("H1")
+
+        hotels = Hotel.hotels_by_location("MX")
+        self.assertEqual([h["hotel_id"] for h in hotels], ["H3"])
+
+    def test_create_hotels_batch(self):
+        """Test batch creation with per-item failures."""
+        report = Hotel.create_hotels([
+            Hotel("H1", "Hotel1", "MX", 5),
+            {"hotel_id": "H2", "name": "Hotel2", "location": "MX",
+             "total_rooms": 0},
+            {"hotel_id": "H3", "name": "Hotel3", "location": "US",
+             "total_rooms": 3},
+            {"hotel_id": "H4"},
+            "H5",
+        ])
+
+        self.assertEqual(report["created"], ["H1", "H3"])
+        self.assertEqual([f["index"] for f in report["failed"]], [1, 3, 4])
+        self.assertIn("not str", report["failed"][2]["error"])
+        self.assertEqual(len(FileManager.load_data(HOTEL_FILE)), 2)
+
+    def test_lock_non_string_id(self):
+        """Negative test: any ID gets the stripe of its string form."""
+        with Hotel.lock(7), Hotel.lock_many([7, "7"]):
+            pass
+        with self.assertRaises(ValueError):
+            Hotel.reserve_room(7)
+
     def test_corrupted_json_file(self):
         """Negative test: corrupted JSON."""
         with open(HOTEL_FILE, "w", encoding="utf-8") as file:
@@ -77,3 +114,12 @@ class TestHotel(unittest.TestCase):
 
         data = FileManager.load_data(HOTEL_FILE)
         self.assertEqual(data, [])
+
+    def test_to_dict_is_a_copy(self):
+        """Hotels use slots and to_dict does not alias the object."""
+        hotel = Hotel("H1", "Hotel1", "MX", 5)
+        data = hotel.to_dict()
+        data["available_rooms"] = 0
+
+        self.assertEqual(hotel.available_rooms, 5)
+        self.assertFalse(hasattr(hotel, "__dict__"))
@@ -0,0 +1,49 @@
+"""Unit tests for the date-range inventory."""
+
+import random
+import unittest
+from datetime import date, timedelta
+
+from models.inventory import OccupancyTree, parse_stay
+
+
+class TestOccupancyTree(unittest.TestCase):
+    """Test cases for OccupancyTree class."""
+
+    def test_matches_night_by_night_count(self):
+        """Random bookings agree with a plain per-night counter."""
+        rng = random.Random(7)
+        first = date(2026, 1, 1)
+        tree = OccupancyTree()
+        nights = [0] * 120
+        booked = []
+
+        for _ in range(300):
+            if booked and rng.random() < 0.3:
+                start, end = booked.pop(rng.randrange(len(booked)))
+                rooms = -1
+            else:
+                start = rng.randrange(110)
+                end = rng.randrange(start + 1, min(start + 10, 120) + 1)
+                booked.append((start, end))
+                rooms = 1
+            tree.add(first + timedelta(start), first + timedelta(end), rooms)
+            for night in range(start, end):
+                nights[night] += rooms
+
+            low = rng.randrange(119)
+            high = rng.randrange(low + 1, 121)
+            self.assertEqual(
+                tree.peak(first + timedelta(low), first + timedelta(high)),
+                max(nights[low:high]),
+            )
+        self.assertEqual(tree.peak(), max(nights))
+
+    def test_parse_stay_invalid(self):
+        """Negative test: invalid or reversed dates."""
+        with self.assertRaises(ValueError):
+            parse_stay("2026-13-01", "2026-13-02")
+        with self.assertRaises(ValueError):
+            parse_stay("2026-05-02", "2026-05-02")
+        with self.assertRaises(ValueError):
+            parse_stay(None, "2026-05-02")
@@ -0,0 +1,64 @@
+"""Unit tests for the load-testing harness."""
+
+import os
+import unittest
+from unittest import mock
+
+from benchmarks.load_test import (LoadTestConfig, Workload, parse_mix,
+                                  run_benchmark, run_workload)
+from storage.file_manager import FileManager
+
+
+HOTEL_FILE = "data/hotels.json"
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test cases for the load_test benchmark."""
+
+    def test_runs_in_temporary_directory(self):
+        """Every worker count is reported and data/ is left alone."""
+        before = FileManager.load_data(HOTEL_FILE)
+        cwd = os.getcwd()
+
+        reports = run_benchmark(LoadTestConfig(
+            hotels=3, customers=5, reservations=20, operations=40,
+            workers=(1, 3)))
+
+        self.assertEqual([r["workers"] for r in reports], [1, 3])
+        for report in reports:
+            self.assertEqual(report["operations"], 40)
+            self.assertGreaterEqual(report["p99_ms"], report["p50_ms"])
+            self.assertGreater(report["peak_rss_kib"], 0)
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(FileManager.load_data(HOTEL_FILE), before)
+
+    def test_sharded_backend_and_memory_trace(self):
+        """The harness runs against another backend with tracemalloc."""
+        reports = run_benchmark(LoadTestConfig(
+            hotels=2, customers=2, reservations=5, operations=10,
+            workers=(2,), backend="sharded", shards=2, trace_memory=True))
+
+        self.assertEqual(reports[0]["backend"], "sharded")
+        self.assertGreater(reports[0]["traced_peak_bytes"], 0)
+
+    def test_failures_counted_per_operation(self):
+        """Negative test: any exception is counted under its operation."""
+        workload = Workload(1, 1, [])
+        workload.run = mock.Mock(side_effect=[KeyError("H0"),
+                                              RuntimeError("boom"), None])
+
+        report = run_workload(workload, 1, LoadTestConfig(
+            operations=3, mix={"display": 1.0}))
+
+        self.assertEqual(report["operations"], 3)
+        self.assertEqual(report["errors"], 2)
+        self.assertEqual(report["errors_by_operation"], {"display": 2})
+
+    def test_parse_mix(self):
+        """Negative test: unknown operations and bad weights."""
+        self.assertEqual(parse_mix("display=3,cancel=1"),
+                         {"display": 0.75, "cancel": 0.25})
+        with self.assertRaises(ValueError):
+            parse_mix("drop=1")
+        with self.assertRaises(ValueError):
+            parse_mix("display=0")
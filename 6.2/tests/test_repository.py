@@ -0,0 +1,152 @@
+"""Unit tests for the in-memory Repository."""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import backend_contract
+
+from storage.backend import JsonBackend
+from storage.file_manager import FileManager
+from storage.repository import Repository
+
+
+class TestRepository(unittest.TestCase):
+    """Test cases for Repository class."""
+
+    def setUp(self):
+        """Create an isolated collection file."""
+        # Must outlive setUp; removed by tearDown.
+        # pylint: disable-next=consider-using-with
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "items.json")
+        FileManager.save_data(self.path, [{"item_id": "A", "qty": 1}])
+        self.repo = Repository()
+        self.repo.register(self.path, "item_id", indexes=("group",))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_collection_loaded_once(self):
+        """Repeated reads do not parse the file again."""
+        with mock.patch.object(FileManager, "load_data",
+                               wraps=FileManager.load_data) as load:
+            self.repo.get(self.path, "A")
+            self.repo.get(self.path, "A")
+            self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+            self.repo.get(self.path, "B")
+
+        self.assertEqual(load.call_count, 1)
+
+    def test_batch_defers_writes(self):
+        """Writes happen once, when the batch ends."""
+        with mock.patch.object(FileManager, "save_data",
+                               wraps=FileManager.save_data) as save:
+            with self.repo.batch():
+                self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+                self.repo.update(self.path, "A", {"qty": 5})
+                self.assertEqual(len(FileManager.load_data(self.path)), 1)
+
+        self.assertEqual(save.call_count, 1)
+        data = FileManager.load_data(self.path)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]["qty"], 5)
+
+    def test_flush_every(self):
+        """Operations are flushed once the threshold is reached."""
+        self.repo.flush_every = 2
+        self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+        self.assertEqual(len(FileManager.load_data(self.path)), 1)
+
+        self.repo.insert(self.path, {"item_id": "C", "qty": 3})
+        self.assertEqual(len(FileManager.load_data(self.path)), 3)
+
+    def test_external_change_reloaded(self):
+        """A file rewritten by someone else is read again."""
+        self.repo.get(self.path, "A")
+        FileManager.save_data(self.path, [{"item_id": "Z", "qty": 9}])
+
+        self.assertIsNone(self.repo.get(self.path, "A"))
+        self.assertEqual(self.repo.get(self.path, "Z")["qty"], 9)
+
+    def test_pending_replayed_on_external_change(self):
+        """Queued operations survive a reload of the file."""
+        with self.repo.batch():
+            self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+            FileManager.save_data(self.path, [{"item_id": "Z", "qty": 9}])
+
+        ids = [r["item_id"] for r in FileManager.load_data(self.path)]
+        self.assertEqual(ids, ["Z", "B"])
+
+    def test_delete_missing(self):
+        """Negative test: deleting a missing record."""
+        self.assertFalse(self.repo.delete(self.path, "INVALID"))
+
+    def test_find_by_index(self):
+        """Secondary index follows inserts, updates and deletes."""
+        self.repo.insert(self.path, {"item_id": "B", "group": "x"})
+        self.repo.insert(self.path, {"item_id": "C", "group": "x"})
+        self.repo.update(self.path, "B", {"group": "y"})
+        self.repo.delete(self.path, "C")
+
+        self.assertEqual(self.repo.find_by(self.path, "group", "x"), [])
+        found = self.repo.find_by(self.path, "group", "y")
+        self.assertEqual([r["item_id"] for r in found], ["B"])
+
+    def test_find_by_unindexed_field(self):
+        """Negative test: querying a field without index."""
+        with self.assertRaises(ValueError):
+            self.repo.find_by(self.path, "qty", 1)
+
+    def test_failed_batch_discarded(self):
+        """Negative test: a batch that raises writes none of its changes."""
+        with mock.patch.object(FileManager, "save_data",
+                               wraps=FileManager.save_data) as save:
+            with self.assertRaises(KeyError):
+                with self.repo.batch():
+                    self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+                    self.repo.update(self.path, "A", {"qty": 5})
+                    raise KeyError("C")
+
+        self.assertEqual(save.call_count, 0)
+        self.assertIsNone(self.repo.get(self.path, "B"))
+        self.assertEqual(self.repo.get(self.path, "A")["qty"], 1)
+
+    def test_failed_inner_batch_discarded(self):
+        """An inner batch that raises keeps the outer batch changes."""
+        with self.repo.batch():
+            self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+            with self.assertRaises(KeyError):
+                with self.repo.batch():
+                    self.repo.insert(self.path, {"item_id": "C", "qty": 3})
+                    raise KeyError("C")
+
+        ids = [r["item_id"] for r in FileManager.load_data(self.path)]
+        self.assertEqual(ids, ["A", "B"])
+
+    def test_other_thread_does_not_flush_open_batch(self):
+        """Negative test: a write of another thread waits for the batch."""
+        writer = threading.Thread(target=self.repo.insert,
+                                  args=(self.path, {"item_id": "W"}))
+        with self.assertRaises(KeyError):
+            with self.repo.batch():
+                self.repo.insert(self.path, {"item_id": "B", "qty": 2})
+                writer.start()
+                writer.join(timeout=0.2)
+                self.assertTrue(writer.is_alive())
+                raise KeyError("B")
+        writer.join()
+
+        ids = [r["item_id"] for r in FileManager.load_data(self.path)]
+        self.assertEqual(ids, ["A", "W"])
+
+
+class TestJsonBackend(backend_contract.BackendContract):
+    """Backend contract of JsonBackend."""
+
+    def make_backend(self):
+        """Store the collection in its JSON file."""
+        return JsonBackend()
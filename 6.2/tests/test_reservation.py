@@ -46,6 +46,65 @@ class TestReservation(unittest.TestCase):
         data = FileManager.load_data(RESERVATION_FILE)
         self.assertEqual(len(data), 0)
 
+    def test_cancel_reservation_returns_room(self):
+        """Cancelling gives the room back to the hotel."""
+        reservation_id = Reservation.create_reservation("C1", "H1")
+        Reservation.cancel_reservation(reservation_id)
+
+        hotels = FileManager.load_data(HOTEL_FILE)
+        self.assertEqual(hotels[0]["available_rooms"], 2)
+
+    def test_dated_reservations(self):
+        """Rooms are only taken for the nights of a stay."""
+        Reservation.create_reservation("C1", "H1", "2026-05-01",
+                                       "2026-05-05")
+        Reservation.create_reservation("C1", "H1", "2026-05-03",
+                                       "2026-05-06")
+
+        with self.assertRaises(ValueError):
+            Reservation.create_reservation("C1", "H1", "2026-05-04",
+                                           "2026-05-05")
+        Reservation.create_reservation("C1", "H1", "2026-05-06",
+                                       "2026-05-08")
+
+        self.assertFalse(
+            Reservation.is_available("H1", "2026-05-02", "2026-05-04"))
+        self.assertTrue(
+            Reservation.is_available("H1", "2026-05-01", "2026-05-03"))
+
+    def test_dated_and_undated_reservations(self):
+        """Rooms taken for good are not available for any date."""
+        Reservation.create_reservation("C1", "H1")
+        reservation_id = Reservation.create_reservation(
+            "C1", "H1", "2026-05-01", "2026-05-05")
+
+        with self.assertRaises(ValueError):
+            Reservation.create_reservation("C1", "H1")
+
+        Reservation.cancel_reservation(reservation_id)
+        Reservation.create_reservation("C1", "H1")
+
+    def test_available_hotels(self):
+        """Hotels of a location with a room in the window."""
+        Hotel.create_hotel(Hotel("H2", "Hotel2", "MX", 1))
+        Hotel.create_hotel(Hotel("H3", "Hotel3", "US", 1))
+        Reservation.create_reservation("C1", "H2", "2026-05-01",
+                                       "2026-05-05")
+
+        hotels = Reservation.available_hotels("MX", "2026-05-04",
+                                              "2026-05-06")
+        self.assertEqual([h["hotel_id"] for h in hotels], ["H1"])
+
+        hotels = Reservation.available_hotels("MX", "2026-05-05",
+                                              "2026-05-06")
+        self.assertEqual([h["hotel_id"] for h in hotels], ["H1", "H2"])
+
+    def test_dated_reservation_invalid_dates(self):
+        """Negative test: check-out before check-in."""
+        with self.assertRaises(ValueError):
+            Reservation.create_reservation("C1", "H1", "2026-05-05",
+                                           "2026-05-01")
+
     def test_cancel_reservation_not_found(self):
         """Negative test: reservation not found."""
         with self.assertRaises(ValueError):
@@ -58,3 +117,35 @@ class TestReservation(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             Reservation.create_reservation("C1", "H1")
+
+    def test_reservations_by_customer_and_hotel(self):
+        """Secondary lookups stay consistent after a cancel."""
+        Reservation.create_reservation("C1", "H1")
+        Reservation.create_reservation("C1", "H1")
+
+        by_customer = Reservation.reservations_by_customer("C1")
+        self.assertEqual(len(by_customer), 2)
+
+        Reservation.cancel_reservation(by_customer[0]["reservation_id"])
+
+        self.assertEqual(len(Reservation.reservations_by_customer("C1")), 1)
+        self.assertEqual(len(Reservation.reservations_by_hotel("H1")), 1)
+        self.assertEqual(Reservation.reservations_by_hotel("H2"), [])
+
+    def test_create_reservations_batch(self):
+        """Test batch reservations stop at the hotel capacity."""
+        report = Reservation.create_reservations([
+            {"customer_id": "C1", "hotel_id": "H1"},
+            {"customer_id": "C1", "hotel_id": "INVALID"},
+            {"customer_id": "C1", "hotel_id": "H1"},
+            {"customer_id": "C1", "hotel_id": "H1"},
+            {"hotel_id": "H1"},
+            ["C1", "H1"],
+        ])
+
+        self.assertEqual(len(report["created"]), 2)
+        self.assertEqual([f["index"] for f in report["failed"]],
+                         [1, 3, 4, 5])
+        self.assertEqual(len(FileManager.load_data(RESERVATION_FILE)), 2)
+        hotels = FileManager.load_data(HOTEL_FILE)
+        self.assertEqual(hotels[0]["available_rooms"], 0)
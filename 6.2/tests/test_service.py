@@ -0,0 +1,152 @@
+"""Unit tests for the asyncio reservation service."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from models.customer import Customer
+from models.hotel import Hotel
+from service.loadgen import ServiceClient, percentile, run_load
+from service.server import OPERATIONS, ReservationService, execute_batch
+from storage.file_manager import FileManager
+from storage.repository import REPOSITORY
+
+
+HOTEL_FILE = "data/hotels.json"
+CUSTOMER_FILE = "data/customers.json"
+RESERVATION_FILE = "data/reservations.json"
+
+
+class TestReservationService(unittest.TestCase):
+    """Test cases for ReservationService class."""
+
+    def setUp(self):
+        """Reset all files."""
+        FileManager.save_data(HOTEL_FILE, [])
+        FileManager.save_data(CUSTOMER_FILE, [])
+        FileManager.save_data(RESERVATION_FILE, [])
+
+        Hotel.create_hotel(Hotel("H1", "Hotel1", "MX", 3))
+        Customer.create_customer(
+            Customer("C1", "John", "john@mail.com", "123"))
+
+    def run_service(self, scenario, **options):
+        """Run a coroutine against a service on a free port."""
+        async def runner():
+            service = ReservationService(port=0, **options)
+            await service.start()
+            try:
+                return service, await scenario(service)
+            finally:
+                await service.stop()
+
+        return asyncio.run(runner())
+
+    def test_concurrent_requests_share_commit(self):
+        """Concurrent bookings are batched into one commit."""
+        async def scenario(service):
+            clients = [await ServiceClient.connect("127.0.0.1", service.port)
+                       for _ in range(5)]
+            responses = await asyncio.gather(*(
+                client.call("create_reservation", customer_id="C1",
+                            hotel_id="H1")
+                for client in clients
+            ))
+            for client in clients:
+                await client.close()
+            return responses
+
+        with mock.patch.object(REPOSITORY, "commit",
+                               wraps=REPOSITORY.commit) as commit:
+            service, responses = self.run_service(scenario, max_delay=0.2)
+
+        self.assertEqual(sum(r["ok"] for r in responses), 3)
+        self.assertEqual(service.batches, 1)
+        self.assertEqual(commit.call_count, 2)
+        self.assertEqual(len(FileManager.load_data(RESERVATION_FILE)), 3)
+
+    def test_invalid_requests(self):
+        """Negative test: malformed lines and unknown operations."""
+        async def scenario(service):
+            client = await ServiceClient.connect("127.0.0.1", service.port)
+            unknown = await client.call("drop_everything")
+            missing = await client.call("display_hotel", hotel_id="NONE")
+            await client.close()
+
+            reader, writer = await asyncio.open_connection(
+                "127.0.0.1", service.port)
+            writer.write(b"not json\n")
+            malformed = await reader.readline()
+            writer.close()
+            return unknown, missing, malformed
+
+        _, (unknown, missing, malformed) = self.run_service(scenario)
+
+        self.assertFalse(unknown["ok"])
+        self.assertEqual(missing["error"], "Hotel not found.")
+        self.assertIn(b'"ok": false', malformed)
+
+    def test_load_generator(self):
+        """The load generator reports throughput and percentiles."""
+        async def scenario(service):
+            return await run_load("127.0.0.1", service.port, clients=3,
+                                  requests=20, hotels=2)
+
+        _, report = self.run_service(scenario)
+
+        self.assertEqual(report["requests"], 60)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreaterEqual(report["p99_ms"], report["p50_ms"])
+        self.assertEqual(percentile([], 0.99), 0.0)
+
+    def test_batch_locks_only_touched_hotels(self):
+        """Writes lock the hotels they touch; reads take no lock."""
+        with mock.patch.object(Hotel, "lock_many",
+                               wraps=Hotel.lock_many) as lock_many:
+            execute_batch([
+                {"op": "display_hotel", "args": {"hotel_id": "H1"}},
+                {"op": "ping"},
+            ])
+            created = execute_batch([{
+                "op": "create_reservation",
+                "args": {"customer_id": "C1", "hotel_id": "H1"},
+            }])
+            execute_batch([{
+                "op": "cancel_reservation",
+                "args": {"reservation_id": created[0]["result"]},
+            }])
+
+        self.assertEqual([call.args[0] for call in lock_many.call_args_list],
+                         [set(), {"H1"}, {"H1"}])
+        self.assertEqual(FileManager.load_data(RESERVATION_FILE), [])
+
+    def test_unexpected_error_reported_per_request(self):
+        """Negative test: a crashing request is rolled back alone."""
+        def explode():
+            Hotel.create_hotel(Hotel("H9", "Hotel9", "MX", 1))
+            raise RuntimeError("boom")
+
+        with mock.patch.dict(OPERATIONS, {"explode": explode}):
+            responses = execute_batch([
+                {"id": 1, "op": "explode"},
+                {"id": 2, "op": "create_hotel",
+                 "args": {"hotel_id": "H2", "name": "Hotel2",
+                          "location": "MX", "total_rooms": 1}},
+            ])
+
+        self.assertFalse(responses[0]["ok"])
+        self.assertIn("boom", responses[0]["error"])
+        self.assertTrue(responses[1]["ok"])
+        hotel_ids = [h["hotel_id"] for h in FileManager.load_data(HOTEL_FILE)]
+        self.assertEqual(hotel_ids, ["H1", "H2"])
+
+    def test_requests_after_stop(self):
+        """Negative test: a stopped service answers with an error."""
+        async def scenario(service):
+            await service.stop()
+            return await service.submit({"id": 7, "op": "ping"})
+
+        _, response = self.run_service(scenario)
+
+        self.assertEqual(response, {"id": 7, "ok": False,
+                                    "error": "Service stopped."})
@@ -0,0 +1,162 @@
+"""Unit tests for the sharded JSON storage."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import backend_contract
+
+from storage.file_manager import FileManager
+from storage.shards import ShardedJsonBackend, ShardedStore
+
+
+class TestShardedStore(unittest.TestCase):
+    """Test cases for ShardedStore class."""
+
+    def setUp(self):
+        """Write a monolithic collection in a temporary directory."""
+        # Must outlive setUp; removed by addCleanup.
+        # pylint: disable-next=consider-using-with
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.items = os.path.join(self.tmp.name, "items.json")
+        self.records = [{"item_id": f"I{n}", "value": n} for n in range(50)]
+        FileManager.save_data(self.items, self.records)
+
+    def shard_files(self):
+        """Return the shard files on disk."""
+        directory = os.path.join(self.tmp.name, "items")
+        return sorted(name for name in os.listdir(directory)
+                      if name.startswith("shard-"))
+
+    def test_split_and_lazy_get(self):
+        """A lookup reads only the shard holding the key."""
+        self.assertEqual(ShardedStore(self.items, "item_id", 8)
+                         .rebalance(8), 50)
+        self.assertEqual(len(self.shard_files()), 8)
+
+        store = ShardedStore(self.items, "item_id")
+        self.assertEqual(store.shards, 8)
+        with mock.patch.object(FileManager, "load_data",
+                               wraps=FileManager.load_data) as load:
+            self.assertEqual(store.get("I7"), {"item_id": "I7", "value": 7})
+            self.assertEqual(store.get("I7")["value"], 7)
+        self.assertEqual(load.call_count, 1)
+        self.assertCountEqual(store.records(), self.records)
+
+    def test_only_dirty_shards_written(self):
+        """Flushing rewrites only the shards that changed."""
+        store = ShardedStore(self.items, "item_id", 8)
+        store.rebalance(8)
+        store.put({"item_id": "I3", "value": -3})
+        store.put({"item_id": "I3", "value": -4})
+        self.assertFalse(store.remove("NONE"))
+
+        with mock.patch.object(FileManager, "save_data",
+                               wraps=FileManager.save_data) as save:
+            written = store.flush()
+        self.assertEqual(written, [store.shard_of("I3")])
+        self.assertEqual([call.args[0] for call in save.call_args_list],
+                         [store.shard_path(written[0]), store.manifest_path])
+
+        other = ShardedStore(self.items, "item_id")
+        self.assertEqual(other.get("I3")["value"], -4)
+
+    def test_external_write_merged(self):
+        """Unflushed changes are replayed over another writer's shard."""
+        store = ShardedStore(self.items, "item_id", 1)
+        store.rebalance(1)
+        other = ShardedStore(self.items, "item_id")
+        store.put({"item_id": "I3", "value": -3})
+
+        other.put({"item_id": "I4", "value": -4})
+        other.flush()
+        store.flush()
+
+        reader = ShardedStore(self.items, "item_id")
+        self.assertEqual(reader.get("I3")["value"], -3)
+        self.assertEqual(reader.get("I4")["value"], -4)
+        self.assertEqual(len(reader.records()), 50)
+
+    def test_rebalance(self):
+        """Changing the shard count keeps every record."""
+        store = ShardedStore(self.items, "item_id", 8)
+        store.rebalance(8)
+        reader = ShardedStore(self.items, "item_id")
+        reader.get("I1")
+
+        self.assertEqual(store.rebalance(3), 50)
+        self.assertEqual(len(self.shard_files()), 3)
+        self.assertEqual(reader.get("I1"), {"item_id": "I1", "value": 1})
+        self.assertEqual(reader.shards, 3)
+        self.assertCountEqual(reader.records(), self.records)
+
+    def test_rebalance_invalid_count(self):
+        """Negative test: a collection needs at least one shard."""
+        with self.assertRaises(ValueError):
+            ShardedStore(self.items, "item_id").rebalance(0)
+
+
+class TestShardedJsonBackend(backend_contract.BackendContract):
+    """Test cases for ShardedJsonBackend class."""
+
+    def make_backend(self):
+        """Shard the collection in four."""
+        return ShardedJsonBackend(shards=4)
+
+    def test_get_reads_one_shard(self):
+        """A lookup in a new repository reads only the key's shard."""
+        for number in range(20):
+            self.repo.insert(self.items, {"item_id": f"I{number}",
+                                          "group": "x"})
+        backend = self.make_backend()
+        other = self.open_repository(backend)
+
+        with mock.patch.object(FileManager, "load_data",
+                               wraps=FileManager.load_data) as load:
+            self.assertEqual(other.get(self.items, "I3")["group"], "x")
+            self.assertIsNone(other.get(self.items, "NONE"))
+        store = backend.store(self.items)
+        self.assertEqual(load.call_count,
+                         len({store.shard_of("I3"), store.shard_of("NONE")}))
+        self.assertEqual(len(other.find_by(self.items, "group", "x")), 20)
+
+    def test_get_sees_queued_operations(self):
+        """A fetched record includes the changes not written yet."""
+        self.repo.flush_every = 10
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        self.repo.update(self.items, "A", {"group": "y"})
+        self.repo.invalidate(self.items)
+
+        self.assertEqual(self.repo.get(self.items, "A"),
+                         {"item_id": "A", "group": "y"})
+        self.repo.delete(self.items, "A")
+        self.repo.invalidate(self.items)
+        self.assertIsNone(self.repo.get(self.items, "A"))
+
+    def test_only_changed_shards_reloaded(self):
+        """Writes from another repository reload only their shard."""
+        for number in range(20):
+            self.repo.insert(self.items, {"item_id": f"I{number}",
+                                          "group": "x"})
+        other = self.open_repository()
+        other.update(self.items, "I3", {"group": "y"})
+
+        with mock.patch.object(FileManager, "load_data",
+                               wraps=FileManager.load_data) as load:
+            self.assertEqual(self.repo.get(self.items, "I3")["group"], "y")
+            self.assertEqual(self.repo.get(self.items, "I4")["group"], "x")
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(len(self.repo.find_by(self.items, "group", "x")),
+                         19)
+
+    def test_failed_write_not_cached(self):
+        """Negative test: a failed flush does not leave stale records."""
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        with mock.patch.object(FileManager, "save_data",
+                               side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.repo.update(self.items, "A", {"group": "y"})
+
+        self.assertEqual(self.repo.get(self.items, "A")["group"], "x")
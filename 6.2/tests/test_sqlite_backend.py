@@ -0,0 +1,121 @@
+"""Unit tests for the SQLite storage backend."""
+
+import os
+from unittest import mock
+
+import backend_contract
+
+from models.customer import Customer
+from models.hotel import Hotel
+from models.reservation import Reservation
+from storage.backend import JsonBackend
+from storage.file_manager import FileManager
+from storage.migrate import migrate
+from storage.repository import REPOSITORY
+from storage import sqlite_backend
+from storage.sqlite_backend import SqliteBackend
+
+
+class TestSqliteBackend(backend_contract.BackendContract):
+    """Test cases for SqliteBackend class."""
+
+    def make_backend(self):
+        """Open the test database."""
+        return SqliteBackend(os.path.join(self.tmp.name, "test.db"))
+
+    def test_failed_commit_rolled_back(self):
+        """Negative test: a failing write leaves the database unchanged."""
+        logs = os.path.join(self.tmp.name, "logs.json")
+        self.repo.register(logs, "log_id")
+
+        with self.assertRaises(TypeError):
+            with self.repo.batch():
+                self.repo.insert(self.items, {"item_id": "A"})
+                self.repo.insert(logs, {"log_id": "L1", "bad": {1, 2}})
+
+        self.assertEqual(self.open_repository().records(self.items), [])
+        self.assertIsNone(self.repo.get(self.items, "A"))
+
+    def test_same_file_name_in_other_folder(self):
+        """Collections with the same file name keep their own tables."""
+        os.mkdir(os.path.join(self.tmp.name, "other"))
+        twin = os.path.join(self.tmp.name, "other", "items.json")
+        self.repo.register(twin, "item_id")
+
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        self.repo.insert(twin, {"item_id": "B"})
+
+        other = self.open_repository()
+        other.register(twin, "item_id")
+        self.assertEqual(other.records(self.items),
+                         [{"item_id": "A", "group": "x"}])
+        self.assertEqual(other.records(twin), [{"item_id": "B"}])
+
+    def test_lookups_do_not_load_collection(self):
+        """get and find_by query the database instead of loading it."""
+        for number in range(5):
+            self.repo.insert(self.items, {"item_id": f"I{number}",
+                                          "group": f"g{number % 2}"})
+        other = self.open_repository()
+
+        with mock.patch.object(SqliteBackend, "load") as load:
+            self.assertEqual(other.get(self.items, "I3")["group"], "g1")
+            self.assertIsNone(other.get(self.items, "NONE"))
+            self.assertEqual(
+                [record["item_id"]
+                 for record in other.find_by(self.items, "group", "g0")],
+                ["I0", "I2", "I4"])
+        load.assert_not_called()
+
+    def test_changes_of_others_read_incrementally(self):
+        """Only the records another connection touched are read again."""
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        self.repo.insert(self.items, {"item_id": "B", "group": "x"})
+        self.repo.records(self.items)
+        other = self.open_repository()
+        other.update(self.items, "A", {"group": "y"})
+        other.delete(self.items, "B")
+
+        with mock.patch.object(SqliteBackend, "load") as load:
+            self.assertEqual(self.repo.records(self.items),
+                             [{"item_id": "A", "group": "y"}])
+            self.assertEqual(
+                len(self.repo.find_by(self.items, "group", "x")), 0)
+        load.assert_not_called()
+
+    def test_reader_behind_history_reloads(self):
+        """Negative test: past the change history, the table is reloaded."""
+        self.repo.insert(self.items, {"item_id": "A", "group": "x"})
+        self.repo.records(self.items)
+        other = self.open_repository()
+
+        with mock.patch.object(sqlite_backend, "CHANGE_HISTORY", 2):
+            for number in range(4):
+                other.insert(self.items, {"item_id": f"I{number}"})
+        with mock.patch.object(SqliteBackend, "load",
+                               wraps=self.backend.load) as load:
+            self.assertEqual(len(self.repo.records(self.items)), 5)
+        load.assert_called_once()
+
+    def test_migrate_from_json(self):
+        """Records of the JSON files are copied into the database."""
+        FileManager.save_data(self.items, [{"item_id": "A", "group": "x"}])
+
+        counts = migrate(self.backend, self.repo)
+
+        self.assertEqual(counts, {self.items: 1})
+        self.assertEqual(len(self.open_repository().records(self.items)), 1)
+
+    def test_models_on_sqlite(self):
+        """Models work unchanged on the SQLite backend."""
+        REPOSITORY.use_backend(self.backend)
+        self.addCleanup(REPOSITORY.use_backend, JsonBackend())
+        Hotel.create_hotel(Hotel("H1", "Hotel1", "MX", 1))
+        Customer.create_customer(Customer("C1", "John", "j@mail.com", "1"))
+
+        Reservation.create_reservation("C1", "H1")
+
+        with self.assertRaises(ValueError):
+            Reservation.create_reservation("C1", "H1")
+        self.assertEqual(Hotel.display_hotel("H1")["available_rooms"], 0)
+        self.assertEqual(len(Reservation.reservations_by_hotel("H1")), 1)
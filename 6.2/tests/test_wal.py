@@ -0,0 +1,99 @@
+"""Unit tests for the write-ahead log storage."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from storage.file_manager import FileManager
+from storage.repository import Repository
+from storage.wal import WriteAheadLog
+
+
+class TestWriteAheadLog(unittest.TestCase):
+    """Test cases for WriteAheadLog class."""
+
+    def setUp(self):
+        """Create an isolated snapshot file."""
+        # Must outlive setUp; removed by tearDown.
+        # pylint: disable-next=consider-using-with
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "reservations.json")
+        FileManager.save_data(self.path, [{"reservation_id": "R0"}])
+        self.log = WriteAheadLog(self.path, "reservation_id")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_recover_from_log(self):
+        """Snapshot plus log gives the current collection."""
+        self.log.append([
+            ("insert", "R1", {"reservation_id": "R1", "hotel_id": "H1"}),
+            ("update", "R1", {"hotel_id": "H2"}),
+            ("delete", "R0", None),
+        ])
+
+        records = WriteAheadLog(self.path, "reservation_id").load()
+        self.assertEqual(records, [{"reservation_id": "R1",
+                                    "hotel_id": "H2"}])
+
+    def test_torn_entry_truncated(self):
+        """Negative test: a half written entry is cut off by the writer."""
+        self.log.append([("insert", "R1", {"reservation_id": "R1"})])
+        with open(self.log.log_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "insert", "key": "R2", "val')
+        size = os.path.getsize(self.log.log_path)
+
+        self.assertEqual(len(self.log.load()), 2)
+        self.assertEqual(os.path.getsize(self.log.log_path), size)
+
+        self.log.append([("insert", "R3", {"reservation_id": "R3"})])
+        with open(self.log.log_path, "r", encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 2)
+        self.assertEqual(len(self.log.load()), 3)
+
+    def test_compact(self):
+        """Compaction writes the JSON snapshot and empties the log."""
+        self.log.append([("insert", "R1", {"reservation_id": "R1"})])
+        log_sizes = []
+        real_fsync = os.fsync
+
+        def fsync(descriptor):
+            log_sizes.append(os.path.getsize(self.log.log_path))
+            real_fsync(descriptor)
+
+        with mock.patch("os.fsync", side_effect=fsync):
+            self.log.compact(self.log.load())
+
+        # The snapshot file, then its directory, before the log empties.
+        self.assertEqual(len(log_sizes), 2)
+        self.assertNotIn(0, log_sizes)
+        self.assertEqual(os.path.getsize(self.log.log_path), 0)
+        self.assertEqual(len(FileManager.load_data(self.path)), 2)
+
+    def test_export_json(self):
+        """The recovered collection can be exported as plain JSON."""
+        self.log.append([("delete", "R0", None)])
+        target = os.path.join(self.tmp.name, "export.json")
+
+        self.log.export_json(target)
+
+        self.assertEqual(FileManager.load_data(target), [])
+
+    def test_repository_appends_instead_of_rewriting(self):
+        """A logged collection is not rewritten on every change."""
+        repo = Repository()
+        repo.register(self.path, "reservation_id")
+        repo.use_log(self.path, compact_every=3)
+
+        with mock.patch.object(FileManager, "save_data") as save:
+            repo.insert(self.path, {"reservation_id": "R1"})
+            repo.delete(self.path, "R0")
+        save.assert_not_called()
+        self.assertEqual(len(FileManager.load_data(self.path)), 1)
+
+        repo.insert(self.path, {"reservation_id": "R2"})
+
+        ids = [r["reservation_id"] for r in FileManager.load_data(self.path)]
+        self.assertEqual(ids, ["R1", "R2"])
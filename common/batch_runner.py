@@ -0,0 +1,403 @@
+"""
+batch_runner.py
+
+Run one of the command line programs over many input files inside a
+single warm process, or a pool of them.
+
+Each input gets its own results file named like the stored results
+(results/StatisticsResults_TC1.txt, results/TC1/SalesResults.txt),
+written as soon as the input is processed, and an aggregate timing
+summary is printed and written to BatchSummary.json in the output
+folder. Inputs whose results would share a file name are refused.
+
+Usage:
+    python common/batch_runner.py PROGRAM [INPUT ...] [--manifest FILE]
+        [--output-dir DIR] [--workers N] [--price-file FILE]
+
+PROGRAM is one of: statistics, conversion, wordcount, sales.
+INPUT may be a glob pattern such as "4.2/P1/tests/TC*.txt".
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from common.metrics import Metrics  # noqa: E402
+
+
+PROGRAMS = {
+    "statistics": {
+        "script": "4.2/P1/src/computeStatistics.py",
+        "results": "StatisticsResults_{name}.txt",
+    },
+    "conversion": {
+        "script": "4.2/P2/src/convertNumbers.py",
+        "results": "ConversionResults_{name}.txt",
+    },
+    "wordcount": {
+        "script": "4.2/P3/src/wordCount.py",
+        "results": "WordCountResults_{name}.txt",
+    },
+    "sales": {
+        "script": "5.2/src/computeSales.py",
+        "results": "{name}/SalesResults.txt",
+    },
+}
+
+_MODULES = {}
+
+
+def load_program(program):
+    """
+    Import the script of a program once per process.
+
+    Args:
+        program (str): Key of PROGRAMS.
+
+    Returns:
+        module: The imported script.
+    """
+    if program not in _MODULES:
+        script = ROOT / PROGRAMS[program]["script"]
+        spec = importlib.util.spec_from_file_location(script.stem, script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _MODULES[program] = module
+    return _MODULES[program]
+
+
+def results_name(program, input_file):
+    """
+    Name the results file of one input.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        input_file (str): e.g. "tests/TC3.txt" or "TC1/TC1.Sales.json".
+
+    Returns:
+        str: e.g. "StatisticsResults_TC3.txt" or "TC1/SalesResults.txt".
+    """
+    name = Path(input_file).name.split(".")[0]
+    return PROGRAMS[program]["results"].format(name=name)
+
+
+def check_results_names(program, inputs):
+    """
+    Make sure no two inputs write the same results file.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        inputs (list): Input files.
+
+    Raises:
+        ValueError: If two inputs share a results file name, such as
+            "a/TC1.txt" and "b/TC1.txt".
+    """
+    owners = {}
+    for input_file in inputs:
+        name = results_name(program, input_file)
+        if name in owners:
+            raise ValueError(
+                f"{owners[name]} and {input_file} would both write "
+                f"{name}; run them in separate batches."
+            )
+        owners[name] = input_file
+
+
+def collect_inputs(patterns, manifest=None):
+    """
+    Expand glob patterns and manifest entries into input files.
+
+    Manifest lines are paths relative to the manifest; blank lines and
+    lines starting with "#" are skipped.
+
+    Args:
+        patterns (list): Paths or glob patterns.
+        manifest (str): Optional manifest file.
+
+    Returns:
+        list: Input files in the given order, keeping the first
+            spelling of paths that resolve to the same file.
+    """
+    entries = list(patterns)
+    if manifest:
+        base = Path(manifest).parent
+        with open(manifest, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    entries.append(str(base / line))
+
+    inputs, seen = [], set()
+    for entry in entries:
+        matches = sorted(glob.glob(entry)) if glob.has_magic(entry) else [
+            entry
+        ]
+        if not matches:
+            print(f"WARNING: No files match -> {entry}")
+        for match in matches:
+            resolved = Path(match).resolve()
+            if resolved not in seen:
+                seen.add(resolved)
+                inputs.append(match)
+    return inputs
+
+
+def run_one(program, input_file, price_file=None):
+    """
+    Process one input inside the current process.
+
+    The console output of the program is discarded; a program exiting
+    on invalid input is reported as a failure of that input only.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        input_file (str): Input to process.
+        price_file (str): Price catalogue, for the sales program.
+
+    Returns:
+        dict: Input, results text or error, and the program metrics.
+    """
+    module = load_program(program)
+    metrics = Metrics(module.__name__)
+    metrics.start()
+    outcome = {"input": input_file, "results": None, "error": None}
+
+    console = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(console):
+            if program == "sales":
+                outcome["results"] = module.process_sales(
+                    price_file, [input_file], metrics=metrics
+                )
+            else:
+                outcome["results"] = module.process_file(input_file, metrics)
+    except SystemExit:
+        lines = console.getvalue().strip().splitlines()
+        outcome["error"] = lines[-1] if lines else "Program exited."
+    except (OSError, ValueError) as exc:
+        outcome["error"] = str(exc)
+
+    metrics.stop()
+    outcome["metrics"] = metrics.to_dict()
+    return outcome
+
+
+def write_results(program, outcome, output_dir):
+    """
+    Write the results of one input and drop them from its outcome.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        outcome (dict): Result of run_one.
+        output_dir (str): Folder receiving the results files.
+
+    Returns:
+        dict: The outcome without its results text.
+    """
+    results = outcome.pop("results")
+    if results is not None:
+        target = Path(output_dir) / results_name(program, outcome["input"])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(results, encoding="utf-8")
+    return outcome
+
+
+def percentile(values, fraction):
+    """
+    Args:
+        values (list): Numbers.
+        fraction (float): e.g. 0.95.
+
+    Returns:
+        float: Value below which the fraction of values falls.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(program, outcomes, workers, elapsed):
+    """
+    Build the aggregate timing summary of a batch.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        outcomes (list): Results of run_one.
+        workers (int): Number of worker processes (0 = in process).
+        elapsed (float): Wall-clock seconds of the whole batch.
+
+    Returns:
+        dict: Counts, wall time, per-file statistics and phase totals.
+    """
+    seconds = [item["metrics"]["total_ns"] / 1e9 for item in outcomes]
+    phases = {}
+    for item in outcomes:
+        for name, span in item["metrics"]["spans"].items():
+            phases[name] = phases.get(name, 0) + span["ns"] / 1e9
+
+    return {
+        "program": program,
+        "workers": workers,
+        "files": len(outcomes),
+        "failed": [
+            {"input": item["input"], "error": item["error"]}
+            for item in outcomes if item["error"]
+        ],
+        "wall_seconds": elapsed,
+        "files_per_second": len(outcomes) / elapsed if elapsed else 0.0,
+        "file_seconds_total": sum(seconds),
+        "file_seconds_p50": percentile(seconds, 0.50),
+        "file_seconds_p95": percentile(seconds, 0.95),
+        "file_seconds_max": max(seconds, default=0.0),
+        "phase_seconds": phases,
+    }
+
+
+def run_batch(program, inputs, output_dir="results", workers=0,
+              price_file=None):
+    """
+    Process every input and write the per-input results files.
+
+    Each results file is written as soon as its outcome arrives, so
+    only the summary data of every input stays in memory.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        inputs (list): Input files.
+        output_dir (str): Folder receiving the results files.
+        workers (int): Worker processes; 0 runs in this process.
+        price_file (str): Price catalogue, for the sales program.
+
+    Returns:
+        dict: Summary built by summarize, also in BatchSummary.json.
+
+    Raises:
+        ValueError: For an unknown program, a sales batch without a
+            price file or inputs sharing a results file name.
+    """
+    if program not in PROGRAMS:
+        raise ValueError(f"Unknown program: {program}")
+    if program == "sales" and not price_file:
+        raise ValueError("The sales program needs a price file.")
+    check_results_names(program, inputs)
+
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        if workers:
+            pool = stack.enter_context(ProcessPoolExecutor(workers))
+            # map hands back each outcome in input order and forgets it.
+            outcomes = pool.map(
+                run_one, [program] * len(inputs), inputs,
+                [price_file] * len(inputs),
+            )
+        else:
+            outcomes = (run_one(program, item, price_file)
+                        for item in inputs)
+        outcomes = [
+            write_results(program, outcome, output_dir)
+            for outcome in outcomes
+        ]
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(program, outcomes, workers, elapsed)
+    with open(Path(output_dir) / "BatchSummary.json", "w",
+              encoding="utf-8") as file:
+        json.dump({**summary, "inputs": [
+            {"input": item["input"], "metrics": item["metrics"]}
+            for item in outcomes
+        ]}, file, indent=2)
+    return summary
+
+
+def print_summary(summary):
+    """
+    Print the aggregate timing summary.
+
+    Args:
+        summary (dict): Summary returned by run_batch.
+    """
+    mode = (f"{summary['workers']} workers" if summary["workers"]
+            else "in process")
+    print("BATCH RESULTS")
+    print("-------------------------")
+    print(f"Program: {summary['program']} ({mode})")
+    print(f"Files: {summary['files']} ({len(summary['failed'])} failed)")
+    print(f"Wall Time: {summary['wall_seconds']:.6f} seconds")
+    print(f"Throughput: {summary['files_per_second']:.1f} files/second")
+    print(f"Per File p50/p95/max: {summary['file_seconds_p50']:.6f} / "
+          f"{summary['file_seconds_p95']:.6f} / "
+          f"{summary['file_seconds_max']:.6f} seconds")
+    for name, seconds in summary["phase_seconds"].items():
+        print(f"Phase {name}: {seconds:.6f} seconds")
+    for failure in summary["failed"]:
+        print(f"FAILED: {failure['input']} -> {failure['error']}")
+
+
+def parse_arguments(argv):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list): Arguments without the program name.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="batch_runner.py",
+        description="Run a program over many input files.",
+    )
+    parser.add_argument("program", choices=sorted(PROGRAMS))
+    parser.add_argument("inputs", nargs="*", metavar="input",
+                        help="input file or glob pattern")
+    parser.add_argument("--manifest", metavar="FILE",
+                        help="file listing one input per line")
+    parser.add_argument("--output-dir", default="results",
+                        help="results folder (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes; 0 runs in this process")
+    parser.add_argument("--price-file", metavar="FILE",
+                        help="price catalogue for the sales program")
+    return parser.parse_args(argv)
+
+
+def main():
+    """
+    Main function.
+    """
+    args = parse_arguments(sys.argv[1:])
+    inputs = collect_inputs(args.inputs, args.manifest)
+    if not inputs:
+        print("ERROR: No input files.")
+        sys.exit(1)
+
+    try:
+        summary = run_batch(args.program, inputs, args.output_dir,
+                            args.workers, args.price_file)
+    except ValueError as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
+
+    print_summary(summary)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
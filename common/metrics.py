@@ -0,0 +1,139 @@
+"""
+metrics.py
+
+Phase-level timing, counters and peak memory shared by the command
+line programs of the repository.
+
+Each program times its phases (read, parse, compute, sort, format,
+write) with ``perf_counter_ns`` spans, counts what it processed and
+writes everything as a JSON file next to its results file.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def metrics_path(results_file):
+    """
+    Name the metrics file written next to a results file.
+
+    Args:
+        results_file (str): e.g. "StatisticsResults.txt".
+
+    Returns:
+        str: e.g. "StatisticsResults.metrics.json".
+    """
+    return str(Path(results_file).with_suffix(".metrics.json"))
+
+
+class Metrics:
+    """
+    Timings and counters of one program run.
+
+    ``start()`` and ``stop()`` bound the whole run. Phases are timed
+    with ``span(name)``; a phase entered several times accumulates its
+    time and number of calls. With ``trace_memory`` the peak memory
+    allocated by Python between start and stop is recorded through
+    tracemalloc, which slows the run down.
+    """
+
+    def __init__(self, program, trace_memory=False):
+        """
+        Args:
+            program (str): Name of the program being measured.
+            trace_memory (bool): Record the tracemalloc peak.
+        """
+        self.program = program
+        self.trace_memory = trace_memory
+        self.spans = {}
+        self.counters = {}
+        self.peak_memory = None
+        self._started = None
+        self._stopped = None
+
+    def start(self):
+        """Start timing the run."""
+        if self.trace_memory:
+            tracemalloc.start()
+        self._started = time.perf_counter_ns()
+
+    def stop(self):
+        """Stop timing the run and record the memory peak."""
+        self._stopped = time.perf_counter_ns()
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Time the enclosed block as the phase ``name``.
+
+        Args:
+            name (str): Phase name, e.g. "read" or "compute".
+        """
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            span = self.spans.setdefault(name, {"ns": 0, "calls": 0})
+            span["ns"] += time.perf_counter_ns() - started
+            span["calls"] += 1
+
+    def count(self, name, amount=1):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Counter name, e.g. "lines".
+            amount (int): Value added to the counter.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def elapsed_ns(self):
+        """
+        Returns:
+            int: Nanoseconds since start, or until stop if stopped.
+        """
+        end = self._stopped
+        if end is None:
+            end = time.perf_counter_ns()
+        return end - self._started
+
+    def elapsed_seconds(self):
+        """
+        Returns:
+            float: Seconds since start, or until stop if stopped.
+        """
+        return self.elapsed_ns() / 1e9
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Timings, counters and memory, ready to be dumped.
+        """
+        return {
+            "program": self.program,
+            "total_ns": self.elapsed_ns(),
+            "spans": {
+                name: dict(span) for name, span in self.spans.items()
+            },
+            "counters": dict(self.counters),
+            "peak_memory_bytes": self.peak_memory,
+        }
+
+    def write_json(self, file_path):
+        """
+        Write the metrics to a JSON file.
+
+        Args:
+            file_path (str): Destination path.
+        """
+        try:
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file, indent=2)
+        except OSError as exc:
+            print(f"ERROR: Could not write metrics file -> {exc}")
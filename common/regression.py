@@ -0,0 +1,466 @@
+"""
+regression.py
+
+Check every engine of the command line programs against the results
+stored in the repository, and time the engines side by side.
+
+The reference engine runs the script once per input, as a user would.
+The other engines run the same code in a warm process or a worker pool
+through batch_runner, and the ledger engine checks the cached path of
+computeSales. Each output is compared with the stored results file,
+ignoring "Execution Time" lines and allowing a relative tolerance on
+decimal numbers; integers must be spelled exactly the same. Extra
+trailing sections are accepted only where a program declares them,
+such as the LEDGER and WARNINGS sections that computeSales appends.
+Speedups are relative to the reference engine.
+
+Usage:
+    python common/regression.py [PROGRAM ...] [--engines NAME ...]
+        [--tolerance REL] [--workers N]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import math
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from common.batch_runner import (  # noqa: E402
+    PROGRAMS, load_program, results_name, run_batch, run_one,
+)
+
+
+SNAPSHOTS = {
+    "statistics": {
+        "inputs": "4.2/P1/tests/TC*.txt",
+        "results": "4.2/P1/results",
+    },
+    "conversion": {
+        "inputs": "4.2/P2/tests/TC*.txt",
+        "results": "4.2/P2/results",
+    },
+    "wordcount": {
+        "inputs": "4.2/P3/tests/TC*.txt",
+        "results": "4.2/P3/results",
+    },
+    "sales": {
+        "inputs": "5.2/tests/TC*/*.Sales.json",
+        "results": "5.2/results",
+        "price_file": "5.2/tests/ProductList.json",
+        "extra_sections": ("LEDGER", "WARNINGS"),
+    },
+}
+
+DEFAULT_TOLERANCE = 1e-9
+NUMBER = re.compile(r"(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)")
+NUMBER_FLOAT = re.compile(r"[.eE]")
+
+
+def run_reference(program, inputs, price_file=None, workers=0):
+    """
+    Run the script in a new interpreter for every input.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        inputs (list): Input files.
+        price_file (str): Price catalogue, for the sales program.
+        workers (int): Unused; every input gets its own process.
+
+    Returns:
+        dict: Results text per input, or None if the run failed.
+    """
+    del workers
+    script = ROOT / PROGRAMS[program]["script"]
+    results_file = load_program(program).RESULTS_FILE
+    outputs = {}
+
+    for input_file in inputs:
+        arguments = [price_file, input_file] if price_file else [input_file]
+        with tempfile.TemporaryDirectory() as tmp:
+            subprocess.run(
+                [sys.executable, str(script),
+                 *[str(Path(item).resolve()) for item in arguments]],
+                cwd=tmp, stdout=subprocess.DEVNULL, check=False,
+            )
+            produced = Path(tmp) / results_file
+            outputs[input_file] = (
+                produced.read_text(encoding="utf-8")
+                if produced.is_file() else None
+            )
+    return outputs
+
+
+def run_in_process(program, inputs, price_file=None, workers=0):
+    """
+    Run every input in this process, one after the other.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        inputs (list): Input files.
+        price_file (str): Price catalogue, for the sales program.
+        workers (int): Unused.
+
+    Returns:
+        dict: Results text per input, or None if the run failed.
+    """
+    del workers
+    return {
+        input_file: run_one(program, input_file, price_file)["results"]
+        for input_file in inputs
+    }
+
+
+def run_pool(program, inputs, price_file=None, workers=0):
+    """
+    Run every input through batch_runner with a worker pool.
+
+    Args:
+        program (str): Key of PROGRAMS.
+        inputs (list): Input files.
+        price_file (str): Price catalogue, for the sales program.
+        workers (int): Worker processes.
+
+    Returns:
+        dict: Results text per input, or None if the run failed.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        run_batch(program, inputs, tmp, workers or 2, price_file)
+        outputs = {}
+        for input_file in inputs:
+            produced = Path(tmp) / results_name(program, input_file)
+            outputs[input_file] = (
+                produced.read_text(encoding="utf-8")
+                if produced.is_file() else None
+            )
+    return outputs
+
+
+def run_ledger(program, inputs, price_file=None, workers=0):
+    """
+    Run every sales input twice through a fresh checkpoint ledger.
+
+    The first run records the file in the ledger; the second one finds
+    it there and takes the total from the ledger, which is the result
+    returned.
+
+    Args:
+        program (str): Key of PROGRAMS; only "sales" has a ledger.
+        inputs (list): Input files.
+        price_file (str): Price catalogue.
+        workers (int): Unused.
+
+    Returns:
+        dict: Results text per input, or None if the run failed.
+    """
+    del workers
+    module = load_program(program)
+    outputs = {}
+    for input_file in inputs:
+        with tempfile.TemporaryDirectory() as tmp:
+            ledger_file = str(Path(tmp) / "ledger.jsonl")
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(2):
+                        outputs[input_file] = module.process_sales(
+                            price_file, [input_file],
+                            ledger_file=ledger_file)
+            except SystemExit:
+                outputs[input_file] = None
+    return outputs
+
+
+def run_streaming(program, inputs, price_file=None, workers=0):
+    """
+    Run the single-pass streaming mode on every input, in this process.
+
+    Args:
+        program (str): Key of PROGRAMS; only "statistics" streams.
+        inputs (list): Input files.
+        price_file (str): Unused.
+        workers (int): Unused.
+
+    Returns:
+        dict: Results text per input, or None if the run failed.
+    """
+    del price_file, workers
+    module = load_program(program)
+    outputs = {}
+    for input_file in inputs:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                outputs[input_file] = module.process_stream(input_file)
+        except SystemExit:
+            outputs[input_file] = None
+    return outputs
+
+
+ENGINES = {
+    "reference": run_reference,
+    "in-process": run_in_process,
+    "pool": run_pool,
+    "streaming": run_streaming,
+    "ledger": run_ledger,
+}
+
+# Engines that only exist for some programs.
+ENGINE_PROGRAMS = {
+    "streaming": ("statistics",),
+    "ledger": ("sales",),
+}
+
+
+def _comparable_lines(text):
+    """Return the lines of a results text without timing lines."""
+    lines = [
+        line.rstrip() for line in text.splitlines()
+        if not line.startswith("Execution Time")
+    ]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _same_number(expected, actual, tolerance):
+    """Compare two different spellings of a number.
+
+    Integers must be spelled exactly alike, so "0101" differs from
+    "101" and "10" from "10.0"; decimals are compared with tolerance.
+    """
+    if NUMBER_FLOAT.search(expected) is None:
+        return False
+    if NUMBER_FLOAT.search(actual) is None:
+        return False
+    return math.isclose(float(expected), float(actual), rel_tol=tolerance,
+                        abs_tol=tolerance)
+
+
+def _same_line(expected, actual, tolerance):
+    """Compare two lines, allowing a relative tolerance on decimals."""
+    expected_parts = NUMBER.split(expected)
+    actual_parts = NUMBER.split(actual)
+    if len(expected_parts) != len(actual_parts):
+        return False
+
+    for position, (left, right) in enumerate(
+            zip(expected_parts, actual_parts)):
+        if left == right:
+            continue
+        if position % 2 == 0 or not _same_number(left, right, tolerance):
+            return False
+    return True
+
+
+def _unexpected_line(extra, extra_sections):
+    """
+    Return the index of the first extra line outside allowed sections.
+
+    Every extra section must start with a blank line followed by one of
+    the allowed headers.
+
+    Args:
+        extra (list): Lines following the stored results.
+        extra_sections (tuple): Headers of the sections allowed.
+
+    Returns:
+        int or None: Index in extra of the offending line, if any.
+    """
+    for position, line in enumerate(extra):
+        previous = extra[position - 1] if position else ""
+        if position == 0 and line:
+            return position
+        if not previous and line and line not in extra_sections:
+            return position
+    return None
+
+
+def compare(expected, actual, tolerance=DEFAULT_TOLERANCE,
+            extra_sections=()):
+    """
+    Compare a results text with the stored one.
+
+    Args:
+        expected (str): Stored results.
+        actual (str): Results produced by an engine.
+        tolerance (float): Relative and absolute tolerance on decimals.
+        extra_sections (tuple): Headers of the sections the program may
+            append after the stored results.
+
+    Returns:
+        str or None: Description of the first difference, if any.
+    """
+    expected_lines = _comparable_lines(expected)
+    actual_lines = _comparable_lines(actual)
+
+    for number, line in enumerate(expected_lines, start=1):
+        if number > len(actual_lines):
+            return f"line {number}: missing, expected '{line}'"
+        if not _same_line(line, actual_lines[number - 1], tolerance):
+            return (f"line {number}: expected '{line}', "
+                    f"got '{actual_lines[number - 1]}'")
+
+    extra = actual_lines[len(expected_lines):]
+    if extra and not extra_sections:
+        return f"line {len(expected_lines) + 1}: unexpected '{extra[0]}'"
+    position = _unexpected_line(extra, extra_sections)
+    if position is not None:
+        return (f"line {len(expected_lines) + position + 1}: "
+                f"unexpected '{extra[position]}'")
+    return None
+
+
+def _mismatches(program, inputs, outputs, tolerance):
+    """
+    Compare the outputs of an engine with the stored results.
+
+    Args:
+        program (str): Key of SNAPSHOTS.
+        inputs (list): Input files.
+        outputs (dict): Results text per input, or None if a run failed.
+        tolerance (float): Tolerance on decimals.
+
+    Returns:
+        list: One description per input that differs.
+    """
+    snapshot = SNAPSHOTS[program]
+    mismatches = []
+    for input_file in inputs:
+        actual = outputs.get(input_file)
+        stored = (ROOT / snapshot["results"]
+                  / results_name(program, input_file))
+        if actual is None:
+            difference = "engine produced no results"
+        else:
+            difference = compare(
+                stored.read_text(encoding="utf-8"), actual, tolerance,
+                snapshot.get("extra_sections", ()))
+        if difference:
+            mismatches.append(f"{Path(input_file).name}: {difference}")
+    return mismatches
+
+
+def check_program(program, engines, tolerance=DEFAULT_TOLERANCE,
+                  workers=2):
+    """
+    Run the engines over the stored inputs of a program.
+
+    Args:
+        program (str): Key of SNAPSHOTS.
+        engines (list): Keys of ENGINES.
+        tolerance (float): Tolerance on numbers.
+        workers (int): Worker processes of the pool engine.
+
+    Returns:
+        list: One report per engine with its time and mismatches.
+    """
+    snapshot = SNAPSHOTS[program]
+    inputs = sorted(glob.glob(str(ROOT / snapshot["inputs"])))
+    price_file = snapshot.get("price_file")
+    if price_file:
+        price_file = str(ROOT / price_file)
+
+    reports = []
+    for engine in engines:
+        if program not in ENGINE_PROGRAMS.get(engine, SNAPSHOTS):
+            continue
+
+        start = time.perf_counter()
+        outputs = ENGINES[engine](program, inputs, price_file, workers)
+        elapsed = time.perf_counter() - start
+
+        reports.append({
+            "program": program,
+            "engine": engine,
+            "files": len(inputs),
+            "seconds": elapsed,
+            "mismatches": _mismatches(program, inputs, outputs,
+                                      tolerance),
+        })
+    return reports
+
+
+def print_reports(reports):
+    """
+    Print engines side by side, with their speedup over the reference
+    engine of the same program, or over its first engine without one.
+
+    Args:
+        reports (list): Reports returned by check_program.
+    """
+    print("REGRESSION RESULTS")
+    print("-------------------------")
+    baselines = {}
+    for report in reports:
+        if (report["engine"] == "reference"
+                or report["program"] not in baselines):
+            baselines[report["program"]] = report["seconds"]
+    for report in reports:
+        baseline = baselines[report["program"]]
+        speedup = baseline / report["seconds"] if report["seconds"] else 0.0
+        status = "OK" if not report["mismatches"] else (
+            f"{len(report['mismatches'])} MISMATCHES")
+        print(f"{report['program']:<11} {report['engine']:<11} "
+              f"{report['files']:>3} files {report['seconds']:10.6f} s "
+              f"{speedup:7.1f}x  {status}")
+        for mismatch in report["mismatches"]:
+            print(f"    {mismatch}")
+
+
+def parse_arguments(argv):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list): Arguments without the program name.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="regression.py",
+        description="Compare every engine with the stored results.",
+    )
+    parser.add_argument("programs", nargs="*", metavar="program",
+                        help="one of " + ", ".join(sorted(SNAPSHOTS))
+                        + " (default: all)")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES),
+                        default=list(ENGINES))
+    parser.add_argument("--tolerance", type=float,
+                        default=DEFAULT_TOLERANCE)
+    parser.add_argument("--workers", type=int, default=2,
+                        help="worker processes of the pool engine")
+    return parser.parse_args(argv)
+
+
+def main():
+    """
+    Main function.
+    """
+    args = parse_arguments(sys.argv[1:])
+    unknown = sorted(set(args.programs) - set(SNAPSHOTS))
+    if unknown:
+        print(f"ERROR: Unknown program -> {', '.join(unknown)}")
+        sys.exit(1)
+
+    reports = []
+    for program in args.programs or sorted(SNAPSHOTS):
+        reports.extend(check_program(program, args.engines,
+                                     args.tolerance, args.workers))
+
+    print_reports(reports)
+    if any(report["mismatches"] for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()